@@ -1,31 +1,59 @@
+import contextlib
 import time
-import random
-import pyautogui
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+from lazy_imports import lazy_import
+from scheduler import JobScheduler
+
+pyautogui = lazy_import('pyautogui')
 
 
 class BuffManager:
-    def __init__(self, settings: Dict[str, Any]):
+    def __init__(self, settings: Dict[str, Any], scheduler: Optional[JobScheduler] = None):
         self.settings = settings
+        # Buff casts are periodic jobs: one cast per `interval`, delayed by up to `random_range`
+        # seconds drawn once per period
+        self.scheduler = scheduler or JobScheduler()
         self.last_buff_times = {}
+        # Optional metrics.Metrics
+        self.metrics = None
+        # Context manager held around key presses; MapleBot sets its shared input session
+        self.input_session = contextlib.nullcontext
+        self.sync_jobs()
 
-    def check_and_cast_buffs(self):
-        current_time = time.time()
-        buffs = self.settings.get('buffs', [])
-        for buff in buffs:
-            if not buff.get('active', False):
+    def sync_jobs(self):
+        """Register one job per active buff; unchanged buffs keep their current period."""
+        wanted = {}
+        for buff in self.settings.get('buffs', []) or []:
+            if buff.get('active', False) and float(buff.get('interval', 0) or 0) > 0:
+                wanted[f"buff:{buff['name']}"] = buff
+        for name in self.scheduler.names():
+            if name.startswith('buff:') and name not in wanted:
+                self.scheduler.remove(name)
+        for name, buff in wanted.items():
+            job = self.scheduler.get(name)
+            period = float(buff['interval'])
+            jitter = float(buff.get('random_range', 0) or 0)
+            if job is not None and job.period == period and job.jitter == jitter:
+                job.action = self._caster(buff)
                 continue
-            buff_name = buff['name']
-            interval = buff['interval']
-            random_range = buff.get('random_range', 0)
-            last_time = self.last_buff_times.get(buff_name, 0)
-            if current_time - last_time >= interval + random.randint(0, random_range):
-                self.cast_buff(buff)
-                self.last_buff_times[buff_name] = current_time
+            self.scheduler.add(name, period, self._caster(buff), jitter=jitter)
+
+    def _caster(self, buff: Dict[str, Any]):
+        def cast():
+            self.cast_buff(buff)
+            self.last_buff_times[buff['name']] = time.time()
+        return cast
+
+    def check_and_cast_buffs(self, lead: float = 0.0) -> int:
+        """Run every due job of the scheduler (within `lead` seconds). Returns the number run."""
+        return self.scheduler.run_due(lead=lead)
 
     def cast_buff(self, buff: Dict[str, Any]):
         key = buff['key']
         down_time = buff['down_time']
-        pyautogui.keyDown(key)
-        time.sleep(down_time)
-        pyautogui.keyUp(key)
\ No newline at end of file
+        with self.input_session():
+            pyautogui.keyDown(key)
+            time.sleep(down_time)
+            pyautogui.keyUp(key)
+        if self.metrics is not None:
+            self.metrics.incr('buffs')
@@ -0,0 +1,95 @@
+from typing import List, Optional, Sequence, Tuple
+
+Region = Tuple[int, int, int, int]
+
+# Fixed cost of one extra grab, in pixels: two rectangles are merged when the union wastes
+# fewer pixels than this (a screenshot call has a large constant overhead)
+GRAB_OVERHEAD_PX = 40000
+# Grab the whole view instead once the plan covers this share of it
+FULL_FRAME_SHARE = 0.6
+
+
+def _union(a: Region, b: Region) -> Region:
+    x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+    x1, y1 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _area(r: Region) -> int:
+    return r[2] * r[3]
+
+
+def contains(outer: Region, inner: Region) -> bool:
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+def clip(region: Region, frame: Tuple[int, int]) -> Optional[Region]:
+    x0, y0 = max(0, int(region[0])), max(0, int(region[1]))
+    x1, y1 = min(frame[0], int(region[0] + region[2])), min(frame[1], int(region[1] + region[3]))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def merge_regions(regions: Sequence[Optional[Region]], frame: Tuple[int, int],
+                  overhead: int = GRAB_OVERHEAD_PX) -> List[Region]:
+    """Merge requested regions into the fewest rectangles worth grabbing.
+
+    None in `regions` means "full frame". Rectangles are merged greedily while the union costs
+    less than grabbing both separately (area + overhead per grab); if what is left covers most
+    of the view, the whole view is grabbed instead.
+    """
+    full = (0, 0, frame[0], frame[1])
+    if any(r is None for r in regions):
+        return [full]
+    rects = [c for c in (clip(r, frame) for r in regions) if c is not None]
+    merged = True
+    while merged and len(rects) > 1:
+        merged = False
+        best = None
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                union = _union(rects[i], rects[j])
+                saving = _area(rects[i]) + _area(rects[j]) + overhead - _area(union)
+                if saving > 0 and (best is None or saving > best[0]):
+                    best = (saving, i, j, union)
+        if best is not None:
+            _, i, j, union = best
+            rects = [r for k, r in enumerate(rects) if k not in (i, j)] + [union]
+            merged = True
+    if rects and sum(_area(r) for r in rects) >= FULL_FRAME_SHARE * _area(full):
+        return [full]
+    return rects
+
+
+class FrameSet:
+    """The grabs made for one tick, handing out views into them by reference-coordinate region.
+
+    grabs is a list of (reference region, client region, image). view() returns a numpy slice
+    (no copy) of the first grab that covers the requested region, or None.
+    """
+
+    def __init__(self, grabs, full_region: Region):
+        self.grabs = grabs
+        self.full_region = full_region
+        self.bytes = sum(img.nbytes for _, _, img in grabs)
+
+    def view(self, region: Optional[Region], scaled: Optional[Region] = None):
+        """View for a reference region (None = full view); `scaled` is the region in client pixels."""
+        if region is None:
+            for ref, _, img in self.grabs:
+                if ref == self.full_region:
+                    return img
+            return None
+        region = tuple(int(v) for v in region)
+        for ref, client, img in self.grabs:
+            if not contains(ref, region):
+                continue
+            x0 = max(0, scaled[0] - client[0])
+            y0 = max(0, scaled[1] - client[1])
+            x1 = min(img.shape[1], x0 + scaled[2])
+            y1 = min(img.shape[0], y0 + scaled[3])
+            if x1 > x0 and y1 > y0:
+                return img[y0:y1, x0:x1]
+        return None
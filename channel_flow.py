@@ -0,0 +1,120 @@
+import logging
+import time
+
+from lazy_imports import lazy_import
+
+pyautogui = lazy_import('pyautogui')
+
+
+class ChannelChangeFlow:
+    """Channel change as a small state machine driven by what is on screen.
+
+        settle -> open_menu -> open_channels -> pick_channel -> confirm -> wait_login -> enter -> done
+
+    Each state does its clicks and returns the next state. States that depend on the game
+    (channel list shown, login screen back) wait with Vision.wait_until_visible, so the flow
+    moves on as soon as the screen is ready instead of sleeping for the worst case. If the
+    channel list does not show up the menu is closed and reopened, up to channel.retries times.
+    Click positions are reference coordinates, like everything else in Vision.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.vision = bot.vision
+        self.cfg = bot.cfg
+        ui = self.cfg.assets_path / 'ui_elements'
+        self.channel_template = str(ui / 'ch.png')
+        self.login_template = str(ui / 'mainch.png')
+        self.attempt = 0
+        self.channel_button = None
+        self.history = []
+
+    def _stopped(self) -> bool:
+        return not self.bot.running
+
+    def _pause(self):
+        time.sleep(self.cfg.channel_click_delay)
+
+    def run(self) -> bool:
+        handlers = {
+            'settle': self.settle,
+            'open_menu': self.open_menu,
+            'open_channels': self.open_channels,
+            'pick_channel': self.pick_channel,
+            'confirm': self.confirm,
+            'wait_login': self.wait_login,
+            'enter': self.enter,
+        }
+        state = 'settle'
+        started = time.monotonic()
+        while state in handlers:
+            if self._stopped():
+                state = 'stopped'
+                break
+            step_started = time.monotonic()
+            next_state = handlers[state]()
+            self.history.append((state, time.monotonic() - step_started))
+            logging.debug(f"Channel change: {state} -> {next_state}")
+            state = next_state
+        steps = ', '.join(f"{name} {secs:.1f}s" for name, secs in self.history)
+        if state == 'done':
+            logging.info(f"Channel change completed in {time.monotonic() - started:.1f}s ({steps})")
+            return True
+        logging.error(f"Channel change ended in state '{state}' after {time.monotonic() - started:.1f}s ({steps})")
+        return False
+
+    def _retry(self) -> str:
+        self.attempt += 1
+        if self.attempt > self.cfg.channel_retries:
+            return 'failed'
+        logging.warning(f"Channel list did not appear, retrying ({self.attempt}/{self.cfg.channel_retries})")
+        with self.bot.input_session():
+            pyautogui.press('esc')
+        self._pause()
+        return 'open_menu'
+
+    # --- states -------------------------------------------------------------------------------
+    def settle(self) -> str:
+        # Let whatever triggered the change (e.g. the user-detected alarm) finish drawing
+        self._pause()
+        return 'open_menu'
+
+    def open_menu(self) -> str:
+        self.bot.click(1681, 98)
+        self._pause()
+        return 'open_channels'
+
+    def open_channels(self) -> str:
+        self.bot.click(1681, 175)
+        self.channel_button = self.vision.wait_until_visible(
+            self.channel_template, self.cfg.channel_list_region, timeout=self.cfg.channel_menu_timeout,
+            should_stop=self._stopped)
+        return 'pick_channel' if self.channel_button else self._retry()
+
+    def pick_channel(self) -> str:
+        w, h = self.vision.template_size(self.channel_template)
+        x, y = self.channel_button
+        self.bot.click(x + w // 2, y + h // 2)
+        self._pause()
+        return 'confirm'
+
+    def confirm(self) -> str:
+        self.bot.click(1081, 714)
+        self._pause()
+        self.bot.click(1072, 635)
+        return 'wait_login'
+
+    def wait_login(self) -> str:
+        found = self.vision.wait_until_visible(
+            self.login_template, self.cfg.channel_login_region, timeout=self.cfg.channel_login_timeout,
+            should_stop=self._stopped)
+        return 'enter' if found else 'failed'
+
+    def enter(self) -> str:
+        self.bot.click(979, 709)
+        # The login screen going away means the character select is up
+        self.vision.wait_until_gone(self.login_template, self.cfg.channel_login_region, timeout=10.0,
+                                    should_stop=self._stopped)
+        self._pause()
+        self.bot.click(579, 805)
+        return 'done'
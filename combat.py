@@ -1,36 +1,78 @@
-import pyautogui
+import contextlib
 import time
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 import logging
+from compiled_settings import compile_settings
+from lazy_imports import lazy_import
+from targeting import rank_targets
+from world_model import suppress_duplicates
+
+pyautogui = lazy_import('pyautogui')
 
 
 class CombatManager:
     def __init__(self, settings: Dict[str, Any], vision):
         self.settings = settings
+        self.cfg = compile_settings(settings)
         self.vision = vision
+        # Optional WorldModel; when set, targets come from its monster tracks instead of a full scan
+        self.world = None
+        # Optional movement.MoveController; without it the approach is timed from speed_factor
+        self.controller = None
+        # Optional metrics.Metrics
+        self.metrics = None
+        # Context manager held around key sequences; MapleBot sets its shared input session
+        self.input_session = contextlib.nullcontext
+
+    def plan_targets(self, monster_paths: list, character_y: int, char_x: int, char_left: bool):
+        """Ranked TargetPlan list (best first) over every monster currently known."""
+        if self.world is not None:
+            points = self.world.monster_points()
+        else:
+            points = suppress_duplicates([(x, y) for x, y, _ in self.vision.find_monsters(monster_paths)], 20)
+        plans = rank_targets(points, char_x, character_y, char_left, self.cfg)
+        if plans:
+            best = plans[0]
+            logging.debug(f"Target plan: {len(plans)} clusters, best at ({best.x}, {best.y}) "
+                          f"expecting {best.hits} hits, score {best.score:.2f}/s")
+        return plans
 
     def find_targets(self, monster_paths: list, character_y: int, char_x: int, char_left: bool):
-        return self.vision.find_closest_monster(monster_paths, character_y, char_x, char_left)
+        plans = self.plan_targets(monster_paths, character_y, char_x, char_left)
+        return (plans[0].x, plans[0].y) if plans else None
 
-    def attack(self, monster_pos: Tuple[int, int], character_x: int, character_direction_left: bool):
+    def attack(self, monster_pos: Tuple[int, int], character_x: int, character_direction_left: bool,
+               character_y: Optional[int] = None):
+        cfg = self.cfg
         x_diff = monster_pos[0] - character_x
         distance_to_monster = 30
-        if x_diff < 0:
-            logging.debug("Moving left to attack monster")
-            pyautogui.keyDown("z")
-            pyautogui.keyDown("left")
-            time.sleep(max(0, (abs(x_diff) - distance_to_monster) / 117 * 0.5))
-            pyautogui.keyUp("left")
-        else:
-            logging.debug("Moving right to attack monster")
-            pyautogui.keyDown("z")
-            pyautogui.keyDown("right")
-            time.sleep(max(0, (abs(x_diff) - distance_to_monster) / 117 * 0.5))
-            pyautogui.keyUp("right")
+        with self.input_session():
+            if self.controller is not None and cfg.closed_loop_movement:
+                logging.debug("Approaching monster with position feedback")
+                pyautogui.keyDown("z")
+                if abs(x_diff) > distance_to_monster:
+                    stop_x = monster_pos[0] + (distance_to_monster if x_diff < 0 else -distance_to_monster)
+                    self.controller.move(character_x, stop_x, character_y, hold=())
+                # Face the monster even when no approach was needed (a close target behind us)
+                pyautogui.press("left" if x_diff < 0 else "right")
+            elif x_diff < 0:
+                logging.debug("Moving left to attack monster")
+                pyautogui.keyDown("z")
+                pyautogui.keyDown("left")
+                time.sleep(max(0, (abs(x_diff) - distance_to_monster) / cfg.speed_factor * 0.5))
+                pyautogui.keyUp("left")
+            else:
+                logging.debug("Moving right to attack monster")
+                pyautogui.keyDown("z")
+                pyautogui.keyDown("right")
+                time.sleep(max(0, (abs(x_diff) - distance_to_monster) / cfg.speed_factor * 0.5))
+                pyautogui.keyUp("right")
 
-        pyautogui.keyDown("ctrl")
-        time.sleep(self.settings['hotkeys'].get('key_down_time', 4.5))
-        pyautogui.keyUp("ctrl")
-        time.sleep(self.settings['hotkeys'].get('attack_delay', 0.5))
-        pyautogui.keyUp("z")
+            if self.metrics is not None:
+                self.metrics.incr('attacks')
+            pyautogui.keyDown("ctrl")
+            time.sleep(cfg.key_down_time)
+            pyautogui.keyUp("ctrl")
+            time.sleep(cfg.attack_delay)
+            pyautogui.keyUp("z")
         logging.info("Attack sequence completed")
@@ -0,0 +1,294 @@
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+def parse_color(color_val):
+    """Parse color from hex string like '#rrggbb' or 'r,g,b' into (B,G,R) tuple for OpenCV images."""
+    if isinstance(color_val, (list, tuple)) and len(color_val) == 3:
+        r, g, b = color_val
+        return (int(b), int(g), int(r))
+    if isinstance(color_val, str):
+        s = color_val.strip()
+        if s.startswith('#') and len(s) == 7:
+            r = int(s[1:3], 16)
+            g = int(s[3:5], 16)
+            b = int(s[5:7], 16)
+            return (b, g, r)
+        parts = [p.strip() for p in s.split(',')]
+        if len(parts) == 3:
+            r, g, b = map(int, parts)
+            return (b, g, r)
+    raise ValueError(f"Unsupported color format: {color_val}")
+
+
+def _float(value, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _int(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _bool(value, default: bool = False) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes', 'on')
+    if value is None:
+        return default
+    return bool(value)
+
+
+def _region(value) -> Optional[tuple]:
+    """(x, y, w, h) tuple, or None for "whole window" (missing or malformed)."""
+    try:
+        region = tuple(int(v) for v in value)
+    except (TypeError, ValueError):
+        return None
+    return region if len(region) == 4 else None
+
+
+def _template(setting: str, assets_path: Path, fallback: str) -> Path:
+    return Path(setting) if setting else assets_path / 'ui_elements' / fallback
+
+
+# Tick-rate governor subsystems: (active interval s, idle interval s, share of the CPU budget)
+GOVERNOR_DEFAULTS = {
+    'main': (0.0, 0.5, 0.7),
+    'potion': (0.3, 1.5, 0.2),
+    'channel': (10.0, 20.0, 0.1),
+}
+
+# Minimum seconds between runs of each screen detector (0 = every tick)
+DETECTOR_INTERVAL_DEFAULTS = {
+    'enemy': 0.5,
+    'lie': 1.0,
+    'chat': 0.0,
+    'other_user': 1.0,
+    'top_floor': 1.0,
+}
+
+# Periodic maintenance presses: key -> seconds between presses (0 = disabled)
+MAINTENANCE_DEFAULTS = {
+    'pageup': 600.0,
+    'home': 1800.0,
+}
+
+
+class CompiledSettings:
+    """Immutable, pre-parsed view of the settings dict read by the hot loops.
+
+    Built once per settings change by compile_settings(); components swap their reference to
+    a new instance instead of re-reading nested dicts and re-parsing strings every tick.
+    """
+
+    __slots__ = (
+        'simulation_mode', 'assets_path', 'monster_paths', 'route_switch_seconds',
+        # detectors
+        'enemy_detector', 'lie_detector', 'chat_detector', 'other_user_detector', 'top_floor_stoppage',
+        'lie_template', 'lie_threshold', 'enemy_template', 'enemy_threshold',
+        'other_user_template', 'other_user_threshold', 'top_floor_template', 'top_floor_threshold',
+        'top_floor_target_x',
+        'wait_poll_hz',
+        # channel change flow
+        'channel_click_delay', 'channel_menu_timeout', 'channel_login_timeout', 'channel_retries',
+        'channel_list_region', 'channel_login_region',
+        # chat detection: colours are pre-expanded into (label, lower, upper) inRange bounds
+        'chat_region', 'chat_ranges', 'chat_pixel_ratio',
+        # monsters
+        'monster_threshold', 'x_range', 'y_range', 'handle_opposite',
+        # target scoring
+        'target_attack_range', 'target_max_hits', 'target_cluster_gap', 'target_turn_seconds',
+        # input timing
+        'key_down_time', 'attack_delay', 'speed_factor',
+        # closed-loop movement
+        'closed_loop_movement', 'brake_distance', 'arrive_tolerance',
+        # potions
+        'hp_potion_percent', 'mp_potion_percent', 'hp_potion_key', 'mp_potion_key',
+        # world model
+        'world_rope_rescan_seconds', 'world_monster_full_scan_seconds', 'world_map_check_seconds',
+        'world_roi_padding', 'world_track_gate', 'world_track_max_misses', 'world_platform_settle_ticks',
+        'world_platform_min_span',
+        # tick-rate governor: subsystems are (name, active_interval, idle_interval, weight)
+        'governor_enabled', 'governor_cpu_budget', 'governor_subsystems',
+        # navigation graph
+        'nav_jump_height', 'nav_climb_seconds', 'nav_jump_seconds', 'nav_drop_seconds',
+        # capture planning: detector_intervals is ((name, seconds), ...)
+        'capture_planning', 'capture_detector_intervals', 'capture_character_pad', 'capture_character_full_every',
+        # maintenance presses: ((key, seconds), ...), seconds 0 = disabled
+        'maintenance_periods',
+        # sampling profiler
+        'profile_enabled', 'profile_hz', 'profile_dir', 'profile_flush_seconds',
+        # telemetry endpoint
+        'telemetry_enabled', 'telemetry_host', 'telemetry_port',
+        # flight recorder
+        'recorder_enabled', 'recorder_seconds', 'recorder_scale', 'recorder_max_fps', 'recorder_keyframe_every',
+        'recorder_path', 'recorder_cooldown',
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('CompiledSettings is immutable; compile a new snapshot instead')
+
+    def __delattr__(self, name):
+        raise AttributeError('CompiledSettings is immutable; compile a new snapshot instead')
+
+    def __repr__(self):
+        return f"CompiledSettings(monsters={len(self.monster_paths)}, simulation_mode={self.simulation_mode})"
+
+
+def compile_settings(settings: Dict[str, Any]) -> CompiledSettings:
+    """Validate and pre-parse a settings dict into a CompiledSettings snapshot."""
+    vision = settings.get('vision', {}) or {}
+    misc = settings.get('misc', {}) or {}
+    monsters = settings.get('monster_settings', {}) or {}
+    hotkeys = settings.get('hotkeys', {}) or {}
+    debug = settings.get('debug', {}) or {}
+    movement = settings.get('movement', {}) or {}
+    world = settings.get('world', {}) or {}
+    channel = settings.get('channel', {}) or {}
+    targeting = settings.get('targeting', {}) or {}
+    navigation = settings.get('navigation', {}) or {}
+    governor = settings.get('governor', {}) or {}
+    capture = settings.get('capture', {}) or {}
+    telemetry = settings.get('telemetry', {}) or {}
+    recorder = settings.get('recorder', {}) or {}
+    intervals = capture.get('detector_intervals', {}) or {}
+    detector_intervals = tuple((name, max(0.0, _float(intervals.get(name, default), default)))
+                               for name, default in DETECTOR_INTERVAL_DEFAULTS.items())
+    maintenance = settings.get('maintenance', MAINTENANCE_DEFAULTS)
+    maintenance = maintenance if isinstance(maintenance, dict) else {}
+    maintenance_periods = tuple((str(key), max(0.0, _float(period or 0, MAINTENANCE_DEFAULTS.get(key, 0.0))))
+                                for key, period in maintenance.items())
+    pad = capture.get('character_pad', [350, 250])
+    try:
+        character_pad = (int(pad[0]), int(pad[1]))
+    except (TypeError, ValueError, IndexError):
+        character_pad = (350, 250)
+    governor_subsystems = []
+    for name, (active, idle, weight) in GOVERNOR_DEFAULTS.items():
+        sub = governor.get(name, {}) or {}
+        governor_subsystems.append((name, max(0.0, _float(sub.get('active', active), active)),
+                                    max(0.0, _float(sub.get('idle', idle), idle)),
+                                    max(0.01, _float(sub.get('weight', weight), weight))))
+
+    assets_path = Path(settings.get('assets_path') or vision.get('assets_path') or 'assets')
+    mob_root = Path(vision.get('assets_path', 'assets')) / 'mob_templates'
+    monster_paths = tuple(mob_root / img for img in settings.get('monsters', []) or [])
+
+    region = vision.get('chat_region', [10, 800, 400, 200])
+    try:
+        chat_region = tuple(int(v) for v in region)
+        if len(chat_region) != 4:
+            raise ValueError(region)
+    except (TypeError, ValueError):
+        chat_region = (10, 800, 400, 200)
+
+    tolerance = _int(vision.get('chat_color_tolerance', 30), 30)
+    chat_ranges = []
+    for label, color_val in (vision.get('chat_colors', {}) or {}).items():
+        try:
+            target_bgr = parse_color(color_val)
+        except (TypeError, ValueError):
+            continue
+        lower = np.array([max(0, c - tolerance) for c in target_bgr], dtype=np.uint8)
+        upper = np.array([min(255, c + tolerance) for c in target_bgr], dtype=np.uint8)
+        lower.flags.writeable = False
+        upper.flags.writeable = False
+        chat_ranges.append((label, lower, upper))
+
+    top_floor_target_x: Optional[int] = None
+    if 'top_floor_target_x' in vision:
+        top_floor_target_x = _int(vision.get('top_floor_target_x'), None)
+
+    return CompiledSettings(
+        simulation_mode=_bool(debug.get('simulation_mode', False)),
+        assets_path=assets_path,
+        monster_paths=monster_paths,
+        route_switch_seconds=_float(misc.get('route_switch_seconds', 300), 300.0),
+        enemy_detector=_bool(misc.get('enemy_detector', False)),
+        lie_detector=_bool(misc.get('lie_detector', False)),
+        chat_detector=_bool(misc.get('chat_detector', False)),
+        other_user_detector=_bool(misc.get('other_user_detector', False)),
+        top_floor_stoppage=_bool(misc.get('top_floor_stoppage', False)),
+        lie_template=_template(vision.get('lie_template', ''), assets_path, 'polygraph.png'),
+        lie_threshold=_float(vision.get('lie_threshold', 0.7), 0.7),
+        enemy_template=_template(vision.get('enemy_template', ''), assets_path, 'enemy_alert.png'),
+        enemy_threshold=_float(vision.get('enemy_threshold', 0.7), 0.7),
+        other_user_template=_template(vision.get('other_user_template', ''), assets_path, 'other_user.png'),
+        other_user_threshold=_float(vision.get('other_user_threshold', 0.75), 0.75),
+        top_floor_template=_template(vision.get('top_floor_template', ''), assets_path, 'top_floor.png'),
+        top_floor_threshold=_float(vision.get('top_floor_threshold', 0.7), 0.7),
+        top_floor_target_x=top_floor_target_x,
+        wait_poll_hz=_float(vision.get('wait_poll_hz', 5), 5.0),
+        channel_click_delay=_float(channel.get('click_delay', 0.8), 0.8),
+        channel_menu_timeout=_float(channel.get('menu_timeout', 5), 5.0),
+        channel_login_timeout=_float(channel.get('login_timeout', 300), 300.0),
+        channel_retries=_int(channel.get('retries', 2), 2),
+        channel_list_region=_region(channel.get('list_region')),
+        channel_login_region=_region(channel.get('login_region')),
+        chat_region=chat_region,
+        chat_ranges=tuple(chat_ranges),
+        chat_pixel_ratio=_float(vision.get('chat_pixel_ratio', 0.002), 0.002),
+        monster_threshold=_float(monsters.get('monster_recognition_rate', 0.8), 0.8),
+        x_range=_float(monsters.get('x_range', 200), 200.0),
+        y_range=_float(monsters.get('y_range', 60), 60.0),
+        handle_opposite=_bool(monsters.get('handle_opposite', True), True),
+        target_attack_range=_int(targeting.get('attack_range', 120), 120),
+        target_max_hits=_int(targeting.get('max_hits', 3), 3),
+        target_cluster_gap=_int(targeting.get('cluster_gap', 80), 80),
+        target_turn_seconds=_float(targeting.get('turn_seconds', 0.15), 0.15),
+        key_down_time=_float(hotkeys.get('key_down_time', 4.5), 4.5),
+        attack_delay=_float(hotkeys.get('attack_delay', 0.5), 0.5),
+        speed_factor=_float(movement.get('speed_factor', 117), 117.0) or 117.0,
+        closed_loop_movement=_bool(movement.get('closed_loop', True), True),
+        brake_distance=_int(movement.get('brake_distance', 10), 10),
+        arrive_tolerance=_int(movement.get('arrive_tolerance', 20), 20),
+        hp_potion_percent=_float(misc.get('hp_potion_percent', 50), 50.0),
+        mp_potion_percent=_float(misc.get('mp_potion_percent', 30), 30.0),
+        hp_potion_key=str(hotkeys.get('hp_potion', 'del')),
+        mp_potion_key=str(hotkeys.get('mp_potion', 'end')),
+        world_rope_rescan_seconds=_float(world.get('rope_rescan_seconds', 300), 300.0),
+        world_monster_full_scan_seconds=_float(world.get('monster_full_scan_seconds', 1.5), 1.5),
+        world_map_check_seconds=_float(world.get('map_check_seconds', 10), 10.0),
+        world_roi_padding=_int(world.get('roi_padding', 40), 40),
+        world_track_gate=_int(world.get('track_gate', 60), 60),
+        world_track_max_misses=_int(world.get('track_max_misses', 2), 2),
+        world_platform_settle_ticks=max(1, _int(world.get('platform_settle_ticks', 3), 3)),
+        world_platform_min_span=_int(world.get('platform_min_span', 40), 40),
+        governor_enabled=_bool(governor.get('enabled', True), True),
+        governor_cpu_budget=_float(governor.get('cpu_budget', 0.5), 0.5),
+        governor_subsystems=tuple(governor_subsystems),
+        nav_jump_height=_int(navigation.get('jump_height', 80), 80),
+        nav_climb_seconds=_float(navigation.get('climb_seconds', 3.5), 3.5),
+        nav_jump_seconds=_float(navigation.get('jump_seconds', 0.6), 0.6),
+        nav_drop_seconds=_float(navigation.get('drop_seconds', 0.8), 0.8),
+        capture_planning=_bool(capture.get('enabled', True), True),
+        capture_detector_intervals=detector_intervals,
+        capture_character_pad=character_pad,
+        capture_character_full_every=max(1, _int(capture.get('character_full_every', 10), 10)),
+        maintenance_periods=maintenance_periods,
+        profile_enabled=_bool(debug.get('profile', False)),
+        profile_hz=min(1000.0, max(1.0, _float(debug.get('profile_hz', 50), 50.0))),
+        profile_dir=str(debug.get('profile_dir') or 'logs/profiles'),
+        profile_flush_seconds=max(1.0, _float(debug.get('profile_flush_seconds', 10), 10.0)),
+        telemetry_enabled=_bool(telemetry.get('enabled', False)),
+        telemetry_host=str(telemetry.get('host') or '127.0.0.1'),
+        telemetry_port=_int(telemetry.get('port', 8765), 8765),
+        recorder_enabled=_bool(recorder.get('enabled', True), True),
+        recorder_seconds=max(1.0, _float(recorder.get('seconds', 20), 20.0)),
+        recorder_scale=min(1.0, max(0.05, _float(recorder.get('scale', 0.25), 0.25))),
+        recorder_max_fps=max(0.1, _float(recorder.get('max_fps', 2), 2.0)),
+        recorder_keyframe_every=max(1, _int(recorder.get('keyframe_every', 10), 10)),
+        recorder_path=str(recorder.get('path') or 'logs/incidents'),
+        recorder_cooldown=max(0.0, _float(recorder.get('cooldown', 60), 60.0)),
+    )
@@ -1,37 +1,164 @@
-import tkinter as tk
+import base64
+import logging
+import threading
+from collections import namedtuple
 from typing import Any, Dict
 
+import cv2
+
+# Latest bot state published to the overlay. `frame` is a thumbnail of the last full capture (BGR
+# ndarray owned by the state, never modified) and `detections` a tuple of (kind, x, y) points in
+# reference coordinates.
+OverlayState = namedtuple('OverlayState', 'hp_current hp_max mp_current mp_max char_x char_y action frame detections')
+
+# Size of the frame thumbnail shown behind the detections (the canvas size)
+PREVIEW_SIZE = (480, 270)
+
+# Marker size (w, h) and colour per detection kind, in reference pixels
+BOX_STYLES = {
+    'character': ((40, 70), '#00ff66'),
+    'monster': ((60, 50), '#ff4444'),
+    'target': ((60, 50), '#ffcc00'),
+    'rope': ((12, 90), '#33aaff'),
+}
+
 
 class DebugOverlay:
+    """Always-on-top debug window rendered by its own thread.
+
+    The bot only swaps self._latest for a new OverlayState (a single reference assignment, no
+    locks, no Tk calls); the overlay thread owns its Tk root and redraws at debug.overlay_fps.
+    When debug.enable_debug is off nothing is started and publish() returns immediately.
+    """
+
     def __init__(self, settings: Dict[str, Any]):
+        self.show_boxes = False
+        self.root = None
+        self._latest = None
+        self._rendered = None
+        self._thread = None
+        self._stop = False
+        self._tk = None
+        self.apply(settings)
+
+    def apply(self, settings: Dict[str, Any]):
+        """New settings; re-reads the debug.* options.
+
+        The render thread is stopped when the overlay is disabled or boxes are toggled (the window
+        layout changes); the next publish() starts it again. A new fps applies from the next frame.
+        """
+        debug = settings.get('debug', {})
+        show_boxes = bool(debug.get('overlay_boxes', False))
+        relayout = show_boxes != self.show_boxes
         self.settings = settings
-        self.enabled = settings.get('debug', {}).get('enable_debug', False)
-        if self.enabled:
-            self.root = tk.Tk()
-            self.root.attributes("-topmost", True)
-            self.root.attributes("-alpha", 0.7)
-            self.root.overrideredirect(True)
-            self.root.geometry("300x200+10+10")
-            
-            self.hp_label = tk.Label(self.root, text="HP: --/--", font=("Arial", 12), bg="black", fg="white")
-            self.hp_label.pack()
-            self.mp_label = tk.Label(self.root, text="MP: --/--", font=("Arial", 12), bg="black", fg="white")
-            self.mp_label.pack()
-            self.pos_label = tk.Label(self.root, text="Pos: --,--", font=("Arial", 12), bg="black", fg="white")
-            self.pos_label.pack()
-            self.action_label = tk.Label(self.root, text="Action: Idle", font=("Arial", 12), bg="black", fg="white")
-            self.action_label.pack()
-        else:
-            self.root = None
+        self.enabled = bool(debug.get('enable_debug', False))
+        self.show_boxes = show_boxes
+        try:
+            self.fps = max(1.0, float(debug.get('overlay_fps', 10)))
+        except (TypeError, ValueError):
+            self.fps = 10.0
+        if not self.enabled:
+            self._latest = None
+        if self._thread is not None and (not self.enabled or relayout):
+            self.stop()
 
-    def update(self, hp_current, hp_max, mp_current, mp_max, char_x, char_y, action):
-        if self.enabled and self.root:
-            self.hp_label.config(text=f"HP: {hp_current}/{hp_max}")
-            self.mp_label.config(text=f"MP: {mp_current}/{mp_max}")
-            self.pos_label.config(text=f"Pos: {char_x},{char_y}")
-            self.action_label.config(text=f"Action: {action}")
-            self.root.update()
+    def publish(self, state: OverlayState):
+        if not self.enabled:
+            return
+        self._latest = state
+        if self._thread is None:
+            self.start()
+
+    def update(self, hp_current, hp_max, mp_current, mp_max, char_x, char_y, action, frame=None, detections=()):
+        if not self.enabled:
+            return
+        if frame is not None:
+            # Captures live in pooled buffers the bot overwrites; the overlay thread gets its own thumbnail
+            frame = cv2.resize(frame, PREVIEW_SIZE, interpolation=cv2.INTER_AREA) if self.show_boxes else None
+        self.publish(OverlayState(hp_current, hp_max, mp_current, mp_max, char_x, char_y, action, frame, tuple(detections)))
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self.run, name='debug-overlay', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop = True
 
     def run(self):
-        if self.enabled and self.root:
-            self.root.mainloop()
\ No newline at end of file
+        try:
+            # Imported here so headless runs never load Tk
+            import tkinter
+            self._tk = tkinter
+            self._build()
+            self._render()
+            self.root.mainloop()
+        except Exception as e:
+            # e.g. no display: stay disabled rather than retrying on every publish
+            logging.error(f"Debug overlay stopped: {e}")
+            self.enabled = False
+        finally:
+            self.root = None
+            if self._stop:
+                self._thread = None
+
+    def _build(self):
+        tk = self._tk
+        self.root = tk.Tk()
+        self.root.attributes("-topmost", True)
+        self.root.attributes("-alpha", 0.7)
+        self.root.overrideredirect(True)
+        self.root.geometry("300x200+10+10" if not self.show_boxes else "480x420+10+10")
+
+        self.hp_label = tk.Label(self.root, text="HP: --/--", font=("Arial", 12), bg="black", fg="white")
+        self.hp_label.pack()
+        self.mp_label = tk.Label(self.root, text="MP: --/--", font=("Arial", 12), bg="black", fg="white")
+        self.mp_label.pack()
+        self.pos_label = tk.Label(self.root, text="Pos: --,--", font=("Arial", 12), bg="black", fg="white")
+        self.pos_label.pack()
+        self.action_label = tk.Label(self.root, text="Action: Idle", font=("Arial", 12), bg="black", fg="white")
+        self.action_label.pack()
+        self.canvas = None
+        self._photo = None
+        if self.show_boxes:
+            self.canvas = tk.Canvas(self.root, width=PREVIEW_SIZE[0], height=PREVIEW_SIZE[1], bg='black', highlightthickness=0)
+            self.canvas.pack()
+
+    def _render(self):
+        if self._stop:
+            self.root.destroy()
+            return
+        state = self._latest
+        if state is not None and state is not self._rendered:
+            self._rendered = state
+            self.hp_label.config(text=f"HP: {state.hp_current}/{state.hp_max}")
+            self.mp_label.config(text=f"MP: {state.mp_current}/{state.mp_max}")
+            self.pos_label.config(text=f"Pos: {state.char_x},{state.char_y}")
+            self.action_label.config(text=f"Action: {state.action}")
+            if self.canvas is not None:
+                self._draw_detections(state)
+        self.root.after(int(1000 / self.fps), self._render)
+
+    def _draw_detections(self, state: OverlayState):
+        canvas = self.canvas
+        canvas.delete('all')
+        cw = int(canvas.cget('width'))
+        ch = int(canvas.cget('height'))
+        # Detections are in reference coordinates; map them onto the canvas
+        ref_w, ref_h = 1920, 1080
+        try:
+            ref_w, ref_h = map(int, str(self.settings.get('preconditions', {}).get('resolution', '1920x1080')).split('x'))
+        except ValueError:
+            pass
+        if state.frame is not None:
+            thumb = cv2.resize(state.frame, (cw, ch), interpolation=cv2.INTER_AREA)
+            ok, png = cv2.imencode('.png', thumb)
+            if ok:
+                self._photo = self._tk.PhotoImage(data=base64.b64encode(png.tobytes()))
+                canvas.create_image(0, 0, image=self._photo, anchor='nw')
+        sx, sy = cw / ref_w, ch / ref_h
+        for kind, x, y in state.detections:
+            (w, h), colour = BOX_STYLES.get(kind, ((40, 40), '#ffffff'))
+            canvas.create_rectangle(x * sx, y * sy, (x + w) * sx, (y + h) * sy, outline=colour, width=2)
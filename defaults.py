@@ -5,6 +5,7 @@ DEFAULT_SETTINGS = {
         "scaling": 100,
         "game_mode": "windowed",
         "chat_minimized": False,
+        "min_scale": 0.5,
         "verified": False
     },
     "auth": {"id": "", "password": ""},
@@ -36,9 +37,10 @@ DEFAULT_SETTINGS = {
         "chat_pixel_ratio": 0.002,
         "chat_colors": {"whisper": "#ff99ff", "normal": "#ffffff", "party": "#00ffcc"},
         "other_user_template": "assets/ui_elements/other_user.png",
-        "other_user_threshold": 0.75
+        "other_user_threshold": 0.75,
+        "wait_poll_hz": 5
     },
-    "movement": {"speed_factor": 117},
+    "movement": {"speed_factor": 117, "closed_loop": True, "brake_distance": 10, "arrive_tolerance": 20},
     "monsters": [
         "leftjoo.png",
         "rightjoo.png",
@@ -64,8 +66,11 @@ DEFAULT_SETTINGS = {
         "greenbu2.png"
     ],
     "monster_settings": {"nickname_recognition_rate": 0.8, "monster_recognition_rate": 0.8, "x_range": 200, "y_range": 60, "handle_opposite": True},
+    "targeting": {"attack_range": 120, "max_hits": 3, "cluster_gap": 80, "turn_seconds": 0.15},
     "routes": [],
     "buffs": [],
+    "channel": {"click_delay": 0.8, "menu_timeout": 5, "login_timeout": 300, "retries": 2, "list_region": None, "login_region": None},
+    "maintenance": {"pageup": 600, "home": 1800},
     "misc": {
         "hp_potion_percent": 50,
         "mp_potion_percent": 30,
@@ -81,6 +86,28 @@ DEFAULT_SETTINGS = {
         "stationary_direction": "right",
         "stationary_time": 30
     },
-    "ui": {"language": "en", "theme": "dark"},
-    "debug": {"enable_debug": False, "simulation_mode": False}
+    "ui": {"language": "en", "theme": "dark", "log_max_lines": 2000},
+    "world": {"rope_rescan_seconds": 300, "monster_full_scan_seconds": 1.5, "map_check_seconds": 10, "roi_padding": 40, "track_gate": 60, "track_max_misses": 2, "platform_settle_ticks": 3, "platform_min_span": 40},
+    "navigation": {"jump_height": 80, "climb_seconds": 3.5, "jump_seconds": 0.6, "drop_seconds": 0.8},
+    "governor": {
+        "enabled": True,
+        "cpu_budget": 0.5,
+        "main": {"active": 0.0, "idle": 0.5, "weight": 0.7},
+        "potion": {"active": 0.3, "idle": 1.5, "weight": 0.2},
+        "channel": {"active": 10, "idle": 20, "weight": 0.1}
+    },
+    "capture": {
+        "enabled": True,
+        "detector_intervals": {"enemy": 0.5, "lie": 1.0, "chat": 0, "other_user": 1.0, "top_floor": 1.0},
+        "character_pad": [350, 250],
+        "character_full_every": 10
+    },
+    "recorder": {"enabled": True, "seconds": 20, "scale": 0.25, "max_fps": 2, "keyframe_every": 10, "path": "logs/incidents", "cooldown": 60},
+    "telemetry": {"enabled": False, "host": "127.0.0.1", "port": 8765},
+    "metrics": {"enabled": True, "history_minutes": 120, "path": "logs/metrics.jsonl"},
+    "supervisor": {"window_title": "", "cpu_budget": 0.25, "stats_interval": 60, "max_sessions": 0},
+    "debug": {
+        "enable_debug": False, "simulation_mode": False, "overlay_fps": 10, "overlay_boxes": False,
+        "profile": False, "profile_hz": 50, "profile_dir": "logs/profiles", "profile_flush_seconds": 10
+    }
 }
@@ -0,0 +1,141 @@
+import collections
+import json
+import logging
+import queue
+import threading
+import time
+import traceback
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+
+class FlightRecorder:
+    """Bounded in-memory record of the last recorder.seconds of play, written out on incidents.
+
+    Every tick appends one entry: the perception results and action of that tick, plus a frame
+    when a new full capture was made (at most recorder.max_fps). Frames are downscaled by
+    recorder.scale and stored zlib-compressed as the XOR against the previous frame, with a
+    keyframe every recorder.keyframe_every frames, so a mostly static scene costs little RAM.
+    Nothing touches the disk until incident() is called; the dump is then decoded and written
+    by a background thread to recorder.path/<time>-<reason>/ as events.jsonl plus PNG frames.
+    """
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self._entries = collections.deque()
+        self._lock = threading.Lock()
+        self._previous = None
+        self._frames_since_key = 0
+        self._last_frame_at = 0.0
+        self._last_incident: Dict[str, float] = {}
+        self._queue = queue.Queue()
+        self._writer = None
+        self.dumps = 0
+
+    # --- recording (bot thread) ---------------------------------------------------------------
+    def record(self, tick: int, info: Dict[str, Any], frame=None, now: Optional[float] = None):
+        if not self.cfg.recorder_enabled:
+            return
+        now = now or time.time()
+        packed = None
+        if frame is not None and now - self._last_frame_at >= 1.0 / self.cfg.recorder_max_fps:
+            packed = self._pack(frame)
+            self._last_frame_at = now
+        with self._lock:
+            self._entries.append((now, tick, info, packed))
+            self._evict(now)
+
+    def _pack(self, frame):
+        scale = self.cfg.recorder_scale
+        small = cv2.resize(frame, (max(1, int(frame.shape[1] * scale)), max(1, int(frame.shape[0] * scale))),
+                           interpolation=cv2.INTER_AREA)
+        key = (self._previous is None or self._previous.shape != small.shape
+               or self._frames_since_key >= self.cfg.recorder_keyframe_every)
+        data = small if key else np.bitwise_xor(small, self._previous)
+        self._previous = small
+        self._frames_since_key = 0 if key else self._frames_since_key + 1
+        return key, small.shape, zlib.compress(data.tobytes(), 1)
+
+    def _evict(self, now: float):
+        entries = self._entries
+        horizon = now - self.cfg.recorder_seconds
+        while entries and entries[0][0] < horizon:
+            entries.popleft()
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(len(e[3][2]) for e in self._entries if e[3] is not None)
+
+    # --- incidents ----------------------------------------------------------------------------
+    def incident(self, reason: str, error: Optional[BaseException] = None, now: Optional[float] = None) -> bool:
+        """Queue a dump of the recording; repeats of a reason within recorder.cooldown are ignored."""
+        if not self.cfg.recorder_enabled:
+            return False
+        now = now or time.time()
+        if now - self._last_incident.get(reason, 0.0) < self.cfg.recorder_cooldown:
+            return False
+        self._last_incident[reason] = now
+        with self._lock:
+            entries = list(self._entries)
+        details = {'reason': reason, 'time': now, 'entries': len(entries)}
+        if error is not None:
+            details['error'] = repr(error)
+            details['traceback'] = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name='flight-recorder', daemon=True)
+            self._writer.start()
+        self._queue.put((details, entries))
+        return True
+
+    def _write_loop(self):
+        while True:
+            details, entries = self._queue.get()
+            try:
+                path = self.write(details, entries)
+                self.dumps += 1
+                logging.warning(f"Flight recorder: {details['reason']} dumped to {path}")
+            except Exception as e:
+                logging.error(f"Flight recorder dump failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def write(self, details: Dict[str, Any], entries: List[tuple]) -> Path:
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(details['time']))
+        directory = Path(self.cfg.recorder_path) / f"{stamp}-{details['reason']}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / 'incident.json').write_text(json.dumps(details, indent=2), encoding='utf-8')
+        previous = None
+        with (directory / 'events.jsonl').open('w', encoding='utf-8') as f:
+            for index, (t, tick, info, packed) in enumerate(entries):
+                event = {'t': t, 'tick': tick, **info, 'frame': None}
+                # Deltas recorded before the first remaining keyframe cannot be decoded
+                if packed is not None and (packed[0] or previous is not None):
+                    key, shape, blob = packed
+                    data = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(shape)
+                    previous = data if key else np.bitwise_xor(data, previous)
+                    event['frame'] = f"frame_{index:05d}.png"
+                    cv2.imwrite(str(directory / event['frame']), previous)
+                f.write(json.dumps(event, default=str) + '\n')
+        return directory
+
+    def flush(self, timeout: float = 10.0):
+        """Wait until queued dumps are written (used on stop and in tests)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+
+def read_incident(directory) -> List[Dict[str, Any]]:
+    """Events of a dumped incident, with 'image' holding the decoded frame (or None)."""
+    directory = Path(directory)
+    events = []
+    with (directory / 'events.jsonl').open('r', encoding='utf-8') as f:
+        for line in f:
+            event = json.loads(line)
+            event['image'] = cv2.imread(str(directory / event['frame'])) if event.get('frame') else None
+            events.append(event)
+    return events
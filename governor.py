@@ -0,0 +1,123 @@
+import contextlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Stop-flag polling granularity for wait(), so stop() never waits out a long idle interval
+WAIT_SLICE = 0.25
+
+# CPU seconds spent by other threads on behalf of each thread (the shared OCR worker)
+_charged = threading.local()
+
+
+def charge_cpu(seconds: float):
+    """Charge CPU time spent on another thread to the calling thread's loop."""
+    _charged.seconds = getattr(_charged, 'seconds', 0.0) + seconds
+
+
+def thread_cpu() -> float:
+    """CPU seconds of the calling thread, plus what other threads spent on its behalf."""
+    return time.thread_time() + getattr(_charged, 'seconds', 0.0)
+
+
+class _Subsystem:
+    __slots__ = ('name', 'active_interval', 'idle_interval', 'weight', 'cost', 'busy', 'activity', 'interval')
+
+    def __init__(self, name: str, active_interval: float, idle_interval: float, weight: float):
+        self.name = name
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.weight = weight
+        self.cost = 0.0      # EWMA of CPU seconds per tick, including work charged by charge_cpu()
+        self.busy = 0.0      # EWMA of wall seconds per tick
+        self.activity = 0.0  # 1.0 in combat / HP dropping, decays towards 0 when idle
+        self.interval = idle_interval
+
+
+class TickGovernor:
+    """Chooses the pause between ticks of each bot loop (main, potion, channel).
+
+    The pause is the larger of:
+      - an activity interval, interpolated between the subsystem's active and idle intervals
+        (activity jumps to 1 when the scene is busy and decays while it is quiet), and
+      - a budget interval, so that the subsystem's measured CPU cost stays within its weight's
+        share of governor.cpu_budget (fraction of one core for the whole bot).
+    """
+
+    ACTIVITY_DECAY = 0.7
+    SMOOTHING = 0.3
+
+    def __init__(self, cfg):
+        self._subsystems: Dict[str, _Subsystem] = {}
+        self._lock = threading.Lock()
+        self.apply(cfg)
+
+    def apply(self, cfg):
+        """(Re)configure from a CompiledSettings snapshot, keeping measured costs."""
+        self.enabled = cfg.governor_enabled
+        self.cpu_budget = cfg.governor_cpu_budget
+        with self._lock:
+            for name, active, idle, weight in cfg.governor_subsystems:
+                sub = self._subsystems.get(name)
+                if sub is None:
+                    self._subsystems[name] = _Subsystem(name, active, idle, weight)
+                else:
+                    sub.active_interval, sub.idle_interval, sub.weight = active, idle, weight
+
+    def _get(self, name: str) -> _Subsystem:
+        sub = self._subsystems.get(name)
+        if sub is None:
+            with self._lock:
+                sub = self._subsystems.setdefault(name, _Subsystem(name, 0.0, 1.0, 0.1))
+        return sub
+
+    @contextlib.contextmanager
+    def measure(self, name: str):
+        """Measure one tick of `name` (CPU time of the calling thread and of OCR/pool work it caused, and wall time)."""
+        wall = time.perf_counter()
+        cpu = thread_cpu()
+        try:
+            yield
+        finally:
+            sub = self._get(name)
+            a = self.SMOOTHING
+            sub.cost += a * ((thread_cpu() - cpu) - sub.cost)
+            sub.busy += a * ((time.perf_counter() - wall) - sub.busy)
+
+    def set_activity(self, name: str, active: bool):
+        sub = self._get(name)
+        sub.activity = 1.0 if active else sub.activity * self.ACTIVITY_DECAY
+
+    def interval(self, name: str) -> float:
+        sub = self._get(name)
+        if not self.enabled:
+            return sub.idle_interval
+        pause = sub.idle_interval + (sub.active_interval - sub.idle_interval) * sub.activity
+        share = self.cpu_budget * sub.weight
+        if 0 < share < 1 and sub.cost > 0:
+            # cost / (busy + pause) <= share
+            pause = max(pause, sub.cost / share - sub.busy)
+        pause = max(0.0, pause)
+        if abs(pause - sub.interval) > max(0.05, 0.25 * sub.interval):
+            logging.debug(f"Governor: {name} interval {sub.interval:.2f}s -> {pause:.2f}s "
+                          f"(cost {sub.cost * 1000:.0f}ms, activity {sub.activity:.2f})")
+        sub.interval = pause
+        return pause
+
+    def wait(self, name: str, should_stop: Optional[Callable[[], bool]] = None) -> float:
+        """Sleep for the current interval of `name`; returns the time actually waited."""
+        pause = self.interval(name)
+        deadline = time.monotonic() + pause
+        start = time.monotonic()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (should_stop is not None and should_stop()):
+                break
+            time.sleep(min(WAIT_SLICE, remaining))
+        return time.monotonic() - start
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: {'interval': s.interval, 'cost_ms': s.cost * 1000.0, 'busy_ms': s.busy * 1000.0,
+                       'activity': s.activity}
+                for name, s in self._subsystems.items()}
@@ -0,0 +1,105 @@
+import argparse
+import copy
+import logging
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from main import MapleBot, load_settings
+
+
+class HeadlessRunner:
+    """Start/stop lifecycle of the UI's Start and Stop buttons, without the UI.
+
+    run() starts the bot, waits until the duration is up, a stop is requested (Ctrl+C, SIGTERM)
+    or the bot stops itself (emergency detectors), then stops it. Alarms still beep and log;
+    there is just no popup to dismiss.
+    """
+
+    def __init__(self, bot: MapleBot):
+        self.bot = bot
+        self._stop_requested = False
+
+    def request_stop(self, *_):
+        self._stop_requested = True
+
+    def run(self, duration: Optional[float] = None, poll: float = 1.0) -> int:
+        """Returns 0 after a requested stop or the duration, 1 if start failed, 2 if the bot stopped itself."""
+        if not self.bot.start():
+            logging.error("Headless run: bot failed to start")
+            return 1
+        deadline = time.monotonic() + duration if duration else None
+        code = 0
+        try:
+            while not self._stop_requested:
+                if not self.bot.running:
+                    logging.warning("Headless run: bot stopped itself")
+                    code = 2
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    logging.info(f"Headless run: duration of {duration:.0f}s reached")
+                    break
+                time.sleep(poll)
+        except KeyboardInterrupt:
+            logging.info("Headless run: interrupted")
+        finally:
+            if self.bot.running:
+                self.bot.stop()
+            # Incident dumps are written in the background; let them finish before exiting
+            self.bot.recorder.flush()
+        totals = self.bot.metrics.totals()
+        logging.info(f"Headless run finished: {int(totals.get('ticks', 0))} ticks, "
+                     f"{int(totals.get('attacks', 0))} attacks, {int(totals.get('kills', 0))} kills")
+        return code
+
+
+def load_config(path: Path, window: Optional[str]) -> Dict[str, Any]:
+    settings = copy.deepcopy(load_settings(path))
+    if window:
+        settings.setdefault('ui', {})['game_window_title'] = window
+    return settings
+
+
+def setup_logging(level: str, log_file: Optional[str]):
+    fmt = '%(asctime)s - %(threadName)s - %(levelname)s - %(message)s'
+    if log_file:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(level=level, format=fmt, filename=log_file, encoding='utf-8')
+    else:
+        logging.basicConfig(level=level, format=fmt, stream=sys.stdout)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', default=str(Path(__file__).parent / 'config' / 'settings.json'),
+                        help='settings.json to use (created with defaults if missing)')
+    common.add_argument('--window', help='game window title (overrides ui.game_window_title)')
+    common.add_argument('--log-file', help='append logs to this file instead of stdout')
+    common.add_argument('--log-level', default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'))
+    parser = argparse.ArgumentParser(prog='python -m headless', description='Run MapleBot without the UI.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', parents=[common], help='start the bot and run until stopped')
+    run.add_argument('--duration', type=float, default=None, help='stop after this many seconds')
+    commands.add_parser('check', parents=[common], help='verify preconditions and exit')
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level, args.log_file)
+    settings = load_config(Path(args.config), args.window)
+    bot = MapleBot(settings)
+    if args.command == 'check':
+        issues = bot.verify_preconditions()
+        for issue in issues:
+            logging.error(f"Precondition failed: {issue}")
+        return 1 if issues else 0
+    runner = HeadlessRunner(bot)
+    signal.signal(signal.SIGTERM, runner.request_stop)
+    return runner.run(args.duration)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, NamedTuple
+
+# Cold-start budget for importing the bot (main / headless), in milliseconds
+DEFAULT_BUDGET_MS = 1500
+# Modules that must not load at import time; they are imported by the code paths that use them
+HEAVY_MODULES = ('easyocr', 'torch', 'customtkinter', 'tkinter', 'pyautogui')
+
+
+class ImportRow(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure(module: str = 'main', python: str = sys.executable) -> List[ImportRow]:
+    """Import `module` in a fresh interpreter under -X importtime and parse its report."""
+    proc = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'], capture_output=True,
+                          text=True, cwd=str(Path(__file__).parent))
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(f"import {module} failed: {lines[-1] if lines else proc.returncode}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # The name column is one space plus two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append(ImportRow(name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def total_ms(rows: List[ImportRow]) -> float:
+    return sum(r.cumulative_us for r in rows if r.depth == 0) / 1000.0
+
+
+def check(rows: List[ImportRow], budget_ms: float = DEFAULT_BUDGET_MS) -> List[str]:
+    """Problems with an import report: heavy modules on the import path, or over budget."""
+    problems = []
+    loaded = {r.name.split('.')[0] for r in rows}
+    for name in HEAVY_MODULES:
+        if name in loaded:
+            problems.append(f"{name} is imported at import time")
+    total = total_ms(rows)
+    if total > budget_ms:
+        problems.append(f"import took {total:.0f} ms, budget is {budget_ms:.0f} ms")
+    return problems
+
+
+def report(rows: List[ImportRow], top: int = 25) -> str:
+    lines = [f"{'cumulative ms':>14} {'self ms':>9}  module"]
+    for r in sorted(rows, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"{r.cumulative_us / 1000.0:14.1f} {r.self_us / 1000.0:9.1f}  {'  ' * r.depth}{r.name}")
+    lines.append(f"total: {total_ms(rows):.1f} ms over {len(rows)} modules")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Cumulative import cost per module of a bot entry point.')
+    parser.add_argument('module', nargs='?', default='main')
+    parser.add_argument('--top', type=int, default=25, help='rows to show')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help=f'fail if over this budget or a heavy module is imported (default budget {DEFAULT_BUDGET_MS})')
+    args = parser.parse_args(argv)
+    rows = measure(args.module)
+    print(report(rows, args.top))
+    if args.budget_ms is None:
+        return 0
+    problems = check(rows, args.budget_ms)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
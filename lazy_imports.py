@@ -0,0 +1,23 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """Return module `name`, deferring its execution until the first attribute access.
+
+    Uses importlib.util.LazyLoader, so importing a module that only needs pyautogui inside its
+    methods does not pay for pyautogui (and what it pulls in) at import time. Already imported
+    modules are returned as they are; a missing module still raises ImportError right away.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -51,6 +51,9 @@ LANGS = {
         'select_window': 'Select Game Window',
         'window_utils_not_supported': 'Window selection is only supported on Windows.',
         'no_windows_found': 'No visible windows found.',
+        'loading_windows': 'Loading windows...',
+        'loading_preview': 'Loading preview...',
+        'session_stats': 'Attacks/h: {attacks:.0f}\nKills/h: {kills:.0f}\nPotions/h: {potions:.0f}\nFighting: {fighting:.0%}\nWalking: {walking:.0%}',
         'no_window_selected': 'Please select a window first.',
         'invalid_selection': 'Invalid selection',
         'window_focused': 'Window focused successfully',
@@ -107,6 +110,9 @@ LANGS = {
         'select_window': '게임 창 선택',
         'window_utils_not_supported': '창 선택은 Windows에서만 지원됩니다.',
         'no_windows_found': '보이는 창이 없습니다.',
+        'loading_windows': '창 목록을 불러오는 중...',
+        'loading_preview': '미리보기를 불러오는 중...',
+        'session_stats': '공격/시간: {attacks:.0f}\n처치/시간: {kills:.0f}\n물약/시간: {potions:.0f}\n전투: {fighting:.0%}\n이동: {walking:.0%}',
         'no_window_selected': '먼저 창을 선택하세요.',
         'invalid_selection': '잘못된 선택',
         'window_focused': '창을 활성화했습니다',
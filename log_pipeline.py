@@ -0,0 +1,46 @@
+import collections
+import logging
+import threading
+from typing import List, Tuple
+
+
+class QueueLogHandler(logging.Handler):
+    """Log handler that only queues records; a consumer formats and displays them in batches.
+
+    emit() is a deque append, so bot threads never wait on the UI. Records below the handler
+    level are rejected by logging before emit() runs and are never formatted. When the consumer
+    falls behind, the oldest queued records are dropped (counted in `dropped`).
+    """
+
+    def __init__(self, level=logging.INFO, max_pending: int = 5000):
+        super().__init__(level)
+        self._records = collections.deque(maxlen=max_pending)
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+
+    def emit(self, record):
+        if len(self._records) == self._records.maxlen:
+            with self._drop_lock:
+                self.dropped += 1
+        self._records.append(record)
+
+    def drain(self, max_records: int = 500) -> List[Tuple[str, str]]:
+        """Pop up to max_records queued records and return them formatted as (levelname, text)."""
+        out = []
+        records = self._records
+        while records and len(out) < max_records:
+            try:
+                record = records.popleft()
+            except IndexError:
+                break
+            if record.levelno < self.level:
+                # level was raised after the record was queued
+                continue
+            try:
+                out.append((record.levelname, self.format(record)))
+            except Exception:
+                out.append((record.levelname, str(record.msg)))
+        return out
+
+    def pending(self) -> int:
+        return len(self._records)
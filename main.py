@@ -1,7 +1,8 @@
+import copy
 import json
 import threading
+import contextlib
 import time
-import pyautogui
 import platform
 import logging
 import random
@@ -13,9 +14,23 @@ from combat import CombatManager
 from movement import MovementManager
 from potion_manager import PotionManager
 from vision import Vision
-from ui import MapleBotUI
 from buff_manager import BuffManager
 from debug_overlay import DebugOverlay
+from world_model import WorldModel
+from navigation import Navigator
+from metrics import Metrics
+from governor import TickGovernor
+from scheduler import JobScheduler
+from channel_flow import ChannelChangeFlow
+from capture_planner import clip
+from lazy_imports import lazy_import
+from profiler import SamplingProfiler
+from telemetry import Telemetry
+from flight_recorder import FlightRecorder
+from compiled_settings import compile_settings
+from settings_store import apply_settings_diff, write_json_atomic
+
+pyautogui = lazy_import('pyautogui')
 
 
 def load_settings(path: Path):
@@ -23,9 +38,7 @@ def load_settings(path: Path):
     from defaults import DEFAULT_SETTINGS
     if not path.exists():
         try:
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with path.open('w', encoding='utf-8') as f:
-                json.dump(DEFAULT_SETTINGS, f, indent=4)
+            write_json_atomic(path, DEFAULT_SETTINGS)
             logging.info(f"Created default settings.json at {path}")
         except Exception as e:
             logging.error(f"Failed to create default settings file: {e}")
@@ -39,68 +52,139 @@ def load_settings(path: Path):
         return DEFAULT_SETTINGS.copy()
 
 
+class InputLock:
+    """Serializes keyboard/mouse input between bots that share a desktop.
+
+    Input goes to the foreground window, so only one bot may send it at a time. Any thread of the
+    bot that currently owns the lock goes ahead (a potion press during that bot's attack hold);
+    threads of other bots wait until every hold of the owner has ended.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._owner = None
+        self._holds = 0
+
+    @contextlib.contextmanager
+    def hold(self, owner):
+        with self._cond:
+            while self._owner is not None and self._owner is not owner:
+                self._cond.wait()
+            self._owner = owner
+            self._holds += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._holds -= 1
+                if not self._holds:
+                    self._owner = None
+                    self._cond.notify_all()
+
+
 class MapleBot:
-    def __init__(self, settings):
+    def __init__(self, settings, template_cache=None, ocr=None, hwnd=None, input_lock=None):
         self.settings = settings
-        self.vision = Vision(settings)
+        # Pre-parsed snapshot read by the hot loops; replaced wholesale by update_settings()
+        self.cfg = compile_settings(settings)
+        # hwnd pins this bot to one game window (multi-client); None keeps the single-client behaviour
+        self.hwnd = hwnd
+        # Keyboard/mouse input goes to the foreground window, so bots sharing a desktop share this lock.
+        # It is held only around key and click sequences, never around perception or OCR.
+        self.input_lock = input_lock or InputLock()
+        self.last_action = None
+        self.vision = Vision(settings, template_cache=template_cache, ocr=ocr, hwnd=hwnd)
         self.combat = CombatManager(settings, self.vision)
         self.movement = MovementManager(settings, self.vision)
         self.potion = PotionManager(settings, self.vision)
-        self.buff = BuffManager(settings)
+        # Buff casts and maintenance key presses, run in the gaps between actions
+        self.scheduler = JobScheduler()
+        self.buff = BuffManager(settings, self.scheduler)
+        self.schedule_maintenance()
         self.debug_overlay = DebugOverlay(settings)
         self.running = False
-        self.simulation_mode = settings.get('debug', {}).get('simulation_mode', False)
-        self.monster_paths = [Path(settings['vision']['assets_path']) / 'mob_templates' / img for img in settings['monsters']]
+        self.simulation_mode = self.cfg.simulation_mode
+        self.monster_paths = list(self.cfg.monster_paths)
+        # Perception state kept across ticks (rope memory per map, monster tracks)
+        self.world = WorldModel(self.vision, self.cfg, self.monster_paths)
+        self.combat.world = self.world
+        # Approaches to a target use the same closed-loop controller as walking
+        self.combat.controller = self.movement.controller
+        self.navigator = Navigator(self.world, self.cfg)
+        self.movement.navigator = self.navigator
+        # Productivity counters (attacks, kills, potions, time per action), persisted per minute
+        self.metrics = Metrics(settings)
+        for component in (self.combat, self.potion, self.buff, self.movement.controller):
+            component.metrics = self.metrics
+        for component in (self.combat, self.movement, self.potion, self.buff, self.movement.controller):
+            component.input_session = self.input_session
+        self.last_attack = None
+        self.world.on_track_lost = self._on_track_lost
+        # Paces the main, potion and channel loops from CPU cost and scene activity
+        self.governor = TickGovernor(self.cfg)
+        # Ticks run so far; annotates profiler samples
+        self.tick_count = 0
+        # Samples the bot threads when debug.profile is on; files are named after the metrics session
+        self.profiler = SamplingProfiler(self.cfg, self.metrics.session, lambda: self.tick_count)
+        # Local JSON endpoint with live counters (telemetry.enabled, off by default)
+        self.telemetry = Telemetry(self.cfg, ocr_depth=self.vision.ocr.pending)
+        # Recent frames, perception and actions kept in memory and dumped on incidents
+        self.recorder = FlightRecorder(self.cfg)
+        self.perception = {}
+        self.pending_incident = None
+        self._recorded_frame_time = 0.0
+        # Capture planning: when each detector last ran, and where the character was last seen
+        self._detector_runs = {}
+        self._char_seen = None
+        self._char_roi_ticks = 0
         # Routes and diversification
         self.routes = settings.get('routes', []) or []
         self.current_route = None
         self.route_selected_at = 0
-        self.route_switch_seconds = self.settings.get('misc', {}).get('route_switch_seconds', 300)
+        self.route_switch_seconds = self.cfg.route_switch_seconds
         if self.routes:
             self.select_random_route()
 
+    @contextlib.contextmanager
+    def input_session(self):
+        """Hold the shared input lock and make sure this bot's window has focus while sending input."""
+        with self.input_lock.hold(self):
+            if self.hwnd and not self.simulation_mode:
+                try:
+                    # Usually still ours from the previous action; skip the focus dance then
+                    if not window_utils.is_foreground(self.hwnd):
+                        window_utils.focus_window(self.hwnd)
+                except Exception as e:
+                    logging.debug(f"Could not focus game window {self.hwnd}: {e}")
+            yield
+
+    def click(self, x, y):
+        """Click at window-relative coordinates."""
+        with self.input_session():
+            pyautogui.click(*self.vision.to_screen(x, y))
+
     def change_channel(self):
         logging.info("Starting channel change procedure")
-        time.sleep(3.0)
-        pyautogui.click(1681, 98)
-        time.sleep(1.5)
-        pyautogui.click(1681, 175)
-        time.sleep(1.5)
-        ch_path = Path(self.settings['vision']['assets_path']) / 'ui_elements' / 'ch.png'
-        loc = pyautogui.locateOnScreen(str(ch_path), confidence=0.7)
-        if loc:
-            pyautogui.click(pyautogui.center(loc))
-        time.sleep(1.5)
-        pyautogui.click(1081, 714)
-        time.sleep(1.5)
-        pyautogui.click(1072, 635)
-        time.sleep(180)
-        mainch_path = Path(self.settings['vision']['assets_path']) / 'ui_elements' / 'mainch.png'
-        while True:
-            loc = pyautogui.locateOnScreen(str(mainch_path), confidence=0.7)
-            if loc:
-                pyautogui.click(979, 709)
-                time.sleep(5)
-                pyautogui.click(579, 805)
-                logging.info("Channel change completed successfully")
-                break
-            else:
-                logging.debug("Waiting for main channel screen...")
-                time.sleep(30)
+        return ChannelChangeFlow(self).run()
 
     def check_for_channel_change(self):
         logging.info("Channel change monitoring thread started")
         while self.running:
-            if self.vision.detect_user():
+            with self.governor.measure('channel'), self.telemetry.timed('user'):
+                user_detected = self.vision.detect_user()
+            if user_detected:
                 logging.warning("User detected, changing channel")
                 self.change_channel()
-            time.sleep(10)
+            self.governor.set_activity('channel', self.in_combat())
+            self.governor.wait('channel', lambda: not self.running)
 
     def potion_thread(self):
         logging.info("Potion monitoring thread started")
         while self.running:
-            self.potion.check_and_use()
-            time.sleep(1)
+            with self.governor.measure('potion'), self.telemetry.timed('hp_mp'):
+                self.potion.check_and_use()
+            self.governor.set_activity('potion', self.potion.hp_dropping or self.in_combat())
+            self.governor.wait('potion', lambda: not self.running)
 
     def select_random_route(self):
         if not self.routes:
@@ -108,6 +192,8 @@ class MapleBot:
             return
         self.current_route = random.choice(self.routes)
         self.route_selected_at = time.time()
+        self.world.set_route(self.current_route)
+        self.navigator.set_route(self.current_route)
         logging.info(f"Selected autoplay route: {self.current_route.get('name','<unnamed>')}")
 
     def execute_route_step(self, char_x, char_y, char_left):
@@ -119,11 +205,11 @@ class MapleBot:
 
         left = int(self.current_route.get('left_boundary', 400))
         right = int(self.current_route.get('right_boundary', 1520))
-        # pick a random x within boundaries to move to
-        target_x = random.randint(left, right)
-        logging.debug(f"Route step: moving to x={target_x} within [{left},{right}]")
+        target_x, target_y = self.pick_route_target(char_x, char_y, left, right)
+        logging.debug(f"Route step: navigating to ({target_x}, {target_y}) within [{left},{right}]")
         try:
-            self.movement.move_character(char_x, target_x, char_left)
+            if not self.movement.navigate_to(target_x, target_y, char_x, char_y, char_left):
+                self.movement.move_character(char_x, target_x, char_left, char_y)
         except Exception:
             try:
                 self.movement.patrol()
@@ -132,6 +218,19 @@ class MapleBot:
         # random small pause to emulate thinking
         time.sleep(random.uniform(0.8, 2.5))
 
+    def pick_route_target(self, char_x, char_y, left, right):
+        """Cheapest-to-reach tracked monster inside the route bounds, else a random point on a known platform."""
+        candidates = [(t.x, t.y) for t in self.world.tracks.values() if left <= t.x <= right]
+        if candidates:
+            return min(candidates, key=lambda p: self.navigator.cost((char_x, char_y), p))
+        graph = self.navigator.graph()
+        platforms = [p for p in graph.platforms if p[1] <= right and p[2] >= left] if graph else []
+        if platforms:
+            y, x_min, x_max = random.choice(platforms)
+            return random.randint(max(left, x_min), min(right, x_max)), y
+        # pick a random x within boundaries to move to
+        return random.randint(left, right), char_y
+
     def simulate_or_execute(self, action_desc, func, *args, **kwargs):
         if self.simulation_mode:
             logging.info(f"SIMULATION: {action_desc}")
@@ -141,39 +240,38 @@ class MapleBot:
     def move_to_top_floor(self, char_x, char_y, char_left):
         """Attempt to move the character to a configured top-floor target and jump up if needed."""
         try:
-            target_x = None
-            cfg = self.settings.get('vision', {})
-            if 'top_floor_target_x' in cfg:
-                target_x = int(cfg.get('top_floor_target_x'))
-            elif 'top_floor_template' in cfg and cfg.get('top_floor_template'):
+            target_x = self.cfg.top_floor_target_x
+            if target_x is None:
                 # try to find the top-floor template on screen
-                locs = self.vision.find_template(cfg.get('top_floor_template'))
+                locs = self.vision.find_template(str(self.cfg.top_floor_template))
                 if locs:
                     target_x = locs[0][0]
-            # Fallback: move to screen center
+            # Fallback: move to the center of the game view
             if target_x is None:
-                w, h = pyautogui.size()
+                w, h = self.vision.frame_size()
                 target_x = int(w // 2)
 
             logging.info(f"Moving to top-floor target x={target_x}")
             self.movement.move_character(char_x, target_x, char_left)
             # attempt to jump up onto the top floor (up + alt)
-            pyautogui.keyDown('up')
-            pyautogui.keyDown('alt')
-            time.sleep(0.6)
-            pyautogui.keyUp('up')
-            pyautogui.keyUp('alt')
+            with self.input_session():
+                pyautogui.keyDown('up')
+                pyautogui.keyDown('alt')
+                time.sleep(0.6)
+                pyautogui.keyUp('up')
+                pyautogui.keyUp('alt')
         except Exception as e:
             logging.error(f"Failed to move to top floor: {e}")
 
     def escape_top_floor(self):
         """Perform downward jump (down + alt) to escape the top floor."""
         try:
-            pyautogui.keyDown('down')
-            pyautogui.keyDown('alt')
-            time.sleep(0.7)
-            pyautogui.keyUp('down')
-            pyautogui.keyUp('alt')
+            with self.input_session():
+                pyautogui.keyDown('down')
+                pyautogui.keyDown('alt')
+                time.sleep(0.7)
+                pyautogui.keyUp('down')
+                pyautogui.keyUp('alt')
         except Exception as e:
             logging.error(f"Failed to perform top-floor escape: {e}")
 
@@ -181,116 +279,317 @@ class MapleBot:
         logging.info("Main logic thread started")
         while self.running:
             try:
-                # Check for anti-auto-play enemy indicator (highest priority)
-                if self.settings.get('misc', {}).get('enemy_detector', False):
-                    if self.vision.detect_enemy_detector():
-                        logging.error("Anti-auto-play enemy detected — emergency stop")
-                        # Stop the bot immediately; other threads check self.running
-                        self.stop()
-                        # Trigger an emergency alarm/popup
-                        self.trigger_enemy_alarm()
-                        # break out of loop since running is now False
-                        break
-
-                # Check for lie detector overlay next
-                if self.settings.get('misc', {}).get('lie_detector', False):
-                    if self.vision.detect_lie_detector():
-                        logging.warning("Lie detector detected — triggering alarm")
-                        self.trigger_lie_alarm()
-                        # give a short pause to avoid spamming
-                        time.sleep(1)
-                        continue
-                # Check for chat events (whispers/colored chat)
-                if self.settings.get('misc', {}).get('chat_detector', False):
-                    chat_found, chat_label = self.vision.detect_chat_event()
-                    if chat_found:
-                        logging.warning(f"Chat event ({chat_label}) detected — emergency stop")
-                        self.stop()
-                        self.trigger_chat_alarm(chat_label)
-                        break
-
-                # Check for other users on map
-                if self.settings.get('misc', {}).get('other_user_detector', False):
-                    if self.vision.detect_other_user():
-                        logging.error("Other user detected on map — emergency stop")
-                        self.stop()
-                        self.trigger_other_user_alarm()
-                        break
-                char_x, char_y, char_left = self.vision.find_character_coordinates()
-                if char_x is None:
-                    logging.warning("Character not found, attempting to locate")
-                    pyautogui.keyDown("left")
-                    pyautogui.keyDown("alt")
-                    time.sleep(3)
-                    pyautogui.keyUp("left")
-                    pyautogui.keyUp("alt")
-                    pyautogui.keyDown("right")
-                    pyautogui.keyDown("alt")
-                    time.sleep(3)
-                    pyautogui.keyUp("right")
-                    pyautogui.keyUp("alt")
-                    continue
-
-                logging.debug(f"Character at ({char_x}, {char_y}), direction: {'left' if char_left else 'right'}")
-                # Top-floor stoppage handling: if player falls into end-block zones, attempt to move to top floor
-                if self.settings.get('misc', {}).get('top_floor_stoppage', False):
-                    try:
-                        if self.vision.detect_map_ends_blocked():
-                            logging.info("Detected map ends blocked - moving to top floor target")
-                            self.move_to_top_floor(char_x, char_y, char_left)
-                            # after handling, skip further actions this tick
-                            time.sleep(1)
-                            continue
-                        # If currently on top floor, automatically attempt downward jump to escape
-                        if self.vision.detect_top_floor():
-                            logging.info("On top floor - performing down+alt escape")
-                            self.escape_top_floor()
-                            time.sleep(1)
-                            continue
-                    except Exception:
-                        pass
-                monster = self.combat.find_targets(self.monster_paths, char_y, char_x, char_left)
-                if monster:
-                    logging.info(f"Monster found at {monster}, attacking")
-                    self.combat.attack(monster, char_x, char_left)
-                else:
-                    logging.debug("No monster found, checking for ropes")
-                    ropes = self.vision.find_ropes(char_y)
-                    if ropes:
-                        closest_rope = min(ropes, key=lambda r: abs(char_x - r[0]))
-                        logging.info(f"Rope found at {closest_rope}, climbing")
-                        self.movement.climb_rope(closest_rope[0], closest_rope[1], char_x, char_left)
-                    else:
-                        logging.debug("No ropes found, executing route or patrol")
-                        # Route diversification: periodically switch routes
-                        try:
-                            if self.routes and (time.time() - self.route_selected_at) > self.route_switch_seconds:
-                                self.select_random_route()
-                        except Exception:
-                            pass
-                        # Execute a route step (will fallback to patrol)
-                        try:
-                            self.execute_route_step(char_x, char_y, char_left)
-                        except Exception:
-                            try:
-                                self.movement.patrol()
-                            except Exception:
-                                pass
-
-                hp_current, hp_max, mp_current, mp_max = self.vision.read_hp_mp()
-                self.debug_overlay.update(hp_current, hp_max, mp_current, mp_max, char_x, char_y, "Searching for monsters")
-
-                if time.localtime().tm_min % 10 == 0 and time.localtime().tm_sec < 11:
-                    logging.info("Performing 10-minute maintenance (page up)")
-                    pyautogui.press('pageup')
-                if time.localtime().tm_min % 30 == 0 and time.localtime().tm_sec < 11:
-                    logging.info("Performing 30-minute maintenance (home)")
-                    pyautogui.press('home')
+                with self.governor.measure('main'):
+                    keep_running = self.run_tick()
+                if not keep_running:
+                    break
+                self.governor.set_activity('main', self.in_combat())
+                self.governor.wait('main', lambda: not self.running)
             except Exception as e:
                 logging.error(f"Error in main logic: {e}")
                 time.sleep(5)
 
-    def start(self):
+    def schedule_maintenance(self):
+        """(Re)register the periodic maintenance presses from cfg.maintenance_periods (settings['maintenance'])."""
+        periods = dict(self.cfg.maintenance_periods)
+        for name in self.scheduler.names():
+            if name.startswith('maintenance:') and name[len('maintenance:'):] not in periods:
+                self.scheduler.remove(name)
+        for key, period in periods.items():
+            name = f'maintenance:{key}'
+            job = self.scheduler.get(name)
+            if period <= 0:
+                # Disabled: a job registered under an earlier period must stop firing
+                if job is not None:
+                    self.scheduler.remove(name)
+                continue
+            if job is not None and job.period == period:
+                continue
+            self.scheduler.add(name, period, self._maintenance_press(key), align=True)
+
+    def _maintenance_press(self, key):
+        def press():
+            logging.info(f"Performing maintenance ({key})")
+            with self.input_session():
+                pyautogui.press(key)
+        return press
+
+    def in_combat(self) -> bool:
+        """Scene activity for the tick governor: monsters tracked or an attack just happened."""
+        return bool(self.world.tracks) or self.last_action == 'attack'
+
+    def run_tick(self):
+        """Run one perception/decision/action pass. Returns False when the loop must stop."""
+        started = time.monotonic()
+        self.tick_count += 1
+        captured = dict(self.vision.capture_stats)
+        allocations = self.vision.buffers.allocations
+        self.perception = {}
+        error = None
+        try:
+            keep_running = self._tick()
+            if keep_running and self.running:
+                # Idle gap after the action: buffs and maintenance presses that are due
+                self.scheduler.run_due()
+            return keep_running
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.vision.end_frame()
+            self.record_flight(error)
+            if self.last_action not in ('search', 'attack'):
+                # Moved too far (or lost) for the character ROI to be trusted next tick
+                self._char_seen = None
+            stats = self.vision.capture_stats
+            self.metrics.incr('grabs', stats['grabs'] - captured['grabs'])
+            self.telemetry.record_tick(self.last_action, stats['grabs'] - captured['grabs'])
+            self.metrics.incr('capture_kb', (stats['bytes'] - captured['bytes']) / 1024.0)
+            allocations = self.vision.buffers.allocations - allocations
+            if allocations:
+                # Expected while the pool's blocks grow; a steady stream means something bypasses the pool
+                logging.debug(f"Tick allocated {allocations} new image buffer(s); pool: {self.vision.buffers.stats()}")
+                self.metrics.incr('buffer_allocs', allocations)
+            self.metrics.record_tick(self.last_action, time.monotonic() - started)
+
+    def record_flight(self, error=None):
+        """Add this tick to the flight recorder and dump it if the tick raised or flagged an incident."""
+        vision = self.vision
+        frame = None
+        if vision.last_frame_time != self._recorded_frame_time:
+            frame = vision.last_frame
+            self._recorded_frame_time = vision.last_frame_time
+        self.recorder.record(self.tick_count, dict(self.perception, action=self.last_action), frame)
+        if error is not None:
+            self.recorder.incident('exception', error)
+        if self.pending_incident:
+            self.recorder.incident(self.pending_incident)
+            self.pending_incident = None
+
+    def due_detectors(self, now: float):
+        """Enabled screen detectors whose capture.detector_intervals have elapsed; marks them as run."""
+        cfg = self.cfg
+        enabled = {
+            'enemy': cfg.enemy_detector, 'lie': cfg.lie_detector, 'chat': cfg.chat_detector,
+            'other_user': cfg.other_user_detector, 'top_floor': cfg.top_floor_stoppage,
+        }
+        due = set()
+        for name, interval in cfg.capture_detector_intervals:
+            if enabled[name] and now - self._detector_runs.get(name, 0.0) >= interval:
+                self._detector_runs[name] = now
+                due.add(name)
+        return due
+
+    def character_region(self):
+        """Where to look for the character: around its last position, or None for the whole view."""
+        if self._char_seen is None or self._char_roi_ticks >= self.cfg.capture_character_full_every:
+            return None
+        pad_x, pad_y = self.cfg.capture_character_pad
+        x, y = self._char_seen
+        return clip((x - pad_x, y - pad_y, 2 * pad_x, 2 * pad_y), self.vision.frame_size())
+
+    def plan_capture(self, due, now: float):
+        """Reference regions this tick will read (None = whole view), for Vision.begin_frame()."""
+        regions = []
+        for name in due:
+            if name == 'chat':
+                regions.append(self.cfg.chat_region)
+            elif name == 'top_floor':
+                regions.extend(self.vision.map_end_regions())
+                regions.append(None)
+            else:
+                regions.append(None)
+        regions.append(self.character_region())
+        regions.extend(self.world.planned_regions(now))
+        return regions
+
+    def find_character(self):
+        """Character lookup in the ROI around the last position, falling back to the whole view."""
+        region = self.character_region()
+        if region is not None:
+            char_x, char_y, char_left = self.vision.find_character_coordinates(region)
+            if char_x is not None:
+                self._char_roi_ticks += 1
+                self._char_seen = (char_x, char_y)
+                return char_x, char_y, char_left
+        char_x, char_y, char_left = self.vision.find_character_coordinates()
+        self._char_roi_ticks = 0
+        self._char_seen = (char_x, char_y) if char_x is not None else None
+        return char_x, char_y, char_left
+
+    def _on_track_lost(self, track):
+        """Count a monster as killed when its track disappears right where we just attacked."""
+        if self.last_attack is None:
+            return
+        attacked_at, x, y = self.last_attack
+        if time.monotonic() - attacked_at < 8 and abs(track.x - x) <= self.cfg.target_attack_range + 60 \
+                and abs(track.y - y) < self.cfg.y_range:
+            self.metrics.incr('kills')
+
+    def _tick(self):
+        self.last_action = 'search'
+        cfg = self.cfg
+        now = time.monotonic()
+        due = self.due_detectors(now)
+        self.perception['due'] = sorted(due)
+        if cfg.capture_planning:
+            # One set of grabs for everything read before the first action of this tick
+            with self.telemetry.timed('capture'):
+                self.vision.begin_frame(self.plan_capture(due, now))
+        # Check for anti-auto-play enemy indicator (highest priority)
+        if 'enemy' in due:
+            with self.telemetry.timed('enemy'):
+                enemy_found = self.vision.detect_enemy_detector()
+            if enemy_found:
+                logging.error("Anti-auto-play enemy detected — emergency stop")
+                # Stop the bot immediately; other threads check self.running
+                self.stop()
+                # Trigger an emergency alarm/popup
+                self.trigger_enemy_alarm()
+                # break out of loop since running is now False
+                return False
+
+        # Check for lie detector overlay next
+        if 'lie' in due:
+            with self.telemetry.timed('lie'):
+                lie_found = self.vision.detect_lie_detector()
+            if lie_found:
+                logging.warning("Lie detector detected — triggering alarm")
+                self.trigger_lie_alarm()
+                # give a short pause to avoid spamming
+                time.sleep(1)
+                return True
+        # Check for chat events (whispers/colored chat)
+        if 'chat' in due:
+            with self.telemetry.timed('chat'):
+                chat_found, chat_label = self.vision.detect_chat_event()
+            if chat_found:
+                logging.warning(f"Chat event ({chat_label}) detected — emergency stop")
+                self.stop()
+                self.trigger_chat_alarm(chat_label)
+                return False
+
+        # Check for other users on map
+        if 'other_user' in due:
+            with self.telemetry.timed('other_user'):
+                other_found = self.vision.detect_other_user()
+            if other_found:
+                logging.error("Other user detected on map — emergency stop")
+                self.stop()
+                self.trigger_other_user_alarm()
+                return False
+        with self.telemetry.timed('character'):
+            char_x, char_y, char_left = self.find_character() if cfg.capture_planning \
+                else self.vision.find_character_coordinates()
+        if char_x is None:
+            logging.warning("Character not found, attempting to locate")
+            self.last_action = 'locate'
+            self.pending_incident = 'character_lost'
+            self.metrics.incr('character_lost')
+            self.vision.end_frame()
+            with self.input_session():
+                pyautogui.keyDown("left")
+                pyautogui.keyDown("alt")
+                time.sleep(3)
+                pyautogui.keyUp("left")
+                pyautogui.keyUp("alt")
+                pyautogui.keyDown("right")
+                pyautogui.keyDown("alt")
+                time.sleep(3)
+                pyautogui.keyUp("right")
+                pyautogui.keyUp("alt")
+            return True
+
+        logging.debug(f"Character at ({char_x}, {char_y}), direction: {'left' if char_left else 'right'}")
+        self.perception['character'] = [char_x, char_y, char_left]
+        with self.telemetry.timed('world'):
+            self.world.check_map()
+        self.world.observe_character(char_x, char_y)
+        # Top-floor stoppage handling: if player falls into end-block zones, attempt to move to top floor
+        if 'top_floor' in due:
+            try:
+                with self.telemetry.timed('top_floor'):
+                    blocked = self.vision.detect_map_ends_blocked()
+                    on_top_floor = not blocked and self.vision.detect_top_floor()
+                if blocked:
+                    logging.info("Detected map ends blocked - moving to top floor target")
+                    self.last_action = 'top_floor'
+                    self.vision.end_frame()
+                    self.move_to_top_floor(char_x, char_y, char_left)
+                    # after handling, skip further actions this tick
+                    time.sleep(1)
+                    return True
+                # If currently on top floor, automatically attempt downward jump to escape
+                if on_top_floor:
+                    logging.info("On top floor - performing down+alt escape")
+                    self.last_action = 'top_floor'
+                    self.vision.end_frame()
+                    self.escape_top_floor()
+                    time.sleep(1)
+                    return True
+            except Exception:
+                pass
+        with self.telemetry.timed('world'):
+            self.world.update_monsters(now)
+        with self.telemetry.timed('targets'):
+            monster = self.combat.find_targets(self.monster_paths, char_y, char_x, char_left)
+        self.perception['monsters'] = self.world.monster_points()
+        self.perception['target'] = list(monster) if monster else None
+        ropes = []
+        if monster:
+            logging.info(f"Monster found at {monster}, attacking")
+            self.last_action = 'attack'
+            self.vision.end_frame()
+            # Run jobs now rather than have them come due during the attack sequence
+            self.scheduler.run_due(lead=cfg.key_down_time + cfg.attack_delay)
+            self.combat.attack(monster, char_x, char_left, char_y)
+            self.last_attack = (time.monotonic(), monster[0], monster[1])
+        else:
+            logging.debug("No monster found, checking for ropes")
+            ropes = self.world.ropes(char_y)
+            closest_rope = min(ropes, key=lambda r: abs(char_x - r[0])) if ropes else None
+            if closest_rope and not self.world.confirm_rope(closest_rope):
+                ropes = self.world.ropes(char_y)
+                closest_rope = min(ropes, key=lambda r: abs(char_x - r[0])) if ropes else None
+            self.vision.end_frame()
+            self.perception['rope'] = list(closest_rope) if closest_rope else None
+            if closest_rope:
+                logging.info(f"Rope found at {closest_rope}, climbing")
+                self.last_action = 'rope'
+                self.movement.climb_rope(closest_rope[0], closest_rope[1], char_x, char_left, char_y)
+            else:
+                logging.debug("No ropes found, executing route or patrol")
+                self.last_action = 'route'
+                # Route diversification: periodically switch routes
+                try:
+                    if self.routes and (time.time() - self.route_selected_at) > self.route_switch_seconds:
+                        self.select_random_route()
+                except Exception:
+                    pass
+                # Execute a route step (will fallback to patrol)
+                try:
+                    self.execute_route_step(char_x, char_y, char_left)
+                except Exception:
+                    try:
+                        self.movement.patrol()
+                    except Exception:
+                        pass
+
+        if self.debug_overlay.enabled:
+            # Overlay renders on its own thread; this only publishes the latest state
+            hp_current, hp_max, mp_current, mp_max = self.vision.read_hp_mp()
+            detections = [('character', char_x, char_y)]
+            detections.extend(('monster', x, y) for x, y in self.world.monster_points())
+            if monster:
+                detections.append(('target', monster[0], monster[1]))
+            detections.extend(('rope', r[0], r[1]) for r in ropes)
+            self.debug_overlay.update(hp_current, hp_max, mp_current, mp_max, char_x, char_y, self.last_action,
+                                      frame=self.vision.last_frame, detections=detections)
+
+        return True
+
+    def start(self, run_main_loop=True):
+        """Start the bot threads. A supervisor driving run_tick() itself passes run_main_loop=False."""
         logging.info("Attempting to start MapleBot")
         # Preconditions check (UI triggers auto-detect/focus before calling start)
         issues = self.verify_preconditions()
@@ -300,34 +599,75 @@ class MapleBot:
             return False
         logging.info("Preconditions passed, starting bot threads")
         self.settings['preconditions']['verified'] = True
+        # Resize every template for the detected game scale once, before the loops start
+        self.vision.detect_scale()
+        loaded = self.vision.preload_templates(self.monster_paths)
+        logging.info(f"Prepared {loaded} templates at scale {self.vision.scale:.3f}")
         self.running = True
-        threading.Thread(target=self.check_for_channel_change, daemon=True).start()
-        threading.Thread(target=self.potion_thread, daemon=True).start()
-        threading.Thread(target=self.main_logic, daemon=True).start()
+        loops = [self.check_for_channel_change, self.potion_thread]
+        if run_main_loop:
+            loops.append(self.main_logic)
+        for loop in loops:
+            thread = threading.Thread(target=loop, name=loop.__name__, daemon=True)
+            thread.start()
+            self.profiler.watch(thread)
+        self.profiler.apply(self.cfg, active=True)
+        self.telemetry.apply(self.cfg)
         logging.info("MapleBot started successfully")
         return True
 
     def stop(self):
         logging.info("Stopping MapleBot")
         self.running = False
+        self.debug_overlay.stop()
+        self.profiler.stop()
+        self.telemetry.stop()
+        self.metrics.close()
 
     def update_settings(self, new_settings):
+        # Compile first so a bad value never leaves components half-updated; each component
+        # then swaps to the new snapshot with a single attribute assignment.
+        cfg = compile_settings(new_settings)
         self.settings = new_settings
+        self.cfg = cfg
+        self.simulation_mode = cfg.simulation_mode
+        self.monster_paths = list(cfg.monster_paths)
+        self.route_switch_seconds = cfg.route_switch_seconds
         # Update components that use settings
-        self.vision.settings = new_settings
-        self.combat.settings = new_settings
-        self.movement.settings = new_settings
-        self.potion.settings = new_settings
+        for component in (self.vision, self.combat, self.movement, self.potion):
+            component.settings = new_settings
+            component.cfg = cfg
+        self.world.cfg = cfg
+        self.movement.controller.cfg = cfg
+        self.governor.apply(cfg)
+        self.profiler.apply(cfg, active=self.running)
+        self.recorder.cfg = cfg
+        if self.running:
+            self.telemetry.apply(cfg)
+        self.navigator.cfg = cfg
+        # Link costs depend on the movement settings
+        self.navigator.set_route(self.current_route)
+        if self.world.monster_paths != self.monster_paths:
+            # Track template indices refer to the old list
+            self.world.monster_paths = list(self.monster_paths)
+            self.world.tracks.clear()
         self.buff.settings = new_settings
-        self.debug_overlay.settings = new_settings
+        self.buff.sync_jobs()
+        self.schedule_maintenance()
+        self.debug_overlay.apply(new_settings)
         logging.info("Settings updated in real-time")
 
+    def apply_settings_diff(self, diff):
+        """Apply a settings diff (as produced by SettingsStore) on top of the current settings."""
+        self.update_settings(apply_settings_diff(self.settings, diff))
+
     def trigger_lie_alarm(self):
         """Trigger alarm: play sound and show popup via UI if available. Non-blocking."""
         if getattr(self, 'alarm_active', False):
             logging.debug("Alarm already active")
             return
         self.alarm_active = True
+        self.pending_incident = 'lie_alarm'
         logging.warning("Triggering lie detector alarm")
 
         # Start beep thread
@@ -364,6 +704,7 @@ class MapleBot:
             logging.debug("Enemy alarm already active")
             return
         self.enemy_alarm_active = True
+        self.pending_incident = 'enemy_alarm'
         logging.critical("Triggering ENEMY emergency alarm — stop all automation")
 
         # Start beep thread (higher urgency tone)
@@ -396,6 +737,7 @@ class MapleBot:
             logging.debug("Chat alarm already active")
             return
         self.chat_alarm_active = True
+        self.pending_incident = 'chat_alarm'
         logging.critical(f"Triggering CHAT alarm ({chat_label})")
 
         def beep_loop_chat():
@@ -435,6 +777,7 @@ class MapleBot:
             logging.debug("Other-user alarm already active")
             return
         self.other_user_alarm_active = True
+        self.pending_incident = 'other_user_alarm'
         logging.critical("Triggering OTHER-USER alarm — other player on map")
 
         def beep_loop_other():
@@ -481,15 +824,23 @@ class MapleBot:
             issues.append(f"OS must be {expected_os}, current: {platform.system()}")
             logging.warning(f"Precondition failed: OS mismatch - expected {expected_os}, got {platform.system()}")
         
+        # The configured resolution is the reference the templates were authored for. Vision scales
+        # to the actual game view, so any size with the same aspect ratio above min_scale is accepted.
         expected_resolution = self.settings['preconditions'].get('resolution', '1920x1080')
         try:
             width, height = map(int, expected_resolution.split('x'))
-            screen_size = pyautogui.size()
-            if screen_size != (width, height):
-                issues.append(f"Resolution must be {expected_resolution}, current: {screen_size[0]}x{screen_size[1]}")
-                logging.warning(f"Precondition failed: Resolution mismatch - expected {expected_resolution}, got {screen_size[0]}x{screen_size[1]}")
+            view_w, view_h = self.vision.client_size()
+            scale = min(view_w / width, view_h / height)
+            aspect_error = abs((view_w / view_h) / (width / height) - 1.0)
+            min_scale = float(self.settings['preconditions'].get('min_scale', 0.5))
+            if aspect_error > 0.02:
+                issues.append(f"Aspect ratio must match {expected_resolution}, current: {view_w}x{view_h}")
+                logging.warning(f"Precondition failed: Aspect ratio mismatch - expected {expected_resolution}, got {view_w}x{view_h}")
+            elif scale < min_scale:
+                issues.append(f"Game view {view_w}x{view_h} is below the minimum scale {min_scale:.2f} of {expected_resolution}")
+                logging.warning(f"Precondition failed: Game view {view_w}x{view_h} too small (scale {scale:.2f} < {min_scale:.2f})")
             else:
-                logging.info(f"Precondition passed: Resolution {expected_resolution}")
+                logging.info(f"Precondition passed: Game view {view_w}x{view_h} (scale {scale:.2f} of {expected_resolution})")
         except ValueError:
             issues.append(f"Invalid resolution format: {expected_resolution}")
             logging.error(f"Precondition error: Invalid resolution format {expected_resolution}")
@@ -502,16 +853,21 @@ class MapleBot:
         # If user configured a specific game window, ensure it exists and attempt to focus it
         try:
             game_win_title = self.settings.get('ui', {}).get('game_window_title')
+            if self.hwnd:
+                # Supervised sessions are already pinned to a window handle
+                game_win_title = game_win_title or str(self.hwnd)
             if game_win_title:
-                hwnd = None
-                try:
-                    hwnd = window_utils.find_window_by_title(game_win_title)
-                except Exception as e:
-                    logging.warning(f"Window lookup failed: {e}")
+                hwnd = self.hwnd
+                if not hwnd:
+                    try:
+                        hwnd = window_utils.find_window_by_title(game_win_title)
+                    except Exception as e:
+                        logging.warning(f"Window lookup failed: {e}")
                 if not hwnd:
                     issues.append(f"Configured game window not found: {game_win_title}")
                     logging.warning(f"Configured game window not found: {game_win_title}")
                 else:
+                    self.vision.bind_window(hwnd)
                     try:
                         ok = window_utils.focus_window(hwnd)
                         if ok:
@@ -552,6 +908,8 @@ class MapleBot:
 
 
 def main():
+    # The UI is only needed here; headless.py runs the same bot without it
+    from ui import MapleBotUI
     base = Path(__file__).parent
     settings_path = base / 'config' / 'settings.json'
     settings = load_settings(settings_path)
@@ -559,8 +917,9 @@ def main():
     # Set up logging
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    bot = MapleBot(settings)
-    ui = MapleBotUI(settings, bot.start, bot.stop, settings_path, bot.update_settings)
+    # The bot keeps its own copy; UI edits reach it as diffs once they are persisted
+    bot = MapleBot(copy.deepcopy(settings))
+    ui = MapleBotUI(settings, bot.start, bot.stop, settings_path, bot.apply_settings_diff)
     # give bot a reference to UI so it can pop up alarms
     bot.ui = ui
     # give UI a reference back to the bot for window auto-detection
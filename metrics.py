@@ -0,0 +1,163 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Event counters fed by the managers and the main loop
+COUNTERS = (
+    'ticks', 'attacks', 'kills', 'hp_potions', 'mp_potions', 'buffs', 'moves', 'move_corrections',
+    'position_samples_lost', 'character_lost', 'transitions', 'grabs', 'capture_kb',
+    'buffer_allocs',
+)
+# Seconds spent per main-loop action (MapleBot.last_action)
+STATES = ('search', 'locate', 'top_floor', 'attack', 'rope', 'route')
+COLUMNS = COUNTERS + tuple(f'{s}_seconds' for s in STATES)
+_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+
+
+class Metrics:
+    """Productivity counters aggregated into per-minute rows of a fixed-size ring buffer.
+
+    Every completed minute is appended as one JSON line to metrics.path, after a 'session'
+    header line, so runs with different settings can be compared later (rates() is the live
+    view). A minute written early by close() is completed later by a line holding only the
+    remainder, so summing 'minute' lines never double counts. Thread-safe.
+    """
+
+    def __init__(self, settings: Dict[str, Any]):
+        cfg = settings.get('metrics', {}) or {}
+        self.enabled = bool(cfg.get('enabled', True))
+        self.minutes = max(2, int(cfg.get('history_minutes', 120)))
+        path = cfg.get('path', 'logs/metrics.jsonl')
+        self.path = Path(path) if path else None
+        self.session = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self._ring = np.zeros((self.minutes, len(COLUMNS)), dtype=np.float64)
+        self._minute_of = np.full(self.minutes, -1, dtype=np.int64)
+        self._totals = np.zeros(len(COLUMNS), dtype=np.float64)
+        self._current = None
+        # What has already been written for the current minute (close() may persist it early)
+        self._flushed_minute = None
+        self._flushed = np.zeros(len(COLUMNS), dtype=np.float64)
+        self._state = None
+        self._lock = threading.Lock()
+        self._header = {
+            'type': 'session', 'session': self.session, 'started': self.started,
+            'monsters': list(settings.get('monsters', []) or []),
+            'movement': settings.get('movement', {}),
+            'targeting': settings.get('targeting', {}),
+            'hotkeys': {k: v for k, v in (settings.get('hotkeys', {}) or {}).items() if k in ('key_down_time', 'attack_delay')},
+        }
+        self._header_written = False
+
+    # --- recording ----------------------------------------------------------------------------
+    def incr(self, name: str, amount: float = 1, now: Optional[float] = None):
+        if not self.enabled:
+            return
+        col = _INDEX[name]
+        with self._lock:
+            row = self._row(now or time.time())
+            self._ring[row, col] += amount
+            self._totals[col] += amount
+
+    def record_tick(self, action: Optional[str], seconds: float, now: Optional[float] = None):
+        """Account one main-loop tick: its duration goes to the action's time column."""
+        if not self.enabled:
+            return
+        with self._lock:
+            row = self._row(now or time.time())
+            self._ring[row, _INDEX['ticks']] += 1
+            self._totals[_INDEX['ticks']] += 1
+            if action in STATES:
+                col = _INDEX[f'{action}_seconds']
+                self._ring[row, col] += seconds
+                self._totals[col] += seconds
+            if action != self._state:
+                if self._state is not None:
+                    self._ring[row, _INDEX['transitions']] += 1
+                    self._totals[_INDEX['transitions']] += 1
+                self._state = action
+
+    def _row(self, now: float) -> int:
+        minute = int(now // 60)
+        row = minute % self.minutes
+        if self._minute_of[row] != minute:
+            if self._current is not None and self._current != minute:
+                self._persist(self._current)
+            self._ring[row] = 0.0
+            self._minute_of[row] = minute
+        self._current = minute
+        return row
+
+    # --- reading ------------------------------------------------------------------------------
+    def window(self, minutes: int = 10, now: Optional[float] = None) -> Dict[str, float]:
+        """Column sums over the last `minutes` minutes (current minute included)."""
+        current = int((now or time.time()) // 60)
+        with self._lock:
+            mask = (self._minute_of > current - minutes) & (self._minute_of <= current)
+            sums = self._ring[mask].sum(axis=0)
+        return {name: float(sums[i]) for i, name in enumerate(COLUMNS)}
+
+    def rates(self, minutes: int = 10, now: Optional[float] = None) -> Dict[str, float]:
+        """Hourly rates and time shares over the recent window, for display."""
+        now = now or time.time()
+        sums = self.window(minutes, now)
+        elapsed = min(minutes * 60.0, max(1.0, now - self.started))
+        per_hour = 3600.0 / elapsed
+        busy = sum(sums[f'{s}_seconds'] for s in STATES) or 1.0
+        return {
+            'attacks_per_hour': sums['attacks'] * per_hour,
+            'kills_per_hour': sums['kills'] * per_hour,
+            'potions_per_hour': (sums['hp_potions'] + sums['mp_potions']) * per_hour,
+            'fighting_share': sums['attack_seconds'] / busy,
+            'walking_share': (sums['route_seconds'] + sums['rope_seconds'] + sums['top_floor_seconds']) / busy,
+            'searching_share': (sums['search_seconds'] + sums['locate_seconds']) / busy,
+            'misses_per_hour': sums['character_lost'] * per_hour,
+        }
+
+    def totals(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: float(self._totals[i]) for i, name in enumerate(COLUMNS)}
+
+    # --- persistence --------------------------------------------------------------------------
+    def _append(self, record: Dict[str, Any]):
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if not self._header_written:
+                    f.write(json.dumps(self._header) + '\n')
+                    self._header_written = True
+                f.write(json.dumps(record) + '\n')
+        except Exception as e:
+            logging.debug(f"Could not append metrics: {e}")
+
+    def _persist(self, minute: int):
+        row = minute % self.minutes
+        if self._minute_of[row] != minute:
+            return
+        values = self._ring[row]
+        if self._flushed_minute == minute:
+            values = values - self._flushed
+        self._flushed_minute = minute
+        self._flushed = self._ring[row].copy()
+        record = {'type': 'minute', 'session': self.session, 'minute': minute * 60}
+        record.update({name: round(float(values[i]), 3) for i, name in enumerate(COLUMNS) if values[i]})
+        self._append(record)
+
+    def close(self):
+        """Persist the partial current minute and the session totals so far (the bot may be restarted)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._current is not None:
+                self._persist(self._current)
+            record = {'type': 'stop', 'session': self.session, 'at': time.time()}
+            record.update({name: round(float(self._totals[i]), 3) for i, name in enumerate(COLUMNS)})
+            self._append(record)
@@ -1,48 +1,222 @@
-import pyautogui
+import contextlib
 import time
-from typing import Any, Dict
+import logging
+from typing import Any, Dict, Optional
+from compiled_settings import compile_settings
+from lazy_imports import lazy_import
+
+pyautogui = lazy_import('pyautogui')
+
+
+class MoveController:
+    """Closed-loop horizontal movement: hold the direction key until the tracked character arrives.
+
+    While the key is down the character is re-located in a narrow band covering the start and
+    target x (a few small template matches per sample instead of a full-frame search). The key
+    is released once the remaining distance is within movement.brake_distance; samples where the
+    character is not found fall back to dead reckoning from movement.speed_factor, and a timeout
+    of 1.5x the open-loop estimate bounds every move.
+    """
+
+    LOG_EVERY = 25
+
+    def __init__(self, vision, cfg):
+        self.vision = vision
+        self.cfg = cfg
+        self.stats = {'moves': 0, 'seconds': 0.0, 'samples': 0, 'lost': 0, 'abs_error': 0.0,
+                      'corrections': 0, 'timeouts': 0}
+        # Optional metrics.Metrics
+        self.metrics = None
+        # Context manager held while keys are down; MapleBot sets its shared input session
+        self.input_session = contextlib.nullcontext
+
+    def _band(self, start_x: int, target_x: int, character_y: Optional[int]):
+        if character_y is None:
+            return None
+        fw, fh = self.vision.frame_size()
+        x0 = max(0, min(start_x, target_x) - 80)
+        x1 = min(fw, max(start_x, target_x) + 120)
+        y0 = max(0, character_y - 40)
+        y1 = min(fh, character_y + 110)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1 - x0, y1 - y0
+
+    def move(self, character_x: int, target_x: int, character_y: Optional[int] = None, hold=('z',)) -> int:
+        """Move to target_x and return the last known x. Keys in `hold` are held for the move."""
+        cfg = self.cfg
+        direction = "left" if target_x < character_x else "right"
+        sign = -1 if direction == "left" else 1
+        speed = cfg.speed_factor / 0.5  # px per second
+        timeout = abs(target_x - character_x) / speed * 1.5 + 0.5
+        band = self._band(character_x, target_x, character_y)
+        x = character_x
+        start = time.monotonic()
+        stats = self.stats
+        lost_before = stats['lost']
+        # The keys stay down while the character is re-located, so the input lock covers the whole hold
+        with self.input_session():
+            for key in hold:
+                pyautogui.keyDown(key)
+            pyautogui.keyDown(direction)
+            try:
+                while True:
+                    elapsed = time.monotonic() - start
+                    if elapsed >= timeout:
+                        stats['timeouts'] += 1
+                        break
+                    found = self.vision.find_character_coordinates(band)[0] if band else None
+                    stats['samples'] += 1
+                    if found is None:
+                        stats['lost'] += 1
+                        x = int(character_x + sign * speed * elapsed)
+                    else:
+                        x = found
+                    if (target_x - x) * sign <= cfg.brake_distance:
+                        break
+                    if band is None:
+                        # No band to sample: plain dead reckoning, sleep in small steps
+                        time.sleep(min(0.05, max(0.0, timeout - elapsed)))
+            finally:
+                pyautogui.keyUp(direction)
+                for key in reversed(hold):
+                    pyautogui.keyUp(key)
+        error = abs(target_x - x)
+        stats['moves'] += 1
+        stats['seconds'] += time.monotonic() - start
+        stats['abs_error'] += error
+        if error > cfg.arrive_tolerance:
+            stats['corrections'] += 1
+        if self.metrics is not None:
+            self.metrics.incr('moves')
+            self.metrics.incr('position_samples_lost', stats['lost'] - lost_before)
+            if error > cfg.arrive_tolerance:
+                self.metrics.incr('move_corrections')
+        if stats['moves'] % self.LOG_EVERY == 0:
+            self.log_stats()
+        return x
+
+    def summary(self) -> Dict[str, float]:
+        s = self.stats
+        moves = max(1, s['moves'])
+        return {
+            'moves': s['moves'],
+            'avg_ms': s['seconds'] / moves * 1000.0,
+            'avg_error_px': s['abs_error'] / moves,
+            'samples_per_move': s['samples'] / moves,
+            'lost_ratio': s['lost'] / max(1, s['samples']),
+            'corrections': s['corrections'],
+            'timeouts': s['timeouts'],
+        }
+
+    def log_stats(self):
+        s = self.summary()
+        logging.info(f"Movement: {s['moves']} moves, avg {s['avg_ms']:.0f} ms, avg error {s['avg_error_px']:.1f}px, "
+                     f"{s['samples_per_move']:.1f} samples/move ({s['lost_ratio']:.0%} lost), "
+                     f"{s['corrections']} needed correction, {s['timeouts']} timed out")
 
 
 class MovementManager:
     def __init__(self, settings: Dict[str, Any], vision):
         self.settings = settings
+        self.cfg = compile_settings(settings)
         self.vision = vision
+        # Optional navigation.Navigator used by navigate_to(); without it navigation is a straight walk
+        self.navigator = None
+        self.controller = MoveController(vision, self.cfg)
+        # Context manager held around key sequences; MapleBot sets its shared input session
+        self.input_session = contextlib.nullcontext
 
-    def move_character(self, character_x: int, target_x: int, character_direction_left: bool):
+    def move_character(self, character_x: int, target_x: int, character_direction_left: bool,
+                       character_y: Optional[int] = None):
+        if self.cfg.closed_loop_movement:
+            return self.controller.move(character_x, target_x, character_y)
         distance = abs(character_x - target_x)
+        speed_factor = self.cfg.speed_factor
         if (character_x > target_x and character_direction_left) or (character_x < target_x and not character_direction_left):
-            movement_time = distance / 117 * 0.5
+            movement_time = distance / speed_factor * 0.5
         else:
-            movement_time = (distance - 16) / 117 * 0.5
+            movement_time = (distance - 16) / speed_factor * 0.5
 
         direction = "left" if character_x > target_x else "right"
-        pyautogui.keyDown('z')
-        pyautogui.keyDown(direction)
-        time.sleep(movement_time)
-        pyautogui.keyUp(direction)
-        pyautogui.keyUp('z')
+        with self.input_session():
+            pyautogui.keyDown('z')
+            pyautogui.keyDown(direction)
+            time.sleep(movement_time)
+            pyautogui.keyUp(direction)
+            pyautogui.keyUp('z')
+        return target_x
 
-    def climb_rope(self, rope_x: int, rope_y: int, character_x: int, character_direction_left: bool):
+    def climb_rope(self, rope_x: int, rope_y: int, character_x: int, character_direction_left: bool,
+                   character_y: Optional[int] = None):
         distance_to_rope = abs(character_x - rope_x)
         if distance_to_rope <= 40:
-            if rope_x <= character_x:
-                pyautogui.keyDown("left")
-                time.sleep(0.1)
-                pyautogui.keyUp("left")
-            else:
-                pyautogui.press("left")
-            pyautogui.keyDown("up")
-            pyautogui.keyDown("alt")
-            time.sleep(3.5)
-            pyautogui.keyUp("up")
-            pyautogui.keyUp("alt")
+            with self.input_session():
+                if rope_x <= character_x:
+                    pyautogui.keyDown("left")
+                    time.sleep(0.1)
+                    pyautogui.keyUp("left")
+                else:
+                    pyautogui.press("left")
+                pyautogui.keyDown("up")
+                pyautogui.keyDown("alt")
+                time.sleep(3.5)
+                pyautogui.keyUp("up")
+                pyautogui.keyUp("alt")
         else:
-            self.move_character(character_x, rope_x, character_direction_left)
+            self.move_character(character_x, rope_x, character_direction_left, character_y)
 
     def patrol(self):
-        pyautogui.keyDown("right")
-        time.sleep(5)
-        pyautogui.keyUp("right")
+        with self.input_session():
+            pyautogui.keyDown("right")
+            time.sleep(5)
+            pyautogui.keyUp("right")
+
+    def jump(self):
+        with self.input_session():
+            pyautogui.keyDown("alt")
+            time.sleep(0.1)
+            pyautogui.keyUp("alt")
+        time.sleep(0.5)
 
-    def navigate_to(self, x: int, y: int):
-        pass
+    def drop_down(self):
+        with self.input_session():
+            pyautogui.keyDown("down")
+            pyautogui.keyDown("alt")
+            time.sleep(0.7)
+            pyautogui.keyUp("down")
+            pyautogui.keyUp("alt")
+
+    def navigate_to(self, x: int, y: int, character_x: int = None, character_y: int = None,
+                    character_direction_left: bool = False) -> bool:
+        """Follow the precomputed navigation plan to (x, y). Returns False if no plan exists or the character is lost."""
+        if character_x is None:
+            character_x, character_y, character_direction_left = self.vision.find_character_coordinates()
+            if character_x is None:
+                return False
+        if self.navigator is None:
+            plan = [('walk', x)]
+        else:
+            plan = self.navigator.plan((character_x, character_y), (x, y))
+        if not plan:
+            logging.debug(f"No navigation plan from ({character_x}, {character_y}) to ({x}, {y})")
+            return False
+        logging.debug(f"Navigation plan to ({x}, {y}): {plan}")
+        for kind, step_x in plan:
+            if kind == 'walk':
+                if abs(step_x - character_x) > 10:
+                    moved_to = self.move_character(character_x, step_x, character_direction_left, character_y)
+                    character_direction_left = step_x < character_x
+                    character_x = moved_to
+                continue
+            if kind == 'climb':
+                self.climb_rope(step_x, character_y, character_x, character_direction_left, character_y)
+            elif kind == 'drop':
+                self.drop_down()
+            else:
+                self.jump()
+            # Vertical moves land somewhere approximate; re-localize before the next step
+            character_x, character_y, character_direction_left = self.vision.find_character_coordinates()
+            if character_x is None:
+                return False
+        return True
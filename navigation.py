@@ -0,0 +1,223 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+INF = float('inf')
+# Targets are often monster positions, whose y is a sprite corner rather than the standing height
+TARGET_TOLERANCE = 80
+
+
+def _uncovered(lo: int, hi: int, covered: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Parts of [lo, hi] not inside any of the covered spans."""
+    free = [(lo, hi)]
+    for c_lo, c_hi in covered:
+        pieces = []
+        for f_lo, f_hi in free:
+            if c_hi < f_lo or c_lo > f_hi:
+                pieces.append((f_lo, f_hi))
+                continue
+            if f_lo < c_lo:
+                pieces.append((f_lo, c_lo - 1))
+            if c_hi < f_hi:
+                pieces.append((c_hi + 1, f_hi))
+        free = pieces
+    return free
+
+
+class NavGraph:
+    """Platforms of one map joined by rope, jump and drop links, with all-pairs shortest paths.
+
+    Platforms are (y, x_min, x_max) in reference coordinates (y is the character's y when
+    standing on it). Costs are seconds: walking uses the movement speed factor, links use the
+    navigation.*_seconds settings. The Floyd–Warshall distance and next-hop tables are built once
+    in the constructor, so plan() only follows next-hops and never searches.
+    """
+
+    def __init__(self, platforms: Sequence[Sequence[int]], ropes: Sequence[Sequence[int]] = (),
+                 links: Sequence[Dict[str, Any]] = (), cfg=None):
+        self.cfg = cfg
+        self.platforms = [tuple(int(v) for v in p[:3]) for p in sorted(platforms)]
+        n = len(self.platforms)
+        self.dist = [[0.0 if i == j else INF for j in range(n)] for i in range(n)]
+        self.next = [[j if i == j else None for j in range(n)] for i in range(n)]
+        # edge actions: (i, j) -> (kind, departure x, arrival x)
+        self.edges: Dict[Tuple[int, int], Tuple[str, int, int]] = {}
+        self._add_ropes(ropes)
+        self._add_jumps_and_drops()
+        for link in links:
+            self._add_configured_link(link)
+        self._floyd_warshall()
+
+    # --- construction ---------------------------------------------------------------------------
+    def _walk_seconds(self, distance: float) -> float:
+        speed = self.cfg.speed_factor if self.cfg else 117.0
+        return abs(distance) / speed * 0.5
+
+    def _add_edge(self, i: int, j: int, kind: str, depart_x: int, arrive_x: int, seconds: float):
+        p = self.platforms[i]
+        # Approximate the walk to the departure point from the middle of the platform
+        cost = self._walk_seconds(depart_x - (p[1] + p[2]) / 2) + seconds
+        if cost < self.dist[i][j]:
+            self.dist[i][j] = cost
+            self.next[i][j] = j
+            self.edges[(i, j)] = (kind, int(depart_x), int(arrive_x))
+
+    def _covers(self, index: int, x: int, margin: int = 20) -> bool:
+        _, x_min, x_max = self.platforms[index]
+        return x_min - margin <= x <= x_max + margin
+
+    def _add_ropes(self, ropes):
+        climb = self.cfg.nav_climb_seconds if self.cfg else 3.5
+        for rope in ropes:
+            rx, ry = int(rope[0]), int(rope[1])
+            below = [i for i, p in enumerate(self.platforms) if p[0] >= ry and self._covers(i, rx)]
+            above = [i for i, p in enumerate(self.platforms) if p[0] < ry and self._covers(i, rx)]
+            if below and above:
+                lower = min(below, key=lambda i: self.platforms[i][0])
+                upper = max(above, key=lambda i: self.platforms[i][0])
+                self._add_edge(lower, upper, 'climb', rx, rx, climb)
+
+    def _add_jumps_and_drops(self):
+        jump_height = self.cfg.nav_jump_height if self.cfg else 80
+        jump = self.cfg.nav_jump_seconds if self.cfg else 0.6
+        drop = self.cfg.nav_drop_seconds if self.cfg else 0.8
+        for i, (yi, ai, bi) in enumerate(self.platforms):
+            # Only the nearest platform under (or over) each x is reachable from there: a drop
+            # lands on the first floor below, a jump hits the first floor above
+            below = sorted((p[0], j) for j, p in enumerate(self.platforms) if p[0] > yi)
+            above = sorted(((yi - p[0], j) for j, p in enumerate(self.platforms)
+                            if p[0] < yi and yi - p[0] <= jump_height))
+            for kind, seconds, candidates in (('drop', drop, below), ('jump', jump, above)):
+                covered: List[Tuple[int, int]] = []
+                for _, j in candidates:
+                    _, aj, bj = self.platforms[j]
+                    lo, hi = max(ai, aj), min(bi, bj)
+                    if lo > hi:
+                        continue
+                    free = _uncovered(lo, hi, covered)
+                    covered.append((lo, hi))
+                    if free:
+                        lo, hi = max(free, key=lambda span: span[1] - span[0])
+                        x = (lo + hi) // 2
+                        self._add_edge(i, j, kind, x, x, seconds)
+
+    def _add_configured_link(self, link: Dict[str, Any]):
+        """Route-defined link: {"from": [x, y], "to": [x, y], "kind": "jump"|"climb"|"drop", "seconds": s}."""
+        try:
+            fx, fy = link['from']
+            tx, ty = link['to']
+        except (KeyError, TypeError, ValueError):
+            logging.warning(f"Ignoring malformed navigation link: {link}")
+            return
+        i, j = self.platform_at(fx, fy), self.platform_at(tx, ty)
+        if i is None or j is None or i == j:
+            return
+        self._add_edge(i, j, str(link.get('kind', 'jump')), fx, tx, float(link.get('seconds', 1.0)))
+
+    def _floyd_warshall(self):
+        n = len(self.platforms)
+        dist, nxt = self.dist, self.next
+        for k in range(n):
+            dk = dist[k]
+            for i in range(n):
+                dik = dist[i][k]
+                if dik == INF:
+                    continue
+                di, ni = dist[i], nxt[i]
+                for j in range(n):
+                    alt = dik + dk[j]
+                    if alt < di[j]:
+                        di[j] = alt
+                        ni[j] = ni[k]
+
+    # --- queries --------------------------------------------------------------------------------
+    def platform_at(self, x: int, y: int, tolerance: int = 30) -> Optional[int]:
+        """Index of the platform the point stands on (closest in y among those covering x)."""
+        best, best_dy = None, tolerance + 1
+        for i, p in enumerate(self.platforms):
+            dy = abs(p[0] - y)
+            if dy < best_dy and self._covers(i, x):
+                best, best_dy = i, dy
+        return best
+
+    def cost(self, from_xy: Tuple[int, int], to_xy: Tuple[int, int]) -> float:
+        i, j = self.platform_at(*from_xy), self.platform_at(*to_xy, tolerance=TARGET_TOLERANCE)
+        if i is None or j is None:
+            return INF
+        if i == j:
+            return self._walk_seconds(to_xy[0] - from_xy[0])
+        return self.dist[i][j]
+
+    def plan(self, from_xy: Tuple[int, int], to_xy: Tuple[int, int]) -> Optional[List[Tuple[str, int]]]:
+        """Action plan [(kind, x), ...] from one point to another, or None if unreachable.
+
+        kind is 'walk' (to x), 'climb' (rope at x), 'jump' or 'drop' (at x).
+        """
+        i, j = self.platform_at(*from_xy), self.platform_at(*to_xy, tolerance=TARGET_TOLERANCE)
+        if i is None or j is None or self.next[i][j] is None:
+            return None
+        steps = []
+        while i != j:
+            hop = self.next[i][j]
+            kind, depart_x, arrive_x = self.edges[(i, hop)]
+            steps.append(('walk', depart_x))
+            steps.append((kind, depart_x))
+            i = hop
+        steps.append(('walk', int(to_xy[0])))
+        return steps
+
+
+class Navigator:
+    """Keeps one NavGraph per map, rebuilt only when that map's geometry changes.
+
+    Geometry comes from the route when it defines "platforms" (and optionally "ropes" as [x, y]
+    and "links"), otherwise from what the WorldModel has learned for the current map.
+    """
+
+    def __init__(self, world, cfg):
+        self.world = world
+        self.cfg = cfg
+        self.route: Optional[Dict[str, Any]] = None
+        self._graphs: Dict[Any, Tuple[Any, NavGraph]] = {}
+
+    def set_route(self, route: Optional[Dict[str, Any]]):
+        self.route = route
+        self._graphs.clear()
+
+    def graph(self) -> Optional[NavGraph]:
+        memory = self.world.map
+        route = self.route or {}
+        if route.get('platforms'):
+            platforms = route.get('platforms')
+            if route.get('ropes'):
+                version = 'route'
+                ropes = route.get('ropes')
+            else:
+                # Learned ropes fill in for the route's; rebuild when the memory changes
+                version = ('route', memory.version)
+                ropes = memory.ropes
+        else:
+            version = memory.version
+            platforms = memory.platforms
+            ropes = memory.ropes
+        if not platforms:
+            return None
+        cached = self._graphs.get(memory.key)
+        if cached is None or cached[0] != version:
+            graph = NavGraph(platforms, ropes, route.get('links') or (), self.cfg)
+            self._graphs[memory.key] = (version, graph)
+            logging.debug(f"Navigation graph for {memory.key}: {len(graph.platforms)} platforms, {len(graph.edges)} links")
+            return graph
+        return cached[1]
+
+    def plan(self, from_xy, to_xy):
+        graph = self.graph()
+        if graph is None:
+            # Nothing learned yet: a straight walk is the only option
+            return [('walk', int(to_xy[0]))]
+        return graph.plan(from_xy, to_xy)
+
+    def cost(self, from_xy, to_xy) -> float:
+        graph = self.graph()
+        if graph is None:
+            return abs(to_xy[0] - from_xy[0]) / self.cfg.speed_factor * 0.5
+        return graph.cost(from_xy, to_xy)
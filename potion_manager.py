@@ -1,25 +1,46 @@
-import pyautogui
+import contextlib
 import time
 import logging
 from typing import Any, Dict
+from compiled_settings import compile_settings
+from lazy_imports import lazy_import
+
+pyautogui = lazy_import('pyautogui')
 
 
 class PotionManager:
     def __init__(self, settings: Dict[str, Any], vision):
         self.settings = settings
+        self.cfg = compile_settings(settings)
         self.vision = vision
+        # Optional metrics.Metrics
+        self.metrics = None
+        # Context manager held around key presses; MapleBot sets its shared input session
+        self.input_session = contextlib.nullcontext
+        # HP trend between checks, used to speed up the potion loop while taking damage
+        self.last_hp_percent = None
+        self.hp_dropping = False
 
     def check_and_use(self):
+        cfg = self.cfg
         hp_current, hp_max, mp_current, mp_max = self.vision.read_hp_mp()
         if hp_current and hp_max:
             hp_percentage = (hp_current / hp_max) * 100
-            if hp_percentage < self.settings['misc'].get('hp_potion_percent', 50):
+            self.hp_dropping = self.last_hp_percent is not None and hp_percentage < self.last_hp_percent - 0.5
+            self.last_hp_percent = hp_percentage
+            if hp_percentage < cfg.hp_potion_percent:
                 if not (hp_percentage < 20 and str(hp_max)[0] == '4'):
                     logging.info(f"Using HP potion (HP: {hp_percentage:.1f}%)")
-                    pyautogui.press(self.settings['hotkeys'].get('hp_potion', 'del'))
+                    with self.input_session():
+                        pyautogui.press(cfg.hp_potion_key)
+                    if self.metrics is not None:
+                        self.metrics.incr('hp_potions')
         if mp_current and mp_max:
             mp_percentage = (mp_current / mp_max) * 100
-            if mp_percentage < self.settings['misc'].get('mp_potion_percent', 30):
+            if mp_percentage < cfg.mp_potion_percent:
                 if not (mp_percentage < 20 and str(mp_max)[0] == '4'):
                     logging.info(f"Using MP potion (MP: {mp_percentage:.1f}%)")
-                    pyautogui.press(self.settings['hotkeys'].get('mp_potion', 'end'))
+                    with self.input_session():
+                        pyautogui.press(cfg.mp_potion_key)
+                    if self.metrics is not None:
+                        self.metrics.incr('mp_potions')
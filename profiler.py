@@ -0,0 +1,143 @@
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# Frames deeper than this are cut off at the root end
+MAX_DEPTH = 128
+
+
+class SamplingProfiler:
+    """Statistical profiler for the bot threads, written as collapsed stacks for flame graphs.
+
+    A daemon thread wakes debug.profile_hz times a second, reads the stacks of the watched threads
+    with sys._current_frames() and counts them; the bot threads themselves do nothing extra.
+    Every debug.profile_flush_seconds (and on stop) it writes, under debug.profile_dir:
+
+        <session>.collapsed        "thread;outer;...;inner count" for the whole session
+        <session>.ticks.collapsed  the same with a "tick N" frame after the thread name
+
+    Both load in flamegraph.pl, speedscope or inferno; the tick file shows which ticks were slow.
+    """
+
+    def __init__(self, cfg, session: str, tick_source: Optional[Callable[[], int]] = None):
+        self.cfg = cfg
+        self.session = session
+        self.tick_source = tick_source
+        self._watched: Dict[int, threading.Thread] = {}
+        self._labels: Dict[object, str] = {}
+        self._totals: Dict[Tuple[str, tuple], int] = collections.Counter()
+        self._pending: Dict[Tuple[str, int, tuple], int] = collections.Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.samples = 0
+        self.cpu_seconds = 0.0
+        self.started_at = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch(self, thread: threading.Thread):
+        """Sample `thread` while it is alive; its name is the root frame of its stacks."""
+        with self._lock:
+            self._watched[thread.ident] = thread
+
+    def apply(self, cfg, active: bool):
+        """New settings snapshot; starts or stops sampling to follow debug.profile while the bot runs."""
+        self.cfg = cfg
+        if active and cfg.profile_enabled and not self.running:
+            self.start()
+        elif self.running and not (active and cfg.profile_enabled):
+            self.stop()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        logging.info(f"Sampling profiler started at {self.cfg.profile_hz:.0f} Hz")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+        elapsed = max(1e-6, time.time() - (self.started_at or time.time()))
+        logging.info(f"Sampling profiler stopped: {self.samples} samples, "
+                     f"{self.cpu_seconds / elapsed:.2%} of a core spent sampling, "
+                     f"output in {self.path('.collapsed')}")
+
+    def path(self, suffix: str) -> Path:
+        return Path(self.cfg.profile_dir) / f"{self.session}{suffix}"
+
+    # --- sampling ---------------------------------------------------------------------------
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            label = self._labels[code] = name.replace(';', ':')
+        return label
+
+    def _run(self):
+        interval = 1.0 / max(1.0, self.cfg.profile_hz)
+        next_flush = time.monotonic() + self.cfg.profile_flush_seconds
+        while not self._stop.wait(interval):
+            started = time.thread_time()
+            self.sample()
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.cfg.profile_flush_seconds
+            self.cpu_seconds += time.thread_time() - started
+
+    def sample(self):
+        """Take one sample of every watched thread."""
+        tick = self.tick_source() if self.tick_source is not None else 0
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, thread in list(self._watched.items()):
+                if not thread.is_alive():
+                    del self._watched[ident]
+                    continue
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                name = thread.name
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack = tuple(reversed(stack))
+                self._totals[(name, stack)] += 1
+                self._pending[(name, tick, stack)] += 1
+            self.samples += 1
+
+    def flush(self):
+        """Rewrite the session totals and append the per-tick samples taken since the last flush."""
+        with self._lock:
+            totals = list(self._totals.items())
+            pending, self._pending = self._pending, collections.Counter()
+        if not totals:
+            return
+        try:
+            directory = Path(self.cfg.profile_dir)
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.path('.collapsed.tmp')
+            with tmp.open('w', encoding='utf-8') as f:
+                for (name, stack), count in totals:
+                    f.write(f"{';'.join((name,) + stack)} {count}\n")
+            os.replace(tmp, self.path('.collapsed'))
+            with self.path('.ticks.collapsed').open('a', encoding='utf-8') as f:
+                for (name, tick, stack), count in sorted(pending.items(), key=lambda item: item[0][1]):
+                    f.write(f"{';'.join((name, f'tick {tick}') + stack)} {count}\n")
+        except Exception as e:
+            logging.error(f"Could not write profile: {e}")
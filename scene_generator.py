@@ -0,0 +1,487 @@
+import argparse
+import copy
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from vision import Vision
+
+CHARACTER_SPRITES = {True: 'left_char.png', False: 'right_char.png'}
+ROPE_SPRITE = 'rope.png'
+PLATE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+PLATFORM_THICKNESS = 12
+# Attempts at finding a free spot for a sprite before it is left out of the scene
+PLACEMENT_TRIES = 30
+
+
+class SceneParams(NamedTuple):
+    """What goes into each scene; (a, b) pairs are inclusive ranges drawn per scene or per sprite."""
+    size: Tuple[int, int] = (1920, 1080)
+    monsters: Tuple[int, int] = (0, 8)
+    ropes: Tuple[int, int] = (0, 3)
+    rope_tiles: Tuple[int, int] = (1, 4)
+    platforms: Tuple[int, int] = (2, 5)
+    character: float = 1.0
+    sprite_scale: Tuple[float, float] = (1.0, 1.0)
+    occlusion: float = 0.0
+    occlusion_max: float = 0.5
+    noise: float = 0.0
+    view_scale: float = 1.0
+    overlap: bool = False
+
+
+def _read_sprite(path: Path) -> Optional[np.ndarray]:
+    """BGR or BGRA uint8 image; the alpha channel is dropped when the sprite is fully opaque."""
+    img = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        return None
+    if img.ndim == 2:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    if img.dtype != np.uint8:
+        img = (img / 257).astype(np.uint8)
+    if img.shape[2] == 4 and img[:, :, 3].min() == 255:
+        img = np.ascontiguousarray(img[:, :, :3])
+    return img
+
+
+def load_sprites(assets_path) -> Dict[str, Any]:
+    """Monster sprites from mob_templates/ plus the character and rope sprites from ui_elements/."""
+    assets_path = Path(assets_path)
+    monsters = []
+    for path in sorted((assets_path / 'mob_templates').glob('*')):
+        img = _read_sprite(path) if path.suffix.lower() in PLATE_EXTENSIONS else None
+        if img is not None:
+            monsters.append((path.name, img))
+    ui = assets_path / 'ui_elements'
+    character = {left: _read_sprite(ui / name) for left, name in CHARACTER_SPRITES.items()}
+    return {
+        'monsters': monsters,
+        'character': character if all(img is not None for img in character.values()) else None,
+        'rope': _read_sprite(ui / ROPE_SPRITE),
+    }
+
+
+def _paste(frame: np.ndarray, sprite: np.ndarray, x: int, y: int):
+    h, w = sprite.shape[:2]
+    dst = frame[y:y + h, x:x + w]
+    if sprite.shape[2] == 4:
+        alpha = sprite[:, :, 3:4].astype(np.float32) / 255.0
+        dst[:] = (sprite[:, :, :3] * alpha + dst * (1.0 - alpha)).astype(np.uint8)
+    else:
+        dst[:] = sprite
+
+
+def _overlaps(a, b) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+class SceneGenerator:
+    """Composites labelled game scenes for benchmarking the template matchers.
+
+    Monsters, the character and ropes are pasted onto a background plate (an image from
+    plates_dir, cropped/resized to the reference size, or a generated gradient) at positions
+    standing on randomly drawn platforms. Every scene is built from its own RNG seeded with
+    (seed, index), so scene N is the same whatever order or process it is generated in.
+    Ground truth is in reference coordinates (top-left corners, like Vision returns them); the
+    frame itself is rendered at params.view_scale, like a smaller game window would be.
+    """
+
+    def __init__(self, assets_path, params: SceneParams = SceneParams(), seed: int = 0, plates_dir=None):
+        self.assets_path = Path(assets_path)
+        self.params = params
+        self.seed = seed
+        self.sprites = load_sprites(self.assets_path)
+        self.plates: List[Tuple[str, np.ndarray]] = []
+        if plates_dir is not None:
+            for path in sorted(Path(plates_dir).glob('*')):
+                img = cv2.imread(str(path), cv2.IMREAD_COLOR) if path.suffix.lower() in PLATE_EXTENSIONS else None
+                if img is not None:
+                    self.plates.append((path.name, img))
+        if not self.sprites['monsters'] and self.sprites['character'] is None and self.sprites['rope'] is None:
+            raise FileNotFoundError(f"No sprites found under {self.assets_path}")
+
+    def manifest(self) -> Dict[str, Any]:
+        return {
+            'assets': str(self.assets_path),
+            'seed': self.seed,
+            'params': self.params._asdict(),
+            'monsters': [name for name, _ in self.sprites['monsters']],
+            'character': self.sprites['character'] is not None,
+            'rope': self.sprites['rope'] is not None,
+            'plates': [name for name, _ in self.plates],
+        }
+
+    # --- scene pieces ---------------------------------------------------------------------------
+    def _plate(self, rng) -> Tuple[str, np.ndarray]:
+        w, h = self.params.size
+        if self.plates:
+            name, img = self.plates[rng.integers(len(self.plates))]
+            ph, pw = img.shape[:2]
+            # Crop a random part with the reference aspect ratio, then bring it to size
+            cw, ch = min(pw, int(ph * w / h)), min(ph, int(pw * h / w))
+            x, y = int(rng.integers(pw - cw + 1)), int(rng.integers(ph - ch + 1))
+            return name, cv2.resize(img[y:y + ch, x:x + cw], (w, h), interpolation=cv2.INTER_AREA)
+        top, bottom = rng.uniform(0, 255, 3).astype(np.float32), rng.uniform(0, 255, 3).astype(np.float32)
+        ramp = np.linspace(0.0, 1.0, h, dtype=np.float32)[:, None, None]
+        plate = np.broadcast_to(top * (1.0 - ramp) + bottom * ramp, (h, w, 3))
+        # Low-frequency texture so matchers do not get a perfectly flat background
+        blotches = cv2.resize(rng.normal(0, 18, (9, 16, 3)).astype(np.float32), (w, h), interpolation=cv2.INTER_CUBIC)
+        return 'generated', np.clip(plate + blotches, 0, 255).astype(np.uint8)
+
+    def _platforms(self, rng) -> List[Tuple[int, int, int]]:
+        w, h = self.params.size
+        # The ground spans the whole view; the others are floating ledges above it
+        ground = h - max(PLATFORM_THICKNESS, h // 10)
+        platforms = [(ground, 0, w)]
+        for _ in range(int(rng.integers(self.params.platforms[0], self.params.platforms[1] + 1)) - 1):
+            length = int(rng.integers(w // 5, w // 2))
+            x0 = int(rng.integers(0, w - length))
+            platforms.append((int(rng.integers(h // 4, max(h // 4 + 1, ground - h // 8))), x0, x0 + length))
+        return platforms
+
+    def _scaled(self, rng, sprite) -> Tuple[np.ndarray, float]:
+        low, high = self.params.sprite_scale
+        scale = float(rng.uniform(low, high)) if high > low else float(low)
+        if scale == 1.0:
+            return sprite, 1.0
+        h, w = sprite.shape[:2]
+        size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+        return cv2.resize(sprite, size, interpolation=cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR), scale
+
+    def _place(self, rng, w: int, h: int, platforms, boxes, hanging: bool = False):
+        """Top-left of a free w x h spot standing on (or, for ropes, hanging from) a platform."""
+        for _ in range(PLACEMENT_TRIES):
+            py, x0, x1 = platforms[rng.integers(len(platforms))]
+            if x1 - x0 < w:
+                continue
+            x = int(rng.integers(x0, x1 - w + 1))
+            y = py + PLATFORM_THICKNESS if hanging else py - h
+            if y < 0 or y + h > self.params.size[1]:
+                continue
+            box = (x, y, w, h)
+            if self.params.overlap or not any(_overlaps(box, b) for b in boxes):
+                boxes.append(box)
+                return x, y
+        return None
+
+    def _occlude(self, rng, frame, obj: Dict[str, Any]):
+        """Cover part of an object with a solid foreground box, from a random side."""
+        p = self.params
+        if p.occlusion <= 0 or rng.random() >= p.occlusion:
+            obj['occluded'] = 0.0
+            return
+        fraction = float(rng.uniform(0.1, max(0.1, p.occlusion_max)))
+        x, y, w, h = obj['x'], obj['y'], obj['w'], obj['h']
+        if rng.random() < 0.5:
+            cw, ch = max(1, int(w * fraction)), h
+            cx = x if rng.random() < 0.5 else x + w - cw
+            cy = y
+        else:
+            cw, ch = w, max(1, int(h * fraction))
+            cx = x
+            cy = y if rng.random() < 0.5 else y + h - ch
+        frame[cy:cy + ch, cx:cx + cw] = rng.integers(0, 256, 3)
+        obj['occluded'] = round(cw * ch / float(w * h), 3)
+
+    # --- scenes ---------------------------------------------------------------------------------
+    def generate(self, index: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Frame (at view scale) and ground truth of scene `index`."""
+        p = self.params
+        rng = np.random.default_rng([self.seed, index])
+        plate_name, frame = self._plate(rng)
+        platforms = self._platforms(rng)
+        for py, x0, x1 in platforms:
+            frame[py:py + PLATFORM_THICKNESS, x0:x1] = rng.integers(0, 256, 3)
+        boxes = []
+        truth = {'scene': index, 'seed': self.seed, 'size': list(p.size), 'view_scale': p.view_scale,
+                 'plate': plate_name, 'noise': p.noise, 'platforms': [list(pl) for pl in platforms],
+                 'character': None, 'monsters': [], 'ropes': []}
+
+        rope = self.sprites['rope']
+        if rope is not None:
+            for _ in range(int(rng.integers(p.ropes[0], p.ropes[1] + 1))):
+                tile, scale = self._scaled(rng, rope)
+                tiles = int(rng.integers(p.rope_tiles[0], p.rope_tiles[1] + 1))
+                th, tw = tile.shape[:2]
+                spot = self._place(rng, tw, th * tiles, platforms, boxes, hanging=True)
+                if spot is None:
+                    continue
+                for i in range(tiles):
+                    _paste(frame, tile, spot[0], spot[1] + i * th)
+                truth['ropes'].append({'x': spot[0], 'y': spot[1], 'w': tw, 'h': th * tiles, 'tile_h': th,
+                                       'tiles': tiles, 'scale': scale})
+
+        character = self.sprites['character']
+        if character is not None and rng.random() < p.character:
+            facing_left = bool(rng.random() < 0.5)
+            sprite, scale = self._scaled(rng, character[facing_left])
+            spot = self._place(rng, sprite.shape[1], sprite.shape[0], platforms, boxes)
+            if spot is not None:
+                _paste(frame, sprite, *spot)
+                truth['character'] = {'x': spot[0], 'y': spot[1], 'w': sprite.shape[1], 'h': sprite.shape[0],
+                                      'facing_left': facing_left, 'scale': scale}
+
+        monsters = self.sprites['monsters']
+        if monsters:
+            for _ in range(int(rng.integers(p.monsters[0], p.monsters[1] + 1))):
+                template = int(rng.integers(len(monsters)))
+                sprite, scale = self._scaled(rng, monsters[template][1])
+                spot = self._place(rng, sprite.shape[1], sprite.shape[0], platforms, boxes)
+                if spot is None:
+                    continue
+                _paste(frame, sprite, *spot)
+                truth['monsters'].append({'template': monsters[template][0], 'index': template, 'x': spot[0],
+                                          'y': spot[1], 'w': sprite.shape[1], 'h': sprite.shape[0],
+                                          'scale': scale})
+
+        # Occluders go on top of everything, so they can also hide parts of neighbouring sprites
+        for obj in truth['ropes'] + truth['monsters'] + ([truth['character']] if truth['character'] else []):
+            self._occlude(rng, frame, obj)
+
+        if p.view_scale != 1.0:
+            view = (max(1, int(round(p.size[0] * p.view_scale))), max(1, int(round(p.size[1] * p.view_scale))))
+            frame = cv2.resize(frame, view, interpolation=cv2.INTER_AREA if p.view_scale < 1.0 else cv2.INTER_LINEAR)
+        if p.noise > 0:
+            noisy = frame.astype(np.float32) + rng.standard_normal(frame.shape, dtype=np.float32) * p.noise
+            frame = np.clip(noisy, 0, 255).astype(np.uint8)
+        truth['view_size'] = [frame.shape[1], frame.shape[0]]
+        return frame, truth
+
+
+def _write_scene(generator: SceneGenerator, directory: Path, index: int) -> str:
+    frame, truth = generator.generate(index)
+    name = f"scene_{index:06d}"
+    truth['frame'] = f"{name}.png"
+    cv2.imwrite(str(directory / truth['frame']), frame, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    (directory / f"{name}.json").write_text(json.dumps(truth), encoding='utf-8')
+    return name
+
+
+def write_dataset(generator: SceneGenerator, directory, count: int, start: int = 0, workers: int = 1) -> List[str]:
+    """Write scenes start..start+count-1 (PNG + truth JSON) and a manifest.json; returns the scene names."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'manifest.json').write_text(json.dumps(generator.manifest(), indent=2), encoding='utf-8')
+    indices = range(start, start + count)
+    if workers <= 1:
+        return [_write_scene(generator, directory, i) for i in indices]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_write_scene, [generator] * count, [directory] * count, indices, chunksize=16))
+
+
+def load_scene(path) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Frame and ground truth of a written scene, given its .json (or .png) path."""
+    path = Path(path).with_suffix('.json')
+    truth = json.loads(path.read_text(encoding='utf-8'))
+    return cv2.imread(str(path.with_name(truth['frame'])), cv2.IMREAD_COLOR), truth
+
+
+# --- benchmark ----------------------------------------------------------------------------------
+class _NoOcr:
+    def readtext(self, img):
+        return []
+
+    def pending(self) -> int:
+        return 0
+
+
+class SceneVision(Vision):
+    """Vision reading a generated frame instead of the screen; the client size is the frame size."""
+
+    def __init__(self, settings: Dict[str, Any], frame: Optional[np.ndarray] = None, template_cache=None):
+        self.frame = frame
+        super().__init__(settings, template_cache=template_cache, ocr=_NoOcr())
+
+    def client_size(self):
+        if self.frame is None:
+            return self.base_resolution()
+        return self.frame.shape[1], self.frame.shape[0]
+
+    def show(self, frame: np.ndarray):
+        self.frame = frame
+        self.detect_scale()
+
+    def _grab(self, region=None, purpose='capture'):
+        img = self.frame
+        if region is not None:
+            x, y, w, h = self.scale_region(region)
+            img = img[y:y + h, x:x + w]
+        self.capture_stats['grabs'] += 1
+        self.capture_stats['bytes'] += img.nbytes
+        if region is None:
+            self.last_frame = img
+            self.last_frame_time = time.time()
+        return img
+
+
+def _near(point, obj, tolerance: int) -> bool:
+    return abs(point[0] - obj['x']) <= tolerance and abs(point[1] - obj['y']) <= tolerance
+
+
+def _on_rope(point, rope, tolerance: int) -> bool:
+    # A tiled rope matches at every tile, so any point along it counts
+    return (abs(point[0] - rope['x']) <= tolerance
+            and rope['y'] - tolerance <= point[1] <= rope['y'] + rope['h'] - rope['tile_h'] + tolerance)
+
+
+def _score(stats: Dict[str, Any], seconds: float, points, objects, hit) -> None:
+    stats['ms'].append(seconds * 1000.0)
+    stats['objects'] += len(objects)
+    stats['found'] += sum(1 for obj in objects if any(hit(pt, obj) for pt in points))
+    stats['detections'] += len(points)
+    stats['true_detections'] += sum(1 for pt in points if any(hit(pt, obj) for obj in objects))
+
+
+def benchmark(directory, assets_path=None, limit: Optional[int] = None, tolerance: int = 4,
+              settings: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """Run the vision matchers over written scenes and score them against the ground truth.
+
+    Recall counts labelled objects with at least one detection within `tolerance` reference pixels;
+    precision counts detections that land on a labelled object (matchers report several adjacent
+    points per object, all of which count as true). 'closest' is right when find_closest_monster
+    picks the monster select_closest_monster would pick from the true positions.
+    """
+    from defaults import DEFAULT_SETTINGS
+    directory = Path(directory)
+    manifest = json.loads((directory / 'manifest.json').read_text(encoding='utf-8'))
+    settings = copy.deepcopy(settings or DEFAULT_SETTINGS)
+    w, h = manifest['params']['size']
+    settings.setdefault('vision', {})['assets_path'] = str(assets_path or manifest['assets'])
+    settings.setdefault('ui', {})['game_window_title'] = ''
+    settings.setdefault('preconditions', {})['resolution'] = f"{w}x{h}"
+    settings['monsters'] = manifest['monsters']
+    vision = SceneVision(settings)
+    paths = [str(p) for p in vision.cfg.monster_paths]
+
+    def new_stats():
+        return {'scenes': 0, 'objects': 0, 'found': 0, 'detections': 0, 'true_detections': 0, 'ms': []}
+    results = {'monsters': new_stats(), 'ropes': new_stats(), 'character': new_stats(),
+               'closest': {'scenes': 0, 'correct': 0, 'ms': []}}
+    scenes = sorted(p for p in directory.glob('scene_*.json'))
+    for path in scenes[:limit]:
+        frame, truth = load_scene(path)
+        vision.show(frame)
+
+        if manifest['monsters']:
+            started = time.perf_counter()
+            found = vision.find_monsters(paths)
+            elapsed = time.perf_counter() - started
+            _score(results['monsters'], elapsed, found, truth['monsters'],
+                   lambda pt, obj: pt[2] == obj['index'] and _near(pt, obj, tolerance))
+            results['monsters']['scenes'] += 1
+
+        if manifest['rope']:
+            started = time.perf_counter()
+            ropes = vision.find_ropes()
+            _score(results['ropes'], time.perf_counter() - started, ropes, truth['ropes'],
+                   lambda pt, obj: _on_rope(pt, obj, tolerance))
+            results['ropes']['scenes'] += 1
+
+        char = truth['character']
+        if manifest['character']:
+            started = time.perf_counter()
+            x, y, left = vision.find_character_coordinates()
+            elapsed = time.perf_counter() - started
+            points = [(x, y)] if x is not None else []
+            _score(results['character'], elapsed, points, [char] if char else [],
+                   lambda pt, obj: _near(pt, obj, tolerance) and left == obj['facing_left'])
+            results['character']['scenes'] += 1
+
+        if manifest['monsters'] and char is not None:
+            expected = vision.select_closest_monster([(m['x'], m['y']) for m in truth['monsters']],
+                                                     char['y'], char['x'], char['facing_left'])
+            started = time.perf_counter()
+            picked = vision.find_closest_monster(paths, char['y'], char['x'], char['facing_left'])
+            results['closest']['ms'].append((time.perf_counter() - started) * 1000.0)
+            results['closest']['scenes'] += 1
+            if (picked is None and expected is None) or (
+                    picked is not None and expected is not None and _near(picked, {'x': expected[0], 'y': expected[1]},
+                                                                          tolerance)):
+                results['closest']['correct'] += 1
+
+    for stats in results.values():
+        ms = stats.pop('ms')
+        stats['mean_ms'] = float(np.mean(ms)) if ms else 0.0
+        stats['p95_ms'] = float(np.percentile(ms, 95)) if ms else 0.0
+        if 'objects' in stats:
+            stats['recall'] = stats['found'] / stats['objects'] if stats['objects'] else None
+            stats['precision'] = stats['true_detections'] / stats['detections'] if stats['detections'] else None
+        else:
+            stats['accuracy'] = stats['correct'] / stats['scenes'] if stats['scenes'] else None
+    return results
+
+
+def format_results(results: Dict[str, Dict[str, Any]]) -> str:
+    def pct(value):
+        return f"{value:7.1%}" if value is not None else f"{'-':>7}"
+    lines = [f"{'matcher':<10} {'scenes':>7} {'objects':>8} {'recall':>7} {'prec.':>7} {'mean ms':>8} {'p95 ms':>8}"]
+    for name, stats in results.items():
+        if 'objects' in stats:
+            lines.append(f"{name:<10} {stats['scenes']:7d} {stats['objects']:8d} {pct(stats['recall'])} "
+                         f"{pct(stats['precision'])} {stats['mean_ms']:8.1f} {stats['p95_ms']:8.1f}")
+        else:
+            lines.append(f"{name:<10} {stats['scenes']:7d} {'':>8} {pct(stats['accuracy'])} {'':>7} "
+                         f"{stats['mean_ms']:8.1f} {stats['p95_ms']:8.1f}")
+    return '\n'.join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Generate labelled synthetic scenes and benchmark the matchers on them.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    gen = sub.add_parser('generate', help='write scenes and ground truth to a directory')
+    gen.add_argument('output')
+    gen.add_argument('--count', type=int, default=100)
+    gen.add_argument('--start', type=int, default=0, help='index of the first scene (to extend a dataset)')
+    gen.add_argument('--assets', default='assets')
+    gen.add_argument('--plates', default=None, help='directory of background images (default: generated)')
+    gen.add_argument('--seed', type=int, default=0)
+    gen.add_argument('--workers', type=int, default=1)
+    gen.add_argument('--size', type=int, nargs=2, default=[1920, 1080], metavar=('W', 'H'))
+    gen.add_argument('--monsters', type=int, nargs=2, default=[0, 8], metavar=('MIN', 'MAX'))
+    gen.add_argument('--ropes', type=int, nargs=2, default=[0, 3], metavar=('MIN', 'MAX'))
+    gen.add_argument('--rope-tiles', type=int, nargs=2, default=[1, 4], metavar=('MIN', 'MAX'))
+    gen.add_argument('--platforms', type=int, nargs=2, default=[2, 5], metavar=('MIN', 'MAX'))
+    gen.add_argument('--character', type=float, default=1.0, help='probability a scene has the character')
+    gen.add_argument('--sprite-scale', type=float, nargs=2, default=[1.0, 1.0], metavar=('MIN', 'MAX'))
+    gen.add_argument('--occlusion', type=float, default=0.0, help='probability a sprite is partly covered')
+    gen.add_argument('--occlusion-max', type=float, default=0.5, help='largest covered share of a sprite')
+    gen.add_argument('--noise', type=float, default=0.0, help='gaussian pixel noise sigma')
+    gen.add_argument('--view-scale', type=float, default=1.0, help='render frames at this share of --size')
+    gen.add_argument('--overlap', action='store_true', help='let sprites overlap')
+    bench = sub.add_parser('bench', help='score the matchers on a generated directory')
+    bench.add_argument('directory')
+    bench.add_argument('--assets', default=None, help='templates to match with (default: the generating assets)')
+    bench.add_argument('--limit', type=int, default=None)
+    bench.add_argument('--tolerance', type=int, default=4, help='reference pixels a match may be off')
+    bench.add_argument('--json', action='store_true')
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == 'generate':
+        params = SceneParams(size=tuple(args.size), monsters=tuple(args.monsters), ropes=tuple(args.ropes),
+                             rope_tiles=tuple(args.rope_tiles), platforms=tuple(args.platforms),
+                             character=args.character, sprite_scale=tuple(args.sprite_scale),
+                             occlusion=args.occlusion, occlusion_max=args.occlusion_max, noise=args.noise,
+                             view_scale=args.view_scale, overlap=args.overlap)
+        generator = SceneGenerator(args.assets, params, args.seed, args.plates)
+        started = time.perf_counter()
+        names = write_dataset(generator, args.output, args.count, args.start, args.workers)
+        elapsed = time.perf_counter() - started
+        print(f"{len(names)} scenes written to {args.output} in {elapsed:.1f} s "
+              f"({len(names) / max(elapsed, 1e-6):.1f} scenes/s)")
+        return 0
+    results = benchmark(args.directory, args.assets, args.limit, args.tolerance)
+    print(json.dumps(results, indent=2) if args.json else format_results(results))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
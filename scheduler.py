@@ -0,0 +1,126 @@
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class PeriodicJob:
+    """A job that must run exactly once in every period of a fixed grid.
+
+    Period k spans [anchor + k*period, anchor + (k+1)*period). The job is due at the start of
+    its period plus a jitter drawn once for that period (so re-checking never re-rolls it).
+    """
+
+    __slots__ = ('name', 'period', 'action', 'jitter', 'anchor', 'index', 'due', 'fired', 'skipped')
+
+    def __init__(self, name: str, period: float, action: Callable[[], None], jitter: float = 0.0,
+                 anchor: float = 0.0, index: int = 0):
+        self.name = name
+        self.period = float(period)
+        self.action = action
+        self.jitter = max(0.0, float(jitter))
+        self.anchor = anchor
+        self.index = index
+        self.fired = 0
+        self.skipped = 0
+        self.due = self._due_for(index)
+
+    def _due_for(self, index: int) -> float:
+        # Jitter can never push the run past the end of its own period
+        jitter = random.uniform(0, min(self.jitter, self.period * 0.9)) if self.jitter else 0.0
+        return self.anchor + index * self.period + jitter
+
+    def period_of(self, t: float) -> int:
+        return int((t - self.anchor) // self.period)
+
+    def advance(self, now: float):
+        """Move to the next period after a run at `now`, coalescing periods that were missed."""
+        current = self.period_of(now)
+        if current > self.index:
+            # A late run counts for the period it happened in
+            self.skipped += current - self.index
+            self.index = current
+        self.index += 1
+        self.due = self._due_for(self.index)
+
+
+class JobScheduler:
+    """Min-heap of periodic jobs: next deadline in O(1), insert/pop in O(log n).
+
+    run_due() is called by the main loop in gaps between actions; `lead` lets it pull forward
+    jobs that would otherwise come due in the middle of the next long action (e.g. an attack).
+    A run early in a period still counts for that period, so each period fires exactly once;
+    periods missed entirely (bot paused, long blocking action) are coalesced into one late run.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._heap: List[tuple] = []
+        self._jobs: Dict[str, PeriodicJob] = {}
+        self._seq = itertools.count()
+
+    def add(self, name: str, period: float, action: Callable[[], None], jitter: float = 0.0,
+            align: bool = False, now: Optional[float] = None) -> PeriodicJob:
+        """Add or replace a job.
+
+        align=True puts period boundaries on local wall-clock multiples of `period` (every 10 min
+        at :00, :10, ...); otherwise the first period starts now and the job is due right away.
+        """
+        now = self.clock() if now is None else now
+        if align:
+            anchor = -time.localtime(now).tm_gmtoff
+            job = PeriodicJob(name, period, action, jitter, anchor, 0)
+            job.index = job.period_of(now) + 1
+            job.due = job._due_for(job.index)
+        else:
+            job = PeriodicJob(name, period, action, jitter, now, 0)
+        self._jobs[name] = job
+        heapq.heappush(self._heap, (job.due, next(self._seq), job))
+        return job
+
+    def remove(self, name: str):
+        # Lazy deletion: the heap entry is skipped when it surfaces
+        self._jobs.pop(name, None)
+
+    def names(self):
+        return list(self._jobs)
+
+    def get(self, name: str) -> Optional[PeriodicJob]:
+        return self._jobs.get(name)
+
+    def _peek(self) -> Optional[PeriodicJob]:
+        heap = self._heap
+        while heap:
+            due, _, job = heap[0]
+            if self._jobs.get(job.name) is job and due == job.due:
+                return job
+            heapq.heappop(heap)
+        return None
+
+    def next_due(self) -> Optional[float]:
+        job = self._peek()
+        return job.due if job else None
+
+    def run_due(self, lead: float = 0.0, now: Optional[float] = None, max_jobs: int = 8) -> int:
+        """Run jobs due by now + lead, earliest first; returns how many ran."""
+        now = self.clock() if now is None else now
+        ran = 0
+        while ran < max_jobs:
+            job = self._peek()
+            if job is None or job.due > now + lead:
+                break
+            heapq.heappop(self._heap)
+            try:
+                job.action()
+            except Exception as e:
+                logging.error(f"Scheduled job {job.name} failed: {e}")
+            job.fired += 1
+            ran += 1
+            skipped = job.skipped
+            job.advance(now)
+            if job.skipped != skipped:
+                logging.info(f"Scheduled job {job.name} ran late; {job.skipped - skipped} missed period(s) coalesced")
+            heapq.heappush(self._heap, (job.due, next(self._seq), job))
+        return ran
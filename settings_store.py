@@ -0,0 +1,167 @@
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+
+class _Removed:
+    """Marker used in diffs for keys that were deleted."""
+
+    def __repr__(self):
+        return 'REMOVED'
+
+
+REMOVED = _Removed()
+
+
+def write_json_atomic(path: Path, data: Dict[str, Any]):
+    """Write JSON to a temp file next to path, fsync it, then rename over path.
+
+    A crash mid-write leaves either the old file or the new one, never a truncated mix.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except Exception:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def diff_settings(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the nested changes that turn old into new. Lists are replaced whole."""
+    diff = {}
+    for key, value in new.items():
+        if key not in old:
+            diff[key] = copy.deepcopy(value)
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub = diff_settings(old[key], value)
+            if sub:
+                diff[key] = sub
+        elif value != old[key]:
+            diff[key] = copy.deepcopy(value)
+    for key in old:
+        if key not in new:
+            diff[key] = REMOVED
+    return diff
+
+
+def apply_settings_diff(settings: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a new settings dict with diff applied; settings itself is not modified."""
+    merged = copy.deepcopy(settings)
+    _merge_into(merged, diff)
+    return merged
+
+
+def _merge_into(target: Dict[str, Any], diff: Dict[str, Any]):
+    for key, value in diff.items():
+        if value is REMOVED:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_into(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+class SettingsStore:
+    """Persists settings.json from a background writer thread.
+
+    save() only snapshots the dict and returns. Bursts of saves within `debounce` seconds
+    collapse into one atomic write, after which subscribers receive the diff against the
+    previously persisted settings.
+    """
+
+    def __init__(self, path: Path, settings: Dict[str, Any], debounce: float = 0.5):
+        self.path = Path(path)
+        self.debounce = debounce
+        self._persisted = copy.deepcopy(settings)
+        self._pending = None
+        self._due = 0.0
+        self._busy = False
+        self._closed = False
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='settings-writer', daemon=True)
+        self._thread.start()
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        """Register callback(diff), called on the writer thread after each persisted change."""
+        self._listeners.append(callback)
+
+    def save(self, settings: Dict[str, Any]):
+        snapshot = copy.deepcopy(settings)
+        with self._cond:
+            self._pending = snapshot
+            self._due = time.monotonic() + self.debounce
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write any pending change now; returns False if it did not finish within timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._due = 0.0
+            self._cond.notify_all()
+            while self._pending is not None or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                # Debounce: keep waiting while new edits push the deadline back
+                while True:
+                    remaining = self._due - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        break
+                    self._cond.wait(remaining)
+                snapshot, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self._commit(snapshot)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _commit(self, snapshot: Dict[str, Any]):
+        diff = diff_settings(self._persisted, snapshot)
+        if not diff:
+            return
+        try:
+            write_json_atomic(self.path, snapshot)
+        except Exception as e:
+            logging.error(f"Failed to save settings to {self.path}: {e}")
+            return
+        self._persisted = snapshot
+        logging.debug(f"Settings saved ({', '.join(diff)})")
+        for callback in list(self._listeners):
+            try:
+                callback(diff)
+            except Exception:
+                logging.exception('Settings change listener failed')
@@ -0,0 +1,190 @@
+import copy
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+
+import window_utils
+from governor import thread_cpu
+from main import InputLock, MapleBot, load_settings
+from vision import OcrWorker, TemplateCache
+
+
+class SessionStats:
+    """Throughput counters for one bot session."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.ticks = 0
+        self.cpu_time = 0.0
+        self.busy_time = 0.0
+        self.throttled_time = 0.0
+        self.actions = {}
+
+    def record_tick(self, cpu_time: float, busy_time: float, action: Optional[str]):
+        self.ticks += 1
+        self.cpu_time += cpu_time
+        self.busy_time += busy_time
+        if action:
+            self.actions[action] = self.actions.get(action, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = max(1e-6, time.time() - self.started_at)
+        return {
+            'ticks': self.ticks,
+            'ticks_per_min': self.ticks * 60.0 / elapsed,
+            'avg_tick_ms': (self.busy_time / self.ticks * 1000.0) if self.ticks else 0.0,
+            'cpu_share': self.cpu_time / elapsed,
+            'throttled_s': self.throttled_time,
+            'attacks_per_min': self.actions.get('attack', 0) * 60.0 / elapsed,
+            'actions': dict(self.actions),
+        }
+
+
+class BotSession:
+    """One MapleBot pinned to one game window, ticked by its own thread under a CPU budget.
+
+    cpu_budget is the fraction of one core the session may use (0.25 = 25%). It becomes the bot's
+    governor.cpu_budget, so the session's tick governor paces every loop of that bot within it.
+    """
+
+    def __init__(self, hwnd: int, title: str, settings: Dict[str, Any], template_cache: TemplateCache,
+                 ocr: OcrWorker, input_lock, cpu_budget: float = 0.25, index: int = 0):
+        self.hwnd = hwnd
+        self.title = title
+        self.cpu_budget = cpu_budget
+        self.stats = SessionStats()
+        settings = copy.deepcopy(settings)
+        settings.setdefault('governor', {})['cpu_budget'] = cpu_budget
+        telemetry = settings.get('telemetry') or {}
+        if telemetry.get('enabled') and index:
+            # One endpoint per session: telemetry.port, telemetry.port + 1, ...
+            telemetry['port'] = int(telemetry.get('port', 8765)) + index
+        self.bot = MapleBot(settings, template_cache=template_cache, ocr=ocr, hwnd=hwnd, input_lock=input_lock)
+        self._thread = None
+
+    @property
+    def name(self):
+        return f"{self.title} [{self.hwnd}]"
+
+    def start(self) -> bool:
+        if not self.bot.start(run_main_loop=False):
+            logging.error(f"Session {self.name} failed to start")
+            return False
+        self.stats = SessionStats()
+        self._thread = threading.Thread(target=self._run, name=f"session-{self.hwnd}", daemon=True)
+        self._thread.start()
+        self.bot.profiler.watch(self._thread)
+        logging.info(f"Session {self.name} started (cpu budget {self.cpu_budget:.0%})")
+        return True
+
+    def stop(self):
+        self.bot.stop()
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while self.bot.running:
+            wall_start = time.perf_counter()
+            cpu_start = thread_cpu()
+            keep_running = True
+            try:
+                with self.bot.governor.measure('main'):
+                    keep_running = self.bot.run_tick()
+            except Exception as e:
+                logging.error(f"Error in session {self.name}: {e}")
+                time.sleep(5)
+            busy = time.perf_counter() - wall_start
+            cpu = thread_cpu() - cpu_start
+            self.stats.record_tick(cpu, busy, self.bot.last_action)
+            if not keep_running:
+                break
+            self.bot.governor.set_activity('main', self.bot.in_combat())
+            self.stats.throttled_time += self.bot.governor.wait('main', lambda: not self.bot.running)
+
+
+class BotSupervisor:
+    """Discovers every game window matching a title and runs one BotSession per window.
+
+    All sessions share one TemplateCache, one OcrWorker and one input lock.
+    """
+
+    def __init__(self, settings: Dict[str, Any]):
+        self.settings = settings
+        cfg = settings.get('supervisor', {})
+        self.window_title = cfg.get('window_title') or settings.get('ui', {}).get('game_window_title', '')
+        self.cpu_budget = float(cfg.get('cpu_budget', 0.25))
+        self.stats_interval = float(cfg.get('stats_interval', 60))
+        self.max_sessions = int(cfg.get('max_sessions', 0))
+        # OpenCV's pool threads are shared by every session and invisible to thread_cpu(); running
+        # cv2 on the calling thread keeps each session's governor and stats to its own work
+        cv2.setNumThreads(1)
+        self.template_cache = TemplateCache()
+        self.ocr = OcrWorker(settings)
+        self.input_lock = InputLock()
+        self.sessions: List[BotSession] = []
+
+    def discover(self):
+        """Return (hwnd, title) for every window matching the configured title."""
+        windows = window_utils.find_windows_by_title(self.window_title)
+        if self.max_sessions > 0:
+            windows = windows[:self.max_sessions]
+        return windows
+
+    def start(self) -> int:
+        """Start a session per matching window; returns number of sessions started."""
+        known = {s.hwnd for s in self.sessions}
+        for hwnd, title in self.discover():
+            if hwnd in known:
+                continue
+            session = BotSession(hwnd, title, self.settings, self.template_cache, self.ocr,
+                                 self.input_lock, self.cpu_budget, index=len(self.sessions))
+            if session.start():
+                self.sessions.append(session)
+        if not self.sessions:
+            logging.error(f"No game windows matching '{self.window_title}' could be started")
+        return len(self.sessions)
+
+    def stop(self):
+        for session in self.sessions:
+            session.stop()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {s.name: s.stats.snapshot() for s in self.sessions}
+
+    def log_stats(self):
+        for name, snap in self.stats().items():
+            logging.info(
+                f"[{name}] ticks={snap['ticks']} ({snap['ticks_per_min']:.1f}/min) "
+                f"avg_tick={snap['avg_tick_ms']:.0f}ms cpu={snap['cpu_share']:.0%} "
+                f"attacks/min={snap['attacks_per_min']:.1f} throttled={snap['throttled_s']:.0f}s"
+            )
+        logging.info(f"OCR queue depth: {self.ocr.pending()}")
+
+    def run_forever(self):
+        if not self.start():
+            return
+        try:
+            while any(s.is_alive() for s in self.sessions):
+                time.sleep(self.stats_interval)
+                self.log_stats()
+        except KeyboardInterrupt:
+            logging.info("Interrupted, stopping all sessions")
+        finally:
+            self.stop()
+            self.log_stats()
+
+
+def main():
+    base = Path(__file__).parent
+    settings = load_settings(base / 'config' / 'settings.json')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
+    BotSupervisor(settings).run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+from collections import namedtuple
+from typing import List
+
+import numpy as np
+
+# One ranked entry: the monster to walk up to (anchor), how many monsters one attack from there
+# is expected to hit, the estimated seconds of travel, and hits per second of travel + attack.
+TargetPlan = namedtuple('TargetPlan', 'x y hits cluster cluster_size travel score')
+
+APPROACH_GAP = 30  # CombatManager.attack stops this far in front of the anchor
+
+
+def rank_targets(points, char_x: int, char_y: int, char_left: bool, cfg) -> List[TargetPlan]:
+    """Score every detected monster as an attack anchor and return one plan per cluster, best first.
+
+    All candidates are handled as numpy arrays: range/direction filtering, gap clustering on x,
+    a sliding attack window (searchsorted) for expected hits, and a kills-per-second score
+    hits / (travel + attack time). Turning around costs targeting.turn_seconds.
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if not len(pts):
+        return []
+    dx = pts[:, 0] - char_x
+    dy = pts[:, 1] - char_y
+    mask = (np.abs(dy) < cfg.y_range) & (np.abs(dx) < cfg.x_range)
+    opposite = (dx > 0) if char_left else (dx < 0)
+    if cfg.handle_opposite:
+        mask &= ~opposite
+    pts, dx, opposite = pts[mask], dx[mask], opposite[mask]
+    if not len(pts):
+        return []
+
+    order = np.argsort(pts[:, 0], kind='stable')
+    pts, dx, opposite = pts[order], dx[order], opposite[order]
+    xs = pts[:, 0]
+    idx = np.arange(len(xs))
+
+    # Gap clustering along x
+    cluster = np.concatenate(([0], np.cumsum(np.diff(xs) > cfg.target_cluster_gap)))
+    cluster_size = np.bincount(cluster)[cluster]
+
+    # The character faces the anchor; the attack covers attack_range px beyond it
+    reach = cfg.target_attack_range
+    ahead_right = np.searchsorted(xs, xs + reach, side='right') - idx
+    ahead_left = idx - np.searchsorted(xs, xs - reach, side='left') + 1
+    hits = np.minimum(np.where(dx >= 0, ahead_right, ahead_left), cfg.target_max_hits)
+
+    speed = cfg.speed_factor / 0.5
+    travel = np.maximum(0.0, np.abs(dx) - APPROACH_GAP) / speed + opposite * cfg.target_turn_seconds
+    score = hits / (travel + cfg.key_down_time + cfg.attack_delay)
+
+    # Best anchor per cluster, clusters ranked by score (ties: shorter travel)
+    ranked = np.lexsort((travel, -score))
+    plans = []
+    seen = set()
+    for i in ranked:
+        c = int(cluster[i])
+        if c in seen:
+            continue
+        seen.add(c)
+        plans.append(TargetPlan(int(xs[i]), int(pts[i, 1]), int(hits[i]), c, int(cluster_size[i]),
+                                float(travel[i]), float(score[i])))
+    return plans
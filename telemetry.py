@@ -0,0 +1,164 @@
+import bisect
+import contextlib
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from metrics import STATES
+
+# Timed perception steps; each row is written by one bot thread only
+DETECTORS = ('capture', 'enemy', 'lie', 'chat', 'other_user', 'top_floor', 'character', 'world', 'targets',
+             'hp_mp', 'user')
+# Upper bucket edges of the latency histograms, in ms (one more bucket collects everything above)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+# Per-second slots kept for the tick-rate and capture-rate windows
+RATE_SLOTS = 60
+RATE_WINDOW = 10
+
+_DETECTOR_INDEX = {name: i for i, name in enumerate(DETECTORS)}
+_ACTION_INDEX = {name: i for i, name in enumerate(STATES)}
+
+
+class Telemetry:
+    """Live performance counters of one bot, served as JSON on a local HTTP endpoint.
+
+    Everything lives in arrays allocated up front. The bot threads only increment elements (each
+    histogram row has a single writer), and a scrape copies the arrays without taking a lock, so
+    a slow or stuck client can never hold up a tick; at worst a scrape sees a tick half-recorded.
+    The endpoint (telemetry.enabled, default off) binds telemetry.host:telemetry.port.
+    """
+
+    def __init__(self, cfg, ocr_depth: Optional[Callable[[], int]] = None):
+        self.cfg = cfg
+        self.ocr_depth = ocr_depth
+        self.started = time.time()
+        self._hist = np.zeros((len(DETECTORS), len(LATENCY_BUCKETS_MS) + 1), dtype=np.int64)
+        self._latency_sum = np.zeros(len(DETECTORS), dtype=np.float64)
+        self._actions = np.zeros(len(STATES), dtype=np.int64)
+        # rows: ticks, grabs; columns: one per second, valid when _slot_second matches
+        self._rates = np.zeros((2, RATE_SLOTS), dtype=np.int64)
+        self._slot_second = np.full(RATE_SLOTS, -1, dtype=np.int64)
+        self._totals = np.zeros(2, dtype=np.int64)
+        self._server = None
+        self._thread = None
+
+    # --- recording (bot threads) ------------------------------------------------------------
+    def observe(self, detector: str, seconds: float):
+        row = _DETECTOR_INDEX[detector]
+        ms = seconds * 1000.0
+        self._hist[row, bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self._latency_sum[row] += ms
+
+    @contextlib.contextmanager
+    def timed(self, detector: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(detector, time.perf_counter() - started)
+
+    def record_tick(self, action: Optional[str], grabs: int = 0, now: Optional[float] = None):
+        second = int(now or time.time())
+        slot = second % RATE_SLOTS
+        if self._slot_second[slot] != second:
+            self._rates[:, slot] = 0
+            self._slot_second[slot] = second
+        self._rates[0, slot] += 1
+        self._rates[1, slot] += grabs
+        self._totals[0] += 1
+        self._totals[1] += grabs
+        index = _ACTION_INDEX.get(action)
+        if index is not None:
+            self._actions[index] += 1
+
+    # --- reading (server thread) ------------------------------------------------------------
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = now or time.time()
+        second = int(now)
+        # Complete seconds only; the current one is still filling up
+        recent = (self._slot_second < second) & (self._slot_second >= second - RATE_WINDOW)
+        window = self._rates[:, recent].sum(axis=1)
+        hist = self._hist.copy()
+        latency_sum = self._latency_sum.copy()
+        detectors = {}
+        for name, row in _DETECTOR_INDEX.items():
+            count = int(hist[row].sum())
+            if count:
+                detectors[name] = {
+                    'count': count,
+                    'mean_ms': float(latency_sum[row] / count),
+                    'buckets_ms': list(LATENCY_BUCKETS_MS) + ['inf'],
+                    'histogram': hist[row].tolist(),
+                }
+        ocr_depth = None
+        if self.ocr_depth is not None:
+            try:
+                ocr_depth = int(self.ocr_depth())
+            except Exception:
+                pass
+        return {
+            'uptime_s': now - self.started,
+            'ticks': int(self._totals[0]),
+            'tick_rate': float(window[0]) / RATE_WINDOW,
+            'capture_fps': float(window[1]) / RATE_WINDOW,
+            'grabs': int(self._totals[1]),
+            'ocr_queue_depth': ocr_depth,
+            'actions': {name: int(n) for name, n in zip(STATES, self._actions.tolist())},
+            'detectors': detectors,
+        }
+
+    # --- endpoint ---------------------------------------------------------------------------
+    def apply(self, cfg):
+        """Start or stop the endpoint to follow telemetry.enabled."""
+        self.cfg = cfg
+        if cfg.telemetry_enabled and self._server is None:
+            self.start()
+        elif not cfg.telemetry_enabled and self._server is not None:
+            self.stop()
+
+    def start(self):
+        if self._server is not None:
+            return
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(telemetry.snapshot()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.cfg.telemetry_host, self.cfg.telemetry_port), Handler)
+        except OSError as e:
+            logging.error(f"Telemetry endpoint could not bind {self.cfg.telemetry_host}:{self.cfg.telemetry_port}: {e}")
+            return
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='telemetry', daemon=True)
+        self._thread.start()
+        logging.info(f"Telemetry endpoint on http://{self.address[0]}:{self.address[1]}/metrics")
+
+    @property
+    def address(self):
+        return self._server.server_address if self._server is not None else None
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,94 @@
+import argparse
+import json
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from telemetry import LATENCY_BUCKETS_MS
+
+
+def fetch(url: str, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+    """One client's telemetry snapshot, or None if it does not answer."""
+    if not url.startswith('http'):
+        url = f"http://{url}"
+    if not url.rstrip('/').endswith('/metrics'):
+        url = url.rstrip('/') + '/metrics'
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except Exception:
+        return None
+
+
+def merge(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum counters, rates and histograms over clients (OCR depth: the deepest queue)."""
+    merged = {'clients': len(snapshots), 'ticks': 0, 'tick_rate': 0.0, 'capture_fps': 0.0, 'grabs': 0,
+              'ocr_queue_depth': None, 'actions': {}, 'detectors': {}}
+    for snap in snapshots:
+        for key in ('ticks', 'tick_rate', 'capture_fps', 'grabs'):
+            merged[key] += snap.get(key, 0)
+        depth = snap.get('ocr_queue_depth')
+        if depth is not None:
+            merged['ocr_queue_depth'] = max(depth, merged['ocr_queue_depth'] or 0)
+        for name, count in snap.get('actions', {}).items():
+            merged['actions'][name] = merged['actions'].get(name, 0) + count
+        for name, det in snap.get('detectors', {}).items():
+            total = merged['detectors'].setdefault(name, {
+                'count': 0, 'mean_ms': 0.0, 'buckets_ms': list(LATENCY_BUCKETS_MS) + ['inf'],
+                'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1)})
+            count = total['count'] + det['count']
+            total['mean_ms'] = (total['mean_ms'] * total['count'] + det['mean_ms'] * det['count']) / count
+            total['count'] = count
+            total['histogram'] = [a + b for a, b in zip(total['histogram'], det['histogram'])]
+    return merged
+
+
+def percentile_ms(detector: Dict[str, Any], q: float) -> str:
+    """Upper bucket edge holding the q-th quantile of a latency histogram."""
+    target = q * detector['count']
+    seen = 0
+    for edge, n in zip(detector['buckets_ms'], detector['histogram']):
+        seen += n
+        if seen >= target:
+            return f"<={edge}" if edge != 'inf' else f">{LATENCY_BUCKETS_MS[-1]}"
+    return '-'
+
+
+def format_view(per_client: Dict[str, Optional[Dict[str, Any]]], merged: Dict[str, Any]) -> str:
+    lines = [f"{'client':<28} {'ticks/s':>8} {'grabs/s':>8} {'ocr q':>6}  actions"]
+    for url, snap in per_client.items():
+        if snap is None:
+            lines.append(f"{url:<28} {'down':>8}")
+            continue
+        actions = ' '.join(f"{k}={v}" for k, v in snap['actions'].items() if v)
+        lines.append(f"{url:<28} {snap['tick_rate']:8.2f} {snap['capture_fps']:8.2f} "
+                     f"{snap['ocr_queue_depth'] if snap['ocr_queue_depth'] is not None else '-':>6}  {actions}")
+    lines.append(f"{'total (' + str(merged['clients']) + ' up)':<28} {merged['tick_rate']:8.2f} "
+                 f"{merged['capture_fps']:8.2f} {merged['ocr_queue_depth'] if merged['ocr_queue_depth'] is not None else '-':>6}")
+    lines.append('')
+    lines.append(f"{'detector':<12} {'count':>9} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, det in merged['detectors'].items():
+        lines.append(f"{name:<12} {det['count']:9d} {det['mean_ms']:8.1f} "
+                     f"{percentile_ms(det, 0.5):>8} {percentile_ms(det, 0.95):>8}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Merge the telemetry endpoints of several bot clients.')
+    parser.add_argument('endpoints', nargs='+', help='host:port or URL of each client')
+    parser.add_argument('--watch', type=float, default=0, help='refresh every N seconds')
+    parser.add_argument('--json', action='store_true', help='print the merged snapshot as JSON')
+    args = parser.parse_args(argv)
+    while True:
+        per_client = {url: fetch(url) for url in args.endpoints}
+        merged = merge([snap for snap in per_client.values() if snap is not None])
+        print(json.dumps(merged, indent=2) if args.json else format_view(per_client, merged))
+        if args.watch <= 0:
+            return 0 if merged['clients'] else 1
+        time.sleep(args.watch)
+        print()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
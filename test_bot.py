@@ -1,6 +1,35 @@
 import unittest
-from unittest.mock import Mock, patch
-from main import MapleBot
+from unittest.mock import MagicMock, Mock, patch
+from main import InputLock, MapleBot
+from compiled_settings import compile_settings
+from settings_store import apply_settings_diff, diff_settings
+import window_utils
+from world_model import MapMemory, WorldModel
+from navigation import NavGraph, Navigator
+from movement import MoveController
+from targeting import rank_targets
+from combat import CombatManager
+from metrics import Metrics
+from governor import TickGovernor, charge_cpu
+from scheduler import JobScheduler
+from channel_flow import ChannelChangeFlow
+from capture_planner import FrameSet, merge_regions
+from vision import BufferPool, OcrWorker, Vision
+import threading
+import subprocess
+import sys
+from headless import HeadlessRunner
+import import_report
+from profiler import SamplingProfiler
+from telemetry import Telemetry
+import telemetry_aggregate
+from flight_recorder import FlightRecorder, read_incident
+import scene_generator
+from scene_generator import SceneGenerator, SceneParams
+import numpy as np
+import cv2
+import json
+import tempfile
 from pathlib import Path
 
 
@@ -9,27 +38,552 @@ class TestMapleBot(unittest.TestCase):
         self.settings = {
             'vision': {'assets_path': 'assets'},
             'monsters': ['test.png'],
+            'preconditions': {'os': 'windows', 'resolution': '1920x1080', 'min_scale': 0.5},
             'debug': {'simulation_mode': True}
         }
         self.bot = MapleBot(self.settings)
 
     def test_verify_preconditions_success(self):
         with patch('platform.system', return_value='Windows'), \
-             patch('pyautogui.size', return_value=(1920, 1080)):
+             patch.object(Vision, 'client_size', return_value=(1920, 1080)):
             issues = self.bot.verify_preconditions()
             self.assertEqual(len(issues), 0)
+        # a smaller window of the same aspect ratio is scaled to
+        with patch('platform.system', return_value='Windows'), \
+             patch.object(Vision, 'client_size', return_value=(1280, 720)):
+            self.assertEqual(self.bot.verify_preconditions(), [])
 
     def test_verify_preconditions_failure(self):
         with patch('platform.system', return_value='Linux'), \
-             patch('pyautogui.size', return_value=(1920, 1080)):
+             patch.object(Vision, 'client_size', return_value=(1920, 1080)):
             issues = self.bot.verify_preconditions()
-            self.assertIn("OS must be Windows", issues)
+            self.assertIn("OS must be windows, current: Linux", issues)
+
+    def test_verify_preconditions_rejects_other_aspect_ratio(self):
+        with patch('platform.system', return_value='Windows'), \
+             patch.object(Vision, 'client_size', return_value=(1024, 768)):
+            issues = self.bot.verify_preconditions()
+            self.assertEqual(issues, ["Aspect ratio must match 1920x1080, current: 1024x768"])
+
+    def test_verify_preconditions_rejects_view_below_min_scale(self):
+        with patch('platform.system', return_value='Windows'), \
+             patch.object(Vision, 'client_size', return_value=(640, 360)):
+            issues = self.bot.verify_preconditions()
+            self.assertEqual(len(issues), 1)
+            self.assertIn("below the minimum scale 0.50", issues[0])
 
     def test_start_simulation_mode(self):
         self.bot.simulation_mode = True
-        result = self.bot.start()
+        with patch('platform.system', return_value='Windows'), \
+             patch.object(Vision, 'client_size', return_value=(1920, 1080)):
+            result = self.bot.start()
+        self.bot.stop()
         self.assertTrue(result)  # Should succeed in simulation
 
 
+    def test_update_settings_toggles_debug_overlay(self):
+        overlay = self.bot.debug_overlay
+        self.assertFalse(overlay.enabled)
+        with patch.object(overlay, 'start') as start:
+            self.bot.update_settings(dict(self.settings, debug={'enable_debug': True, 'overlay_fps': 4}))
+            overlay.update(1, 2, 3, 4, 5, 6, 'idle')
+        start.assert_called_once()
+        self.assertEqual((overlay.enabled, overlay.fps), (True, 4.0))
+        overlay._thread = Mock()
+        self.bot.update_settings(dict(self.settings, debug={'enable_debug': False}))
+        self.assertTrue(overlay._stop)
+        self.assertIsNone(overlay._latest)
+
+class TestInputLock(unittest.TestCase):
+    def test_threads_of_the_owner_share_it_other_bots_wait(self):
+        lock = InputLock()
+        bot, other = object(), object()
+        events = []
+
+        def press(owner, label):
+            with lock.hold(owner):
+                events.append(label)
+
+        with lock.hold(bot):
+            # Another thread of the same bot (a potion press during an attack hold) goes ahead
+            same = threading.Thread(target=press, args=(bot, 'potion'))
+            same.start()
+            same.join(1)
+            waiter = threading.Thread(target=press, args=(other, 'other bot'))
+            waiter.start()
+            waiter.join(0.1)
+            self.assertEqual(events, ['potion'])
+        waiter.join(1)
+        self.assertEqual(events, ['potion', 'other bot'])
+
+
+class TestCompiledSettings(unittest.TestCase):
+    def test_parses_and_falls_back(self):
+        cfg = compile_settings({
+            'vision': {'lie_threshold': '0.9', 'enemy_threshold': 'bad', 'chat_colors': {'whisper': '#ff99ff'}},
+            'misc': {'lie_detector': 'True'},
+        })
+        self.assertEqual(cfg.lie_threshold, 0.9)
+        self.assertEqual(cfg.enemy_threshold, 0.7)
+        self.assertTrue(cfg.lie_detector)
+        label, lower, upper = cfg.chat_ranges[0]
+        self.assertEqual(label, 'whisper')
+        self.assertEqual(list(upper), [255, 183, 255])
+
+    def test_snapshot_is_immutable(self):
+        cfg = compile_settings({})
+        with self.assertRaises(AttributeError):
+            cfg.x_range = 10
+
+
+class TestSettingsDiff(unittest.TestCase):
+    def test_diff_roundtrip(self):
+        old = {'misc': {'lie_detector': True, 'stationary': False}, 'routes': [], 'auth': {'id': ''}}
+        new = {'misc': {'lie_detector': False, 'stationary': False}, 'routes': [{'name': 'r'}]}
+        diff = diff_settings(old, new)
+        self.assertEqual(diff['misc'], {'lie_detector': False})
+        self.assertEqual(apply_settings_diff(old, diff), new)
+        self.assertTrue(old['misc']['lie_detector'])
+
+
+class TestWindowUtilsFakeBackend(unittest.TestCase):
+    def setUp(self):
+        self.fake = window_utils.FakeBackend(focus_delay=0.01)
+        self.previous = window_utils.set_backend(self.fake)
+
+    def tearDown(self):
+        window_utils.set_backend(self.previous)
+
+    def test_find_focus_and_track(self):
+        hwnd = self.fake.add_window('Mapleland - client 1', (100, 50, 1280, 720))
+        self.fake.add_window('Mapleland - client 2')
+        self.fake.add_window('Notepad')
+        self.assertEqual(len(window_utils.find_windows_by_title('mapleland')), 2)
+        self.assertTrue(window_utils.focus_window(hwnd, timeout=1.0))
+        tracker = window_utils.WindowTracker(hwnd)
+        self.assertEqual(tracker.rect(), (100, 50, 1280, 720))
+        self.fake.move_window(hwnd, (0, 0, 960, 540))
+        self.assertEqual(tracker.rect(), (0, 0, 960, 540))
+
+
+    def test_focus_restores_only_minimized_windows(self):
+        hwnd = self.fake.add_window('Mapleland')
+        with patch.object(self.fake, 'restore', wraps=self.fake.restore) as restore:
+            self.assertTrue(window_utils.focus_window(hwnd, timeout=1.0))
+            restore.assert_not_called()
+            self.fake.set_foreground(0)
+            self.fake.windows[hwnd]['minimized'] = True
+            self.assertTrue(window_utils.focus_window(hwnd, timeout=1.0))
+            restore.assert_called_once_with(hwnd)
+        self.assertTrue(window_utils.is_foreground(hwnd))
+
+class TestWorldModel(unittest.TestCase):
+    def test_tracks_keep_ids_and_expire(self):
+        vision = Mock()
+        vision.frame_size.return_value = (1920, 1080)
+        vision.template_size.return_value = (60, 50)
+        world = WorldModel(vision, compile_settings({'world': {'track_max_misses': 1}}), ['a.png'])
+        vision.find_monsters.return_value = [(500, 600, 0), (502, 601, 0), (900, 600, 0)]
+        tracks = world.update_monsters(now=100.0)
+        self.assertEqual(len(tracks), 2)
+        ids = {t.id for t in tracks}
+        # Between full scans only ROI re-checks run; the monster moved a little
+        vision.find_monsters.side_effect = lambda paths, roi=None: [(roi[0] + 50, roi[1] + 40, 0)]
+        tracks = world.update_monsters(now=100.5)
+        self.assertEqual({t.id for t in tracks}, ids)
+        self.assertIn((510, 600), world.monster_points())
+        vision.find_monsters.side_effect = lambda paths, roi=None: []
+        world.update_monsters(now=101.0)
+        self.assertEqual(world.monster_points(), [])
+        world.update_monsters(now=101.2)
+        self.assertEqual(world.tracks, {})
+
+
+    def test_platforms_learned_from_steady_positions(self):
+        memory = MapMemory('map')
+        # a jump arc: y changes every observation, nothing is learned
+        for x, y in ((500, 600), (510, 560), (520, 530), (530, 560)):
+            memory.observe_character(x, y)
+        # hanging on a rope: steady y, but the span never gets wide enough
+        for _ in range(5):
+            memory.observe_character(300, 450)
+        self.assertEqual((memory.platforms, memory.version), ([], 0))
+        for x in (500, 505, 510, 530, 560):
+            memory.observe_character(x, 600)
+        self.assertEqual((memory.platforms, memory.version), ([[600, 510, 560]], 1))
+        # widening in place does not invalidate the navigation graph
+        memory.observe_character(580, 603)
+        self.assertEqual((memory.platforms, memory.version), ([[600, 510, 580]], 1))
+
+class TestNavGraph(unittest.TestCase):
+    def test_plan_uses_rope_and_drop(self):
+        cfg = compile_settings({})
+        # ground floor, a middle floor reachable only by rope, and a top floor above it
+        graph = NavGraph([(900, 0, 1900), (600, 200, 900), (500, 1200, 1700)], ropes=[(300, 650)], cfg=cfg)
+        plan = graph.plan((1500, 900), (500, 600))
+        self.assertEqual(plan, [('walk', 300), ('climb', 300), ('walk', 500)])
+        self.assertIsNone(graph.plan((1500, 900), (1400, 500)))
+        self.assertEqual(graph.plan((500, 600), (1000, 900)), [('walk', 550), ('drop', 550), ('walk', 1000)])
+        self.assertLess(graph.cost((1500, 900), (500, 600)), float('inf'))
+
+    def test_drops_and_jumps_reach_only_the_nearest_platform(self):
+        cfg = compile_settings({})
+        # three stacked floors under each other, 60 px apart
+        graph = NavGraph([(900, 0, 1900), (840, 200, 900), (780, 300, 600)], cfg=cfg)
+        top, middle, ground = (graph.platform_at(400, y) for y in (780, 840, 900))
+        self.assertIn((top, middle), graph.edges)
+        self.assertNotIn((top, ground), graph.edges)
+        self.assertIn((middle, ground), graph.edges)
+        self.assertNotIn((ground, top), graph.edges)
+        self.assertEqual(graph.edges[(ground, middle)][0], 'jump')
+        self.assertEqual(graph.plan((400, 780), (1500, 900)),
+                         [('walk', 450), ('drop', 450), ('walk', 550), ('drop', 550), ('walk', 1500)])
+
+    def test_route_graph_follows_learned_ropes(self):
+        memory = Mock(key='map', version=1, ropes=[])
+        navigator = Navigator(Mock(map=memory), compile_settings({}))
+        navigator.set_route({'platforms': [[900, 0, 1900], [600, 200, 900]]})
+        self.assertIsNone(navigator.graph().plan((1500, 900), (500, 600)))
+        memory.ropes, memory.version = [(300, 650)], 2
+        self.assertEqual(navigator.graph().plan((1500, 900), (500, 600))[1], ('climb', 300))
+
+
+class TestMoveController(unittest.TestCase):
+    def test_releases_key_at_target(self):
+        vision = Mock()
+        vision.frame_size.return_value = (1920, 1080)
+        positions = iter([(520, 600, False), (None, None, None), (600, 600, False), (692, 600, False)])
+        vision.find_character_coordinates.side_effect = lambda region: next(positions)
+        controller = MoveController(vision, compile_settings({}))
+        with patch('movement.pyautogui') as keys:
+            x = controller.move(500, 700, character_y=600)
+        self.assertEqual(x, 692)
+        self.assertEqual(keys.keyUp.call_args_list[0][0], ('right',))
+        summary = controller.summary()
+        self.assertEqual(summary['moves'], 1)
+        self.assertEqual(summary['corrections'], 0)
+        self.assertAlmostEqual(summary['lost_ratio'], 0.25)
+
+
+class TestTargeting(unittest.TestCase):
+    def test_cluster_beats_nearer_single(self):
+        cfg = compile_settings({'monster_settings': {'x_range': 600, 'handle_opposite': False}})
+        # one monster close on the left, a pack of three a bit further right
+        points = [(900, 600), (1100, 600), (1150, 605), (1200, 600), (1000, 900)]
+        plans = rank_targets(points, 960, 600, True, cfg)
+        self.assertEqual((plans[0].x, plans[0].hits), (1100, 3))
+        self.assertEqual(plans[1].x, 900)
+        self.assertEqual(len(plans), 2)
+        cfg = compile_settings({'monster_settings': {'x_range': 600, 'handle_opposite': True}})
+        self.assertEqual([p.x for p in rank_targets(points, 960, 600, True, cfg)], [900])
+
+    def test_close_target_behind_is_faced_before_attacking(self):
+        combat = CombatManager({'hotkeys': {'key_down_time': 0, 'attack_delay': 0}}, Mock())
+        combat.controller = Mock()
+        with patch('combat.pyautogui') as keys:
+            # Facing right, monster 20 px to the left: no approach, but the character must turn
+            combat.attack((940, 600), 960, False, 600)
+        combat.controller.move.assert_not_called()
+        keys.press.assert_called_once_with('left')
+        calls = keys.method_calls
+        self.assertLess(calls.index(unittest.mock.call.press('left')), calls.index(unittest.mock.call.keyDown('ctrl')))
+
+
+class TestMetrics(unittest.TestCase):
+    def test_minutes_persist_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'metrics.jsonl'
+            metrics = Metrics({'metrics': {'path': str(path), 'history_minutes': 5}})
+            metrics.incr('attacks', now=600.0)
+            metrics.record_tick('attack', 4.5, now=610.0)
+            metrics.close()
+            metrics.incr('attacks', now=620.0)
+            metrics.incr('kills', now=665.0)  # next minute: completes minute 10
+            self.assertEqual(metrics.window(minutes=2, now=665.0)['attacks'], 2)
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+            self.assertEqual([line['type'] for line in lines], ['session', 'minute', 'stop', 'minute'])
+            self.assertEqual(sum(line.get('attacks', 0) for line in lines if line['type'] == 'minute'), 2)
+
+
+class TestTickGovernor(unittest.TestCase):
+    def test_activity_and_budget(self):
+        governor = TickGovernor(compile_settings({'governor': {'cpu_budget': 0.5}}))
+        self.assertAlmostEqual(governor.interval('potion'), 1.5)
+        governor.set_activity('potion', True)
+        self.assertAlmostEqual(governor.interval('potion'), 0.3)
+        governor.set_activity('potion', False)
+        self.assertGreater(governor.interval('potion'), 0.3)
+        # main: 100 ms of CPU per tick against 0.5 * 0.7 of a core
+        main = governor._get('main')
+        main.cost, main.busy = 0.1, 0.1
+        governor.set_activity('main', True)
+        self.assertAlmostEqual(governor.interval('main'), 0.1 / 0.35 - 0.1)
+
+    def test_cpu_spent_for_a_loop_on_other_threads_counts(self):
+        governor = TickGovernor(compile_settings({}))
+        ocr = OcrWorker.__new__(OcrWorker)
+        ocr._requests = Mock()
+        # The OCR worker answers with the result and the CPU time the request took
+        ocr._requests.put.side_effect = lambda request: request[1].put((True, ['100/200'], 0.4))
+        with governor.measure('potion'):
+            self.assertEqual(ocr.readtext(None), ['100/200'])
+            charge_cpu(0.1)
+        self.assertGreaterEqual(governor._get('potion').cost, governor.SMOOTHING * 0.5)
+
+
+class TestJobScheduler(unittest.TestCase):
+    def test_exactly_once_per_period(self):
+        fired = []
+        scheduler = JobScheduler(clock=lambda: 0.0)
+        scheduler.add('buff', 60, lambda: fired.append('buff'), now=0.0)
+        for t in range(0, 180, 5):
+            scheduler.run_due(now=float(t))
+        self.assertEqual(fired, ['buff'] * 3)
+        # Due at 180; an attack starting at 178 pulls it forward, and it does not fire again at 180
+        self.assertEqual(scheduler.run_due(lead=4.5, now=178.0), 1)
+        self.assertEqual(scheduler.run_due(now=181.0), 0)
+        self.assertEqual(scheduler.next_due(), 240.0)
+        # Paused for several periods: one late run, then back on the grid
+        self.assertEqual(scheduler.run_due(now=500.0), 1)
+        self.assertEqual(scheduler.get('buff').skipped, 4)
+        self.assertEqual(scheduler.next_due(), 540.0)
+
+    def test_maintenance_period_zero_removes_job(self):
+        bot = Mock(scheduler=JobScheduler(), cfg=compile_settings({}))
+        MapleBot.schedule_maintenance(bot)
+        self.assertEqual(sorted(bot.scheduler.names()), ['maintenance:home', 'maintenance:pageup'])
+        bot.cfg = compile_settings({'maintenance': {'pageup': 0, 'home': 1800}})
+        MapleBot.schedule_maintenance(bot)
+        self.assertEqual(list(bot.scheduler.names()), ['maintenance:home'])
+
+    def test_invalid_maintenance_period_falls_back_to_default(self):
+        cfg = compile_settings({'maintenance': {'pageup': 'ten minutes', 'end': 'x', 'home': 900}})
+        self.assertEqual(cfg.maintenance_periods, (('pageup', 600.0), ('end', 0.0), ('home', 900.0)))
+
+
+class TestChannelChangeFlow(unittest.TestCase):
+    def test_retries_until_channel_list_appears(self):
+        bot = MagicMock()
+        bot.running = True
+        bot.cfg = compile_settings({'channel': {'click_delay': 0, 'retries': 2}})
+        bot.vision.wait_until_visible.side_effect = [None, (1500, 300), (900, 700)]
+        bot.vision.template_size.return_value = (40, 20)
+        bot.vision.wait_until_gone.return_value = True
+        with patch('channel_flow.pyautogui') as keys:
+            self.assertTrue(ChannelChangeFlow(bot).run())
+        keys.press.assert_called_once_with('esc')
+        self.assertIn(((1520, 310),), bot.click.call_args_list)
+        self.assertEqual(bot.click.call_args_list[-1], ((579, 805),))
+
+
+class TestCapturePlanner(unittest.TestCase):
+    def test_merges_nearby_regions_only(self):
+        frame = (1920, 1080)
+        # Two thin strips next to each other become one grab; a far-away region stays separate
+        rects = merge_regions([(100, 978, 200, 12), (100, 995, 200, 12), (1500, 100, 100, 100)], frame)
+        self.assertEqual(sorted(rects), [(100, 978, 200, 29), (1500, 100, 100, 100)])
+        self.assertEqual(merge_regions([(0, 0, 10, 10), None], frame), [(0, 0, 1920, 1080)])
+        self.assertEqual(merge_regions([(0, 0, 1600, 1000)], frame), [(0, 0, 1920, 1080)])
+        self.assertEqual(merge_regions([(-50, -50, 100, 100)], frame), [(0, 0, 50, 50)])
+
+    def test_frame_set_views(self):
+        img = np.arange(100 * 200 * 3, dtype=np.uint8).reshape(100, 200, 3)
+        frames = FrameSet([((50, 40, 200, 100), (50, 40, 200, 100), img)], (0, 0, 1920, 1080))
+        view = frames.view((60, 50, 20, 10), (60, 50, 20, 10))
+        self.assertEqual(view.shape, (10, 20, 3))
+        self.assertTrue(np.shares_memory(view, img))
+        self.assertEqual(view[0, 0].tolist(), img[10, 10].tolist())
+        self.assertIsNone(frames.view((0, 0, 20, 10), (0, 0, 20, 10)))
+        self.assertIsNone(frames.view(None))
+
+
+class TestBufferPool(unittest.TestCase):
+    def test_buffers_are_reused_per_purpose_and_thread(self):
+        pool = BufferPool()
+        a = pool.get('capture', (10, 20, 3))
+        self.assertTrue(np.shares_memory(pool.get('capture', (10, 20, 3)), a))
+        self.assertFalse(np.shares_memory(pool.get('gray', (10, 20)), a))
+        other = []
+        thread = threading.Thread(target=lambda: other.append(pool.get('capture', (10, 20, 3))))
+        thread.start()
+        thread.join()
+        self.assertFalse(np.shares_memory(other[0], a))
+        self.assertEqual(pool.allocations, 3)
+        # The exited thread's block is dropped when a new one is made
+        pool.get('mask', (4, 4), np.bool_)
+        self.assertEqual(pool.stats()['buffers'], 3)
+
+    def test_varying_shapes_reuse_one_block(self):
+        pool = BufferPool()
+        pool.get('capture', (120, 300, 3))
+        allocations = pool.allocations
+        for h, w in ((100, 280), (118, 300), (60, 90), (120, 300)):
+            view = pool.get('capture', (h, w, 3))
+            self.assertEqual(view.shape, (h, w, 3))
+            self.assertTrue(view.flags['C_CONTIGUOUS'])
+        self.assertEqual(pool.allocations, allocations)
+
+    def test_template_matching_reaches_steady_state(self):
+        vision = Vision.__new__(Vision)
+        vision.buffers = BufferPool()
+        vision.scale = 1.0
+        rng = np.random.default_rng(0)
+        image = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+        template = image[40:60, 50:80].copy()
+        self.assertEqual(list(vision._points_above(vision._match(image, template), 0.99)), [(50, 40)])
+        allocations = vision.buffers.allocations
+        for _ in range(5):
+            list(vision._points_above(vision._match(image, template), 0.99))
+        self.assertEqual(vision.buffers.allocations, allocations)
+        self.assertIsNone(vision._match(template, image))
+
+
+class TestHeadless(unittest.TestCase):
+    def test_never_imports_ui_modules(self):
+        code = "import sys, headless; print([m for m in ('ui', 'customtkinter', 'tkinter') if m in sys.modules])"
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                             cwd=str(Path(__file__).parent), check=True).stdout
+        self.assertEqual(out.strip().splitlines()[-1], '[]')
+
+    def test_run_stops_bot_after_duration(self):
+        bot = Mock()
+        bot.start.return_value = True
+        bot.running = True
+        bot.metrics.totals.return_value = {}
+        self.assertEqual(HeadlessRunner(bot).run(duration=0.05, poll=0.01), 0)
+        bot.stop.assert_called_once()
+        bot.running = False
+        self.assertEqual(HeadlessRunner(bot).run(poll=0.01), 2)
+
+
+class TestImportBudget(unittest.TestCase):
+    def test_cold_start_stays_light(self):
+        # Heavy dependencies (OCR, UI toolkits, input automation) load only where they are used
+        for module in ('main', 'headless'):
+            rows = import_report.measure(module)
+            self.assertEqual(import_report.check(rows), [], import_report.report(rows, 15))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_collapsed_stacks_with_tick_numbers(self):
+        def busy_loop(stop):
+            while not stop.is_set():
+                sum(range(1000))
+
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name='main_logic')
+        worker.start()
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = compile_settings({'debug': {'profile': True, 'profile_hz': 200, 'profile_dir': tmp}})
+            profiler = SamplingProfiler(cfg, 'session1', lambda: 7)
+            profiler.watch(worker)
+            for _ in range(20):
+                profiler.sample()
+            stop.set()
+            worker.join()
+            profiler.flush()
+            totals = (Path(tmp) / 'session1.collapsed').read_text(encoding='utf-8').splitlines()
+            ticks = (Path(tmp) / 'session1.ticks.collapsed').read_text(encoding='utf-8').splitlines()
+        self.assertEqual(sum(int(line.rsplit(' ', 1)[1]) for line in totals), 20)
+        self.assertTrue(all(line.startswith('main_logic;') for line in totals))
+        self.assertTrue(any('busy_loop (test_bot.py' in line for line in totals))
+        self.assertTrue(all(line.startswith('main_logic;tick 7;') for line in ticks))
+
+
+class TestTelemetry(unittest.TestCase):
+    def test_endpoint_serves_counters_and_aggregates(self):
+        cfg = compile_settings({'telemetry': {'enabled': True, 'port': 0}})
+        telemetry = Telemetry(cfg, ocr_depth=lambda: 3)
+        for ms in (0.5, 4, 4, 300):
+            telemetry.observe('character', ms / 1000.0)
+        for second in range(100, 110):
+            telemetry.record_tick('attack', grabs=2, now=second + 0.5)
+        snap = telemetry.snapshot(now=110.2)
+        self.assertEqual(snap['tick_rate'], 1.0)
+        self.assertEqual(snap['capture_fps'], 2.0)
+        self.assertEqual(snap['actions']['attack'], 10)
+        self.assertEqual(snap['detectors']['character']['histogram'][:3], [1, 0, 2])
+        telemetry.apply(cfg)
+        try:
+            host, port = telemetry.address
+            fetched = telemetry_aggregate.fetch(f'{host}:{port}')
+        finally:
+            telemetry.stop()
+        self.assertEqual(fetched['ocr_queue_depth'], 3)
+        merged = telemetry_aggregate.merge([fetched, fetched])
+        self.assertEqual(merged['ticks'], 20)
+        self.assertEqual(merged['detectors']['character']['count'], 8)
+        self.assertEqual(telemetry_aggregate.percentile_ms(merged['detectors']['character'], 0.5), '<=5')
+
+
+class TestFlightRecorder(unittest.TestCase):
+    def test_ring_buffer_dumps_decodable_frames(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = compile_settings({'recorder': {'seconds': 5, 'scale': 0.5, 'max_fps': 10, 'keyframe_every': 3,
+                                                 'path': tmp, 'cooldown': 60}})
+            recorder = FlightRecorder(cfg)
+            frames = []
+            for i in range(20):
+                frame = np.zeros((40, 80, 3), dtype=np.uint8)
+                frame[10:20, i * 2:i * 2 + 10] = 255
+                frames.append(frame)
+                recorder.record(i, {'action': 'search', 'character': [i, 5, False]}, frame, now=100.0 + i * 0.5)
+            # Only the last 5 seconds are kept
+            self.assertTrue(recorder.incident('character_lost', now=110.0))
+            self.assertFalse(recorder.incident('character_lost', now=120.0))
+            recorder.flush()
+            dump = next(Path(tmp).iterdir())
+            events = read_incident(dump)
+        self.assertEqual([e['tick'] for e in events], list(range(9, 20)))
+        decoded = [e for e in events if e['image'] is not None]
+        self.assertGreaterEqual(len(decoded), 8)
+        last = decoded[-1]
+        expected = cv2.resize(frames[last['tick']], (40, 20), interpolation=cv2.INTER_AREA)
+        self.assertTrue(np.array_equal(last['image'], expected))
+        self.assertEqual(last['character'], [19, 5, False])
+
+
+class TestSceneGenerator(unittest.TestCase):
+    def _assets(self, root):
+        rng = np.random.default_rng(3)
+        (root / 'mob_templates').mkdir(parents=True)
+        (root / 'ui_elements').mkdir()
+        self.mobs = {name: rng.integers(0, 255, (16, 20, 3), dtype=np.uint8) for name in ('a.png', 'b.png')}
+        for name, img in self.mobs.items():
+            cv2.imwrite(str(root / 'mob_templates' / name), img)
+        char = rng.integers(0, 255, (30, 24, 3), dtype=np.uint8)
+        cv2.imwrite(str(root / 'ui_elements' / 'left_char.png'), char)
+        cv2.imwrite(str(root / 'ui_elements' / 'right_char.png'), char[:, ::-1])
+        cv2.imwrite(str(root / 'ui_elements' / 'rope.png'), rng.integers(0, 255, (12, 6, 3), dtype=np.uint8))
+
+    def test_scenes_are_reproducible_and_labelled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._assets(Path(tmp))
+            generator = SceneGenerator(tmp, SceneParams(size=(320, 240), monsters=(3, 3)), seed=7)
+            frame, truth = generator.generate(4)
+            again, _ = SceneGenerator(tmp, SceneParams(size=(320, 240), monsters=(3, 3)), seed=7).generate(4)
+        self.assertTrue(np.array_equal(frame, again))
+        self.assertEqual(frame.shape, (240, 320, 3))
+        self.assertEqual(len(truth['monsters']), 3)
+        for m in truth['monsters']:
+            crop = frame[m['y']:m['y'] + m['h'], m['x']:m['x'] + m['w']]
+            self.assertTrue(np.array_equal(crop, self.mobs[m['template']]))
+
+    def test_benchmark_finds_everything_in_clean_scenes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._assets(Path(tmp) / 'assets')
+            params = SceneParams(size=(320, 240), monsters=(1, 3), ropes=(1, 2), platforms=(2, 3))
+            generator = SceneGenerator(Path(tmp) / 'assets', params, seed=1)
+            names = scene_generator.write_dataset(generator, Path(tmp) / 'out', 3)
+            self.assertEqual(len(names), 3)
+            _, truth = scene_generator.load_scene(Path(tmp) / 'out' / names[0])
+            self.assertEqual(truth['frame'], f"{names[0]}.png")
+            results = scene_generator.benchmark(Path(tmp) / 'out')
+        for name in ('monsters', 'ropes', 'character'):
+            self.assertEqual(results[name]['recall'], 1.0, name)
+            self.assertEqual(results[name]['precision'], 1.0, name)
+        self.assertEqual(results['closest']['accuracy'], 1.0)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -12,6 +12,18 @@ import locales
 import window_utils
 import tkinter.messagebox as messagebox
 import json
+from settings_store import SettingsStore
+from log_pipeline import QueueLogHandler
+from window_preview import WindowCatalog
+
+# Activity terminal refresh: queued log records are flushed every interval, at most a batch per tick
+LOG_DRAIN_INTERVAL_MS = 150
+LOG_DRAIN_BATCH = 500
+# Window picker: worker results are added to the dialog every interval, a bounded batch at a time
+WINDOW_PICKER_POLL_MS = 40
+WINDOW_PICKER_POLL_BATCH = 4
+# Session rates (metrics.Metrics) shown in the controls column while the bot runs
+STATS_REFRESH_MS = 2000
 
 
 class MapleBotUI:
@@ -20,7 +32,11 @@ class MapleBotUI:
         self.start_callback = start_callback
         self.stop_callback = stop_callback
         self.settings_path = settings_path
+        # update_settings_callback receives a diff of the changed settings, from the writer thread
         self.update_settings_callback = update_settings_callback
+        self.settings_store = SettingsStore(settings_path, settings)
+        if update_settings_callback:
+            self.settings_store.subscribe(update_settings_callback)
         self.running = False
         self.lang = self.load_language()
 
@@ -82,6 +98,8 @@ class MapleBotUI:
         # Control placeholders
         self.lang_button = ctk.CTkButton(self.controls_col, text=self.lang['switch_lang'], command=self.switch_language)
         self.lang_button.pack(pady=(6,4), padx=8, fill='x')
+        self.stats_label = ctk.CTkLabel(self.controls_col, text='', justify='left', anchor='w')
+        self.stats_label.pack(pady=(12,4), padx=8, fill='x')
 
         
 
@@ -90,8 +108,8 @@ class MapleBotUI:
         logs_header.pack(fill='x', pady=(0,6))
         self.logs_header_label = ctk.CTkLabel(logs_header, text=self.lang.get('activity_terminal', 'Activity Terminal'), font=ctk.CTkFont(size=14, weight='bold'))
         self.logs_header_label.pack(side='left', padx=8)
-        self.log_filter = ctk.CTkComboBox(logs_header, values=[self.lang.get('log_filter_all','ALL'), self.lang.get('log_filter_info','INFO'), self.lang.get('log_filter_warning','WARNING'), self.lang.get('log_filter_error','ERROR')], width=120)
-        self.log_filter.set(self.lang.get('log_filter_all','ALL'))
+        self.log_filter = ctk.CTkComboBox(logs_header, values=[self.lang.get('log_filter_all','ALL'), self.lang.get('log_filter_info','INFO'), self.lang.get('log_filter_warning','WARNING'), self.lang.get('log_filter_error','ERROR')], width=120, command=self._on_log_filter)
+        self.log_filter.set(self.lang.get('log_filter_info','INFO'))
         self.log_filter.pack(side='right', padx=6)
         self.clear_btn = ctk.CTkButton(logs_header, text=self.lang.get('clear','Clear'), width=70, command=lambda: self._clear_logs())
         self.clear_btn.pack(side='right', padx=6)
@@ -199,8 +217,9 @@ class MapleBotUI:
             if hasattr(self, 'log_filter'):
                 vals = [self.lang.get('log_filter_all','ALL'), self.lang.get('log_filter_info','INFO'), self.lang.get('log_filter_warning','WARNING'), self.lang.get('log_filter_error','ERROR')]
                 try:
+                    level_index = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR].index(self._selected_log_level())
                     self.log_filter.configure(values=vals)
-                    self.log_filter.set(vals[0])
+                    self.log_filter.set(vals[level_index])
                 except Exception:
                     pass
         except Exception:
@@ -260,6 +279,7 @@ class MapleBotUI:
                 except Exception:
                     pass
                 self.setup_main_logging()
+                self._refresh_stats()
                 # start pulsing animation
                 self._pulse_status()
                 try:
@@ -482,7 +502,7 @@ class MapleBotUI:
             lbl = ctk.CTkLabel(self.settings_scrollable, text=self.lang.get('debug_title','Debug'), font=ctk.CTkFont(size=16, weight="bold"))
             lbl.pack(pady=(20,5))
             self.section_labels['debug'] = lbl
-            for key in ['enable_debug', 'simulation_mode']:
+            for key in ['enable_debug', 'simulation_mode', 'profile']:
                 frame = ctk.CTkFrame(self.settings_scrollable)
                 frame.pack(fill="x", pady=2)
                 ctk.CTkLabel(frame, text=f"{key.replace('_', ' ').capitalize()}:", width=150).pack(side="left", padx=5)
@@ -523,15 +543,9 @@ class MapleBotUI:
         Returns True if user cancelled, False if a window was selected and saved.
         """
         try:
-            try:
-                wins = window_utils.list_windows()
-            except OSError:
-                messagebox.showinfo(self.lang.get('select_window','Select Game Window'), self.lang.get('window_utils_not_supported','Window selection is only supported on Windows.'))
-                return True
-
-            if not wins:
-                messagebox.showinfo(self.lang.get('select_window','Select Game Window'), self.lang.get('no_windows_found','No visible windows found.'))
-                return True
+            # Windows and thumbnails are produced by a background worker and added incrementally
+            catalog = self._get_window_catalog()
+            unsupported = {'value': False}
 
             # Build modern CTk modal
             dlg = ctk.CTkToplevel(self.root)
@@ -555,6 +569,9 @@ class MapleBotUI:
             list_frame = ctk.CTkScrollableFrame(left)
             list_frame.pack(fill='both', expand=True, padx=8, pady=6)
 
+            list_status = ctk.CTkLabel(left, text=self.lang.get('loading_windows','Loading windows...'))
+            list_status.pack(fill='x', padx=8, pady=(0,6))
+
             # Create buttons per window
             items = []
             selected = {'hwnd': None, 'title': None}
@@ -579,10 +596,6 @@ class MapleBotUI:
                 btn.pack(fill='x', pady=4, padx=4)
                 return btn
 
-            for hwnd, title in wins:
-                b = make_item(hwnd, title)
-                items.append((b, (hwnd, title)))
-
             # Preview area
             preview_label = ctk.CTkLabel(right, text=self.lang.get('preview','Preview'))
             preview_label.pack(anchor='nw', padx=6, pady=(6,2))
@@ -605,18 +618,22 @@ class MapleBotUI:
                 PIL_AVAILABLE = False
 
             def _show_preview(hwnd, title):
-                # Do NOT focus windows during preview. Only update textual preview info.
+                # Do NOT focus windows during preview. The thumbnail is captured off the Tk thread.
                 details_label.configure(text=title)
                 if not PIL_AVAILABLE:
                     preview_img_label.configure(text=self.lang.get('preview_unavailable','Preview unavailable (Pillow missing)'))
                     return
+                preview_img_label.configure(image=None, text=self.lang.get('loading_preview','Loading preview...'))
+                preview_img_label.image = None
+                catalog.request_thumbnail(hwnd)
+
+            def _set_thumbnail(hwnd, thumb):
+                if hwnd != selected.get('hwnd'):
+                    return
+                if thumb is None:
+                    preview_img_label.configure(text=self.lang.get('preview_failed','Preview failed'))
+                    return
                 try:
-                    # Optionally, show a generic placeholder or small screenshot of current screen
-                    img = pyautogui.screenshot()
-                    w, h = img.size
-                    target_w = min(640, int(w * 0.12))
-                    target_h = int(target_w * (h / w))
-                    thumb = img.resize((target_w, target_h))
                     photo = ImageTk.PhotoImage(thumb)
                     preview_img_label.configure(image=photo, text='')
                     preview_img_label.image = photo
@@ -635,11 +652,10 @@ class MapleBotUI:
                 if not selected['hwnd']:
                     messagebox.showwarning(self.lang.get('select_window','Select Game Window'), self.lang.get('no_window_selected','Please select a window first.'))
                     return
-                # persist selection
+                # persist selection (written in the background)
                 try:
                     self.settings.setdefault('ui', {})['game_window_title'] = selected['title']
-                    with self.settings_path.open('w', encoding='utf-8') as f:
-                        json.dump(self.settings, f, indent=4)
+                    self.settings_store.save(self.settings)
                 except Exception:
                     logging.exception('Failed to save selected window to settings')
                 # try to focus one last time
@@ -654,6 +670,7 @@ class MapleBotUI:
                 time.sleep(0.25)
                 try:
                     if hasattr(self, 'bot') and getattr(self.bot, 'vision', None) is not None:
+                        self.bot.vision.bind_window(selected['hwnd'])
                         x, y, left_dir = self.bot.vision.find_character_coordinates()
                     else:
                         x = None
@@ -678,11 +695,7 @@ class MapleBotUI:
 
             # Refresh button will re-enumerate windows (useful if new windows opened while modal is shown)
             def _refresh_windows():
-                try:
-                    wins_new = window_utils.list_windows()
-                except Exception:
-                    wins_new = []
-                # clear existing items
+                # clear existing items; the worker re-enumerates and streams the new list in
                 for b, _ in list(items):
                     try:
                         b.destroy()
@@ -691,9 +704,8 @@ class MapleBotUI:
                 items.clear()
                 selected['hwnd'] = None
                 selected['title'] = None
-                for hwnd, title in wins_new:
-                    b = make_item(hwnd, title)
-                    items.append((b, (hwnd, title)))
+                list_status.configure(text=self.lang.get('loading_windows','Loading windows...'))
+                catalog.request_windows(force=True)
 
             # Build a top row frame for the two smaller side-by-side buttons
             top_row = ctk.CTkFrame(footer)
@@ -727,7 +739,39 @@ class MapleBotUI:
 
             search_var.trace_add('write', _on_search)
 
+            def _poll_catalog():
+                try:
+                    if not dlg.winfo_exists():
+                        return
+                except Exception:
+                    return
+                for kind, payload in catalog.poll(WINDOW_PICKER_POLL_BATCH):
+                    if kind == 'windows':
+                        q = search_var.get().lower()
+                        for hwnd, title in payload:
+                            b = make_item(hwnd, title)
+                            items.append((b, (hwnd, title)))
+                            if q and q not in title.lower():
+                                b.pack_forget()
+                    elif kind == 'thumbnail':
+                        _set_thumbnail(*payload)
+                    elif kind == 'done':
+                        list_status.configure(text='' if payload else self.lang.get('no_windows_found','No visible windows found.'))
+                    elif kind == 'error':
+                        if isinstance(payload, OSError):
+                            unsupported['value'] = True
+                            messagebox.showinfo(self.lang.get('select_window','Select Game Window'), self.lang.get('window_utils_not_supported','Window selection is only supported on Windows.'))
+                            _cancel()
+                            return
+                        list_status.configure(text=self.lang.get('no_windows_found','No visible windows found.'))
+                dlg.after(WINDOW_PICKER_POLL_MS, _poll_catalog)
+
+            catalog.request_windows()
+            _poll_catalog()
+
             self.root.wait_window(dlg)
+            if unsupported['value']:
+                return True
             return selected.get('hwnd')
         except Exception as e:
             logging.exception(f"Error opening window selector: {e}")
@@ -735,6 +779,12 @@ class MapleBotUI:
 
     
 
+    def _get_window_catalog(self):
+        # One catalog per UI so its window/thumbnail cache survives between picker openings
+        if getattr(self, '_window_catalog', None) is None:
+            self._window_catalog = WindowCatalog()
+        return self._window_catalog
+
     def save_settings(self):
         # Update settings from entries
         for key, entry in self.entries.items():
@@ -828,9 +878,8 @@ class MapleBotUI:
         except json.JSONDecodeError:
             logging.warning(self.lang.get('invalid_buffs_json', 'Invalid buffs JSON'))
 
-        # Save to file
-        with self.settings_path.open('w', encoding='utf-8') as f:
-            json.dump(self.settings, f, indent=4)
+        # Persist atomically in the background; the bot is notified with the diff once written
+        self.settings_store.save(self.settings)
 
         # Update theme if changed
         ctk.set_appearance_mode(self.settings['ui']['theme'])
@@ -841,10 +890,6 @@ class MapleBotUI:
         if self.lang != old_lang:
             self.update_ui_texts()
 
-        # Notify bot of settings update
-        if self.update_settings_callback:
-            self.update_settings_callback(self.settings)
-
         self.show_main()
 
     def show_main(self):
@@ -852,42 +897,13 @@ class MapleBotUI:
         self.main_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
     def setup_main_logging(self):
-        class MainTextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-
-            def emit(self, record):
-                try:
-                    msg = self.format(record)
-                    level = record.levelname
-                except Exception:
-                    msg = str(record)
-                    level = 'INFO'
-                # ensure thread-safe GUI update
-                try:
-                    self.text_widget.after(0, lambda: self._append_text(msg, level))
-                except Exception:
-                    pass
-
-            def _append_text(self, msg, level='INFO'):
-                try:
-                    if hasattr(self.text_widget, 'insert'):
-                        # If underlying tkinter text is available, use tags
-                        try:
-                            inner = getattr(self.text_widget, 'text', None) or self.text_widget
-                            inner.insert(tk.END, msg + '\n', level if level in ['WARNING','ERROR'] else 'INFO')
-                            inner.see(tk.END)
-                        except Exception:
-                            self.text_widget.insert(tk.END, msg + '\n')
-                            self.text_widget.see(tk.END)
-                except Exception:
-                    pass
-        # Add handler for main logs
-        handler = MainTextHandler(self.logs_text_main)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logging.root.addHandler(handler)
+        # Records are queued by any thread and drained onto the terminal on a fixed UI timer
+        if getattr(self, '_log_handler', None) is None:
+            self._log_handler = QueueLogHandler(level=self._selected_log_level())
+            self._log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            logging.root.addHandler(self._log_handler)
+            self._log_line_count = 0
+            self._drain_logs()
 
         # Expose alarm popup methods as instance methods
         self.show_alarm_popup = self._show_alarm_popup
@@ -900,7 +916,11 @@ class MapleBotUI:
             self._pulse_status()
         except Exception:
             pass
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            # Make sure the last edits reach disk before the process exits
+            self.settings_store.close()
 
     # Alarm popup implementations as instance methods
     def _show_alarm_popup(self, message: str):
@@ -952,12 +972,69 @@ class MapleBotUI:
             logging.error(f"Failed to destroy alarm popup: {e}")
 
     # Utility actions for logs
+    def _selected_log_level(self):
+        """Map the log filter combobox (ALL/INFO/WARNING/ERROR, localized) to a logging level."""
+        levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR]
+        try:
+            values = list(self.log_filter.cget('values'))
+            return levels[values.index(self.log_filter.get())]
+        except Exception:
+            return logging.INFO
+
+    def _on_log_filter(self, *_):
+        if getattr(self, '_log_handler', None) is not None:
+            self._log_handler.setLevel(self._selected_log_level())
+
+    def _drain_logs(self):
+        """Append queued log records in one batch, then trim the terminal to the line cap."""
+        try:
+            batch = self._log_handler.drain(LOG_DRAIN_BATCH)
+            if batch:
+                inner = self._inner_text or self.logs_text_main
+                for level, msg in batch:
+                    tag = level if level in ('WARNING', 'ERROR') else 'INFO'
+                    try:
+                        inner.insert(tk.END, msg + '\n', tag)
+                    except Exception:
+                        inner.insert(tk.END, msg + '\n')
+                # Records such as tracebacks span several lines; the cap is on text lines
+                self._log_line_count += sum(msg.count('\n') + 1 for _, msg in batch)
+                max_lines = int(self.settings.get('ui', {}).get('log_max_lines', 2000))
+                excess = self._log_line_count - max_lines
+                if excess > 0:
+                    inner.delete('1.0', f'{excess + 1}.0')
+                    self._log_line_count = max_lines
+                inner.see(tk.END)
+        except Exception:
+            pass
+        finally:
+            self.root.after(LOG_DRAIN_INTERVAL_MS, self._drain_logs)
+
+    def _refresh_stats(self):
+        if getattr(self, '_stats_job', None):
+            # restarted within one interval: keep a single refresh loop
+            self.root.after_cancel(self._stats_job)
+            self._stats_job = None
+        if not self.running:
+            return
+        try:
+            metrics = getattr(getattr(self, 'bot', None), 'metrics', None)
+            if metrics is not None:
+                r = metrics.rates()
+                self.stats_label.configure(text=self.lang.get('session_stats', '').format(
+                    attacks=r['attacks_per_hour'], kills=r['kills_per_hour'], potions=r['potions_per_hour'],
+                    fighting=r['fighting_share'], walking=r['walking_share']))
+        except Exception:
+            pass
+        self._stats_job = self.root.after(STATS_REFRESH_MS, self._refresh_stats)
+
     def _clear_logs(self):
         try:
             if self._inner_text:
                 self._inner_text.delete('1.0', tk.END)
             else:
                 self.logs_text_main.delete('0.0', tk.END)
+            self._log_line_count = 0
         except Exception:
             pass
 
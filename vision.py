@@ -1,128 +1,580 @@
 import cv2
 import numpy as np
-import pyautogui
-import easyocr
 import re
 import logging
 import os
 import sys
+import queue
+import threading
+import time
 from typing import Any, Dict, Tuple, Optional, List
-from pathlib import Path
 
+import window_utils
+from compiled_settings import compile_settings, parse_color
+from capture_planner import FrameSet, merge_regions
+from governor import charge_cpu
+from lazy_imports import lazy_import
+
+pyautogui = lazy_import('pyautogui')
+
+
+def create_ocr_reader(settings: Dict[str, Any]):
+    # easyocr pulls in torch; it is imported only when a reader is actually built
+    import easyocr
+    # Initialize EasyOCR reader for English (can add more languages if needed)
+    # Prefer a bundled `easyocr_models` directory when frozen with PyInstaller.
+    model_dir_setting = settings.get('vision', {}).get('easyocr_model_dir', 'easyocr_models')
+    # If running from a PyInstaller bundle, files are unpacked to sys._MEIPASS
+    base = getattr(sys, '_MEIPASS', None) or os.path.abspath(os.path.dirname(__file__))
+    bundled_model_dir = os.path.join(base, model_dir_setting)
+    if os.path.isdir(bundled_model_dir):
+        try:
+            return easyocr.Reader(['en'], gpu=False, model_storage_directory=bundled_model_dir)
+        except Exception:
+            logging.warning(f"Failed to initialize EasyOCR with bundled models at {bundled_model_dir}, falling back to default initialization")
+            return easyocr.Reader(['en'], gpu=False)
+    # Default initialization (will download models if they are missing)
+    return easyocr.Reader(['en'], gpu=False)  # Set gpu=True if GPU available
+
+
+class TemplateCache:
+    """Decoded template images keyed by (path, scale), safe to share between Vision instances.
+
+    Templates are authored at the reference resolution; get(path, scale) returns a copy resized
+    once for that scale so matching runs natively on frames captured at the client size.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._images = {}
+
+    def get(self, path, scale: float = 1.0):
+        scale = round(float(scale), 3)
+        key = (str(path), scale)
+        with self._lock:
+            img = self._images.get(key)
+        if img is not None:
+            return img
+        if scale == 1.0:
+            img = cv2.imread(key[0], cv2.IMREAD_COLOR)
+        else:
+            base = self.get(path)
+            if base is None:
+                return None
+            h, w = base.shape[:2]
+            size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+            img = cv2.resize(base, size, interpolation=interpolation)
+        if img is not None:
+            # Missing files are not cached so templates dropped in later are still picked up
+            with self._lock:
+                img = self._images.setdefault(key, img)
+        return img
+
+    def preload(self, paths, scale: float = 1.0) -> int:
+        """Resize every template in paths for scale up front; returns how many were available."""
+        return sum(1 for p in paths if self.get(p, scale) is not None)
+
+
+class OcrWorker:
+    """Owns one EasyOCR reader and serializes readtext() calls from any number of threads.
+
+    The reader (easyocr, torch and the models) is built on the worker thread, so constructing a
+    bot does not wait for it; early readtext() calls simply queue until it is ready. The CPU time
+    of each request is charged to the requesting thread, so the tick governor sees what a potion
+    check really costs. Only the worker thread's own time is counted: process-wide figures would
+    bill one session for every other session running under the supervisor.
+    """
 
-class Vision:
     def __init__(self, settings: Dict[str, Any]):
         self.settings = settings
-        # Initialize EasyOCR reader for English (can add more languages if needed)
-        # Prefer a bundled `easyocr_models` directory when frozen with PyInstaller.
-        model_dir_setting = self.settings.get('vision', {}).get('easyocr_model_dir', 'easyocr_models')
-        # If running from a PyInstaller bundle, files are unpacked to sys._MEIPASS
-        base = getattr(sys, '_MEIPASS', None) or os.path.abspath(os.path.dirname(__file__))
-        bundled_model_dir = os.path.join(base, model_dir_setting)
-        if os.path.isdir(bundled_model_dir):
+        self.reader = None
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='ocr-worker', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        error = None
+        try:
+            self.reader = create_ocr_reader(self.settings)
+        except Exception as e:
+            logging.error(f"Failed to initialize EasyOCR: {e}")
+            error = e
+        while True:
+            img, reply = self._requests.get()
+            if error is not None:
+                reply.put((False, error, 0.0))
+                continue
+            started = time.thread_time()
             try:
-                self.reader = easyocr.Reader(['en'], gpu=False, model_storage_directory=bundled_model_dir)
-            except Exception:
-                logging.warning(f"Failed to initialize EasyOCR with bundled models at {bundled_model_dir}, falling back to default initialization")
-                self.reader = easyocr.Reader(['en'], gpu=False)
-        else:
-            # Default initialization (will download models if they are missing)
-            self.reader = easyocr.Reader(['en'], gpu=False)  # Set gpu=True if GPU available
-        self.assets_path = Path(settings.get('assets_path', 'assets'))
+                result = (True, self.reader.readtext(img))
+            except Exception as e:
+                result = (False, e)
+            reply.put(result + (time.thread_time() - started,))
+
+    def readtext(self, img):
+        reply = queue.Queue(maxsize=1)
+        self._requests.put((img, reply))
+        ok, result, cpu = reply.get()
+        charge_cpu(cpu)
+        if not ok:
+            raise result
+        return result
+
+    def pending(self) -> int:
+        return self._requests.qsize()
+
+
+class BufferPool:
+    """Reusable image buffers for OpenCV `dst=` outputs, one per (thread, purpose, dtype).
+
+    Each buffer is a flat block that only ever grows; get() returns a contiguous view of its
+    first bytes in the requested shape. ROIs, movement bands and merged grabs change size from
+    tick to tick, and they all reuse the same block once it has grown to their largest size.
+    A view handed out for a purpose is overwritten by the next request for that purpose on the
+    same thread, whatever its shape, so callers that keep an image across another capture must use
+    distinct purposes (or copy). Buffers are never shared between threads, and the blocks of
+    threads that have exited are dropped.
+    """
+
+    # Headroom when a block grows, so a slowly growing ROI does not reallocate every tick
+    GROWTH = 1.25
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffers = {}
+        self.allocations = 0
+        self.allocated_bytes = 0
+
+    def get(self, purpose, shape, dtype=np.uint8):
+        dtype = np.dtype(dtype)
+        key = (threading.get_ident(), purpose, dtype.str)
+        size = 1
+        for n in shape:
+            size *= int(n)
+        buf = self._buffers.get(key)
+        if buf is None or buf.size < size:
+            buf = np.empty(int(size * self.GROWTH) if buf is not None else size, dtype=dtype)
+            with self._lock:
+                if key not in self._buffers:
+                    alive = {t.ident for t in threading.enumerate()}
+                    for stale in [k for k in self._buffers if k[0] not in alive]:
+                        del self._buffers[stale]
+                self._buffers[key] = buf
+                self.allocations += 1
+                self.allocated_bytes += buf.nbytes
+        return buf[:size].reshape(shape)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'buffers': len(self._buffers), 'bytes': sum(b.nbytes for b in self._buffers.values()),
+                    'allocations': self.allocations}
+
+
+class Vision:
+    # Full frames rotate through this many buffers so last_frame is never the one being written
+    FULL_FRAME_BUFFERS = 3
+
+    def __init__(self, settings: Dict[str, Any], template_cache: Optional[TemplateCache] = None,
+                 ocr: Optional[OcrWorker] = None, hwnd: Optional[int] = None):
+        self.settings = settings
+        self.cfg = compile_settings(settings)
+        # Template cache and OCR worker may be shared by several bot sessions
+        self.templates = template_cache or TemplateCache()
+        self.ocr = ocr or OcrWorker(settings)
+        # When bound to a window, regions and returned coordinates are relative to its client area
+        self.hwnd = None
+        self.window = None
+        self.assets_path = self.cfg.assets_path
+        # Game scale = client size / reference resolution. Callers work in reference coordinates;
+        # Vision scales regions and templates to the client once per scale and maps results back.
+        self.scale = 1.0
+        self.last_frame = None
+        self.last_frame_time = 0.0
+        self._scaled_for = None
+        self._region_cache = {}
+        # Per-tick grabs planned by begin_frame(); only the thread that planned them reads from them
+        self._frames: Optional[FrameSet] = None
+        self._frames_thread = None
+        self.capture_stats = {'grabs': 0, 'bytes': 0, 'views': 0}
+        # Capture, conversion and match-result buffers recycled across ticks
+        self.buffers = BufferPool()
+        self._full_slot = 0
+        if not self.bind_window(hwnd):
+            try:
+                self.detect_scale()
+            except Exception as e:
+                logging.debug(f"Could not detect game scale: {e}")
+
+    def bind_window(self, hwnd: Optional[int] = None) -> bool:
+        """Bind capture to a window's client area. With no hwnd, looks up ui.game_window_title.
+
+        Returns True if bound; otherwise captures fall back to the full desktop.
+        """
+        if hwnd is None:
+            title = self.settings.get('ui', {}).get('game_window_title')
+            if title:
+                try:
+                    hwnd = window_utils.find_window_by_title(title)
+                except Exception as e:
+                    logging.debug(f"Game window lookup failed: {e}")
+        if self.window is not None and self.window.hwnd == hwnd:
+            self.window.invalidate()
+            return True
+        if self.window is not None:
+            self.window.close()
+        self.window = None
+        self.hwnd = hwnd
+        if hwnd:
+            try:
+                self.window = window_utils.WindowTracker(hwnd)
+                logging.info(f"Capture bound to window {hwnd} at {self.window.rect()}")
+                self.detect_scale()
+            except Exception as e:
+                logging.warning(f"Could not track game window {hwnd}, capturing full screen: {e}")
+        return self.window is not None
+
+    def window_rect(self):
+        """Client rectangle (left, top, width, height) of the bound window in screen pixels, or None."""
+        if self.window is None:
+            return None
+        try:
+            return self.window.rect()
+        except Exception as e:
+            logging.debug(f"Window rect lookup failed for {self.hwnd}: {e}")
+            return None
+
+    def base_resolution(self):
+        """Reference resolution the templates and fixed regions were authored for."""
+        res = self.settings.get('preconditions', {}).get('resolution', '1920x1080')
+        try:
+            w, h = map(int, str(res).lower().split('x'))
+            return w, h
+        except ValueError:
+            return 1920, 1080
+
+    def client_size(self):
+        rect = self.window_rect()
+        if rect:
+            return rect[2], rect[3]
+        return tuple(pyautogui.size())
+
+    def detect_scale(self) -> float:
+        """Compute the game scale from the client size and reset the per-scale region cache."""
+        cw, ch = self.client_size()
+        bw, bh = self.base_resolution()
+        scale = min(cw / bw, ch / bh)
+        self._scaled_for = (cw, ch)
+        if scale != self.scale:
+            logging.info(f"Game view {cw}x{ch}: scale {scale:.3f} relative to {bw}x{bh}")
+        self.scale = scale
+        self._region_cache = {}
+        return scale
+
+    def preload_templates(self, paths) -> int:
+        """Pre-resize the given templates (plus the built-in UI ones) for the current scale."""
+        ui = self.assets_path / 'ui_elements'
+        builtin = [ui / 'left_char.png', ui / 'right_char.png', ui / 'rope.png', ui / 'reduser.png']
+        return self.templates.preload(list(paths) + builtin, self.scale)
+
+    def scale_region(self, region):
+        """Map a reference-coordinate (x, y, w, h) region to client pixels (cached per scale)."""
+        key = tuple(int(v) for v in region)
+        scaled = self._region_cache.get(key)
+        if scaled is None:
+            if len(self._region_cache) > 512:
+                # ROIs follow moving objects; keep the cache from growing without bound
+                self._region_cache.clear()
+            s = self.scale
+            x, y, w, h = key
+            scaled = (int(round(x * s)), int(round(y * s)), max(1, int(round(w * s))), max(1, int(round(h * s))))
+            self._region_cache[key] = scaled
+        return scaled
+
+    def to_base(self, x, y):
+        """Map client pixel coordinates back to reference coordinates."""
+        if self.scale == 1.0:
+            return x, y
+        return int(round(x / self.scale)), int(round(y / self.scale))
+
+    def frame_size(self):
+        """Size of the game view in reference coordinates."""
+        cw, ch = self.client_size()
+        return int(round(cw / self.scale)), int(round(ch / self.scale))
+
+    def to_screen(self, x: int, y: int):
+        """Translate reference (window-relative) coordinates into screen coordinates."""
+        x, y = int(round(x * self.scale)), int(round(y * self.scale))
+        rect = self.window_rect()
+        if rect:
+            return rect[0] + x, rect[1] + y
+        return x, y
+
+    def begin_frame(self, regions) -> FrameSet:
+        """Grab everything this tick will look at in as few screenshots as possible.
+
+        regions are reference-coordinate (x, y, w, h) regions, None meaning the whole view. Until
+        end_frame(), capture_screen() calls from this thread that fall inside one of the grabs get a
+        view of it instead of a new screenshot; anything else is still captured directly.
+        """
+        self.end_frame()
+        full = (0, 0) + tuple(self.frame_size())
+        grabs = []
+        for index, rect in enumerate(merge_regions(list(regions), full[2:])):
+            if rect == full:
+                img = self._grab()
+                grabs.append((rect, (0, 0, img.shape[1], img.shape[0]), img))
+            else:
+                # Each grab has its own buffer so direct captures during the tick cannot overwrite it
+                grabs.append((rect, self.scale_region(rect), self._grab(rect, ('grab', index))))
+        self._frames = FrameSet(grabs, full)
+        self._frames_thread = threading.get_ident()
+        return self._frames
+
+    def end_frame(self):
+        """Drop this tick's grabs; called before acting, since the screen changes after input."""
+        self._frames = None
 
     def capture_screen(self, region=None):
+        """Grab the game view, or a reference-coordinate region of it, at native client size.
+
+        The returned image lives in a pooled buffer: it stays valid until the next capture of the
+        same size on the same thread (full frames: the third next), so copy it to keep it longer.
+        """
+        frames = self._frames
+        if frames is not None and self._frames_thread == threading.get_ident():
+            view = frames.view(region, self.scale_region(region) if region is not None else None)
+            if view is not None:
+                self.capture_stats['views'] += 1
+                return view
+        return self._grab(region)
+
+    def _grab(self, region=None, purpose='capture'):
+        rect = self.window_rect()
+        if rect and (rect[2], rect[3]) != self._scaled_for:
+            # Window was resized since the scale was computed
+            self.detect_scale()
+        full_frame = region is None
+        if region is not None:
+            region = self.scale_region(region)
+        if rect:
+            if region is None:
+                region = rect
+            else:
+                x, y, w, h = region
+                region = (rect[0] + x, rect[1] + y, w, h)
         screenshot = pyautogui.screenshot(region=region)
-        return cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        # pyautogui hands back a PIL image; its pixels are converted straight into a pooled buffer
+        rgb = np.asarray(screenshot)
+        if full_frame:
+            self._full_slot = (self._full_slot + 1) % self.FULL_FRAME_BUFFERS
+            purpose = ('full', self._full_slot)
+        frame = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=self.buffers.get(purpose, rgb.shape))
+        self.capture_stats['grabs'] += 1
+        self.capture_stats['bytes'] += frame.nbytes
+        if full_frame:
+            # Valid on this thread until FULL_FRAME_BUFFERS - 1 more full grabs; other threads get copies
+            self.last_frame = frame
+            self.last_frame_time = time.time()
+        return frame
 
     def find_template(self, template_path: str, screenshot=None, threshold=0.8):
+        """Return reference-coordinate top-left points where template_path matches screenshot."""
         if screenshot is None:
             screenshot = self.capture_screen()
-        template = cv2.imread(str(template_path), cv2.IMREAD_COLOR)
+        template = self.templates.get(template_path, self.scale)
         if template is None:
             return []
-        result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-        loc = np.where(result >= threshold)
-        return list(zip(*loc[::-1]))
+        result = self._match(screenshot, template)
+        if result is None:
+            return []
+        return [self.to_base(x, y) for x, y in self._points_above(result, threshold)]
+
+    def _match(self, image, template, purpose='match'):
+        """TM_CCOEFF_NORMED into a pooled result buffer; None if the template does not fit."""
+        h = image.shape[0] - template.shape[0] + 1
+        w = image.shape[1] - template.shape[1] + 1
+        if h <= 0 or w <= 0:
+            return None
+        result = self.buffers.get(purpose, (h, w), np.float32)
+        return cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED, result=result)
+
+    def _points_above(self, result, threshold):
+        """(x, y) client points where a match result reaches threshold."""
+        mask = np.greater_equal(result, threshold, out=self.buffers.get('mask', result.shape, np.bool_))
+        ys, xs = np.nonzero(mask)
+        return zip(xs, ys)
+
+    def match_best(self, template_path, region=None, threshold=0.8):
+        """Best match of a cached template inside a reference-coordinate region.
+
+        Returns the reference-coordinate top-left point, or None below threshold.
+        """
+        template = self.templates.get(template_path, self.scale)
+        if template is None:
+            return None
+        result = self._match(self.capture_screen(region), template)
+        if result is None:
+            return None
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < threshold:
+            return None
+        x, y = self.to_base(*max_loc)
+        if region is not None:
+            x, y = x + int(region[0]), y + int(region[1])
+        return x, y
+
+    def wait_until_visible(self, template_path, region=None, timeout: float = 10.0, threshold: float = 0.7,
+                           poll_hz: Optional[float] = None, should_stop=None):
+        """Poll for a template until it is visible; returns its top-left point, or None on timeout/stop.
+
+        Only `region` is grabbed on each poll. Polls run at poll_hz (default vision.wait_poll_hz).
+        """
+        return self._wait_for(template_path, region, timeout, threshold, poll_hz, should_stop, visible=True)
+
+    def wait_until_gone(self, template_path, region=None, timeout: float = 10.0, threshold: float = 0.7,
+                        poll_hz: Optional[float] = None, should_stop=None) -> bool:
+        """Poll until a template is no longer visible; True if it went away before the timeout."""
+        return self._wait_for(template_path, region, timeout, threshold, poll_hz, should_stop, visible=False)
+
+    def _wait_for(self, template_path, region, timeout, threshold, poll_hz, should_stop, visible):
+        if self.templates.get(template_path, self.scale) is None:
+            logging.error(f"Wait template not found: {template_path}")
+            return None if visible else False
+        interval = 1.0 / max(0.1, poll_hz or self.cfg.wait_poll_hz)
+        deadline = time.monotonic() + timeout
+        while True:
+            started = time.monotonic()
+            point = self.match_best(template_path, region, threshold)
+            if visible and point is not None:
+                return point
+            if not visible and point is None:
+                return True
+            if started >= deadline or (should_stop is not None and should_stop()):
+                return None if visible else False
+            time.sleep(max(0.0, min(interval - (time.monotonic() - started), deadline - time.monotonic())))
 
-    def find_character_coordinates(self):
+    def find_character_coordinates(self, region=None):
+        """Character (x, y, facing_left) in reference coordinates, or (None, None, None).
+
+        region restricts the search to a reference-coordinate (x, y, w, h) part of the window;
+        the movement controller uses this to sample the position cheaply while a key is held.
+        """
         left_char_path = self.assets_path / 'ui_elements' / 'left_char.png'
         right_char_path = self.assets_path / 'ui_elements' / 'right_char.png'
-        left_template = cv2.imread(str(left_char_path), cv2.IMREAD_COLOR)
-        right_template = cv2.imread(str(right_char_path), cv2.IMREAD_COLOR)
+        left_template = self.templates.get(left_char_path, self.scale)
+        right_template = self.templates.get(right_char_path, self.scale)
         if left_template is None or right_template is None:
             logging.error("Character template images not found")
             raise FileNotFoundError("Character template images not found")
 
-        screenshot = self.capture_screen()
-        left_result = cv2.matchTemplate(screenshot, left_template, cv2.TM_CCOEFF_NORMED)
-        right_result = cv2.matchTemplate(screenshot, right_template, cv2.TM_CCOEFF_NORMED)
+        screenshot = self.capture_screen(region)
+        ox, oy = (int(region[0]), int(region[1])) if region is not None else (0, 0)
+        # Both results are compared below, so they need separate buffers
+        left_result = self._match(screenshot, left_template, 'match_left')
+        right_result = self._match(screenshot, right_template, 'match_right')
+        if left_result is None or right_result is None:
+            return None, None, None
         threshold = 0.8
 
         left_max = cv2.minMaxLoc(left_result)[1]
         right_max = cv2.minMaxLoc(right_result)[1]
 
         if left_max >= threshold and left_max > right_max:
-            loc = cv2.minMaxLoc(left_result)[3]
-            logging.debug(f"Character found facing left at ({loc[0]}, {loc[1]})")
-            return loc[0], loc[1], True
+            loc = self.to_base(*cv2.minMaxLoc(left_result)[3])
+            logging.debug(f"Character found facing left at ({loc[0] + ox}, {loc[1] + oy})")
+            return loc[0] + ox, loc[1] + oy, True
         elif right_max >= threshold and right_max > left_max:
-            loc = cv2.minMaxLoc(right_result)[3]
-            logging.debug(f"Character found facing right at ({loc[0]}, {loc[1]})")
-            return loc[0], loc[1], False
+            loc = self.to_base(*cv2.minMaxLoc(right_result)[3])
+            logging.debug(f"Character found facing right at ({loc[0] + ox}, {loc[1] + oy})")
+            return loc[0] + ox, loc[1] + oy, False
         else:
             logging.debug("Character not found in current frame")
             return None, None, None
 
-    def find_closest_monster(self, monster_paths: List[str], character_y: int, char_x: int = 960, char_left: bool = False):
-        screenshot = self.capture_screen()
-        closest = None
-        min_dist = float('inf')
-        x_range = self.settings.get('monster_settings', {}).get('x_range', 200)
-        y_range = self.settings.get('monster_settings', {}).get('y_range', 60)
-        handle_opposite = self.settings.get('monster_settings', {}).get('handle_opposite', True)
-        threshold = self.settings.get('monster_settings', {}).get('monster_recognition_rate', 0.8)
-        
-        for path in monster_paths:
-            template = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    def template_size(self, template_path):
+        """(w, h) of a template in reference coordinates."""
+        template = self.templates.get(template_path, 1.0)
+        if template is None:
+            return 0, 0
+        return template.shape[1], template.shape[0]
+
+    def find_monsters(self, monster_paths: List[str], screenshot=None, roi=None):
+        """Return every monster match as (x, y, template_index) in reference coordinates.
+
+        roi is a reference-coordinate (x, y, w, h) region; only that part of the window is
+        captured and searched, which is what makes per-track re-checks cheap.
+        """
+        ox = oy = 0
+        if roi is not None:
+            screenshot = self.capture_screen(roi)
+            ox, oy = int(roi[0]), int(roi[1])
+        elif screenshot is None:
+            screenshot = self.capture_screen()
+        threshold = self.cfg.monster_threshold
+        found = []
+        for index, path in enumerate(monster_paths):
+            template = self.templates.get(path, self.scale)
             if template is None:
                 logging.warning(f"Monster template not found: {path}")
                 continue
-            result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-            loc = np.where(result >= threshold)
-            for pt in zip(*loc[::-1]):
-                if abs(character_y - pt[1]) < y_range and abs(char_x - pt[0]) < x_range:
-                    # Check direction
-                    if handle_opposite and ((char_left and pt[0] > char_x) or (not char_left and pt[0] < char_x)):
-                        continue  # Skip opposite direction monsters if not handling
-                    dist = abs(pt[0] - char_x)
-                    if dist < min_dist:
-                        min_dist = dist
-                        closest = pt
+            result = self._match(screenshot, template)
+            if result is None:
+                continue
+            for pt in self._points_above(result, threshold):
+                x, y = self.to_base(*pt)
+                found.append((x + ox, y + oy, index))
+        return found
+
+    def select_closest_monster(self, points, character_y: int, char_x: int = 960, char_left: bool = False):
+        """Pick the nearest point within the configured x/y range and facing rules."""
+        closest = None
+        min_dist = float('inf')
+        cfg = self.cfg
+        x_range = cfg.x_range
+        y_range = cfg.y_range
+        handle_opposite = cfg.handle_opposite
+        for pt in points:
+            pt = (pt[0], pt[1])
+            if abs(character_y - pt[1]) < y_range and abs(char_x - pt[0]) < x_range:
+                # Check direction
+                if handle_opposite and ((char_left and pt[0] > char_x) or (not char_left and pt[0] < char_x)):
+                    continue  # Skip opposite direction monsters if not handling
+                dist = abs(pt[0] - char_x)
+                if dist < min_dist:
+                    min_dist = dist
+                    closest = pt
         if closest:
             logging.debug(f"Closest monster found at {closest}")
         else:
             logging.debug("No monsters found within range")
         return closest
 
-    def find_ropes(self, character_y: int):
+    def find_closest_monster(self, monster_paths: List[str], character_y: int, char_x: int = 960, char_left: bool = False):
+        return self.select_closest_monster(self.find_monsters(monster_paths), character_y, char_x, char_left)
+
+    def find_ropes(self, character_y: Optional[int] = None):
+        """Rope positions near character_y, or every rope on screen when it is None."""
         rope_path = self.assets_path / 'ui_elements' / 'rope.png'
         screenshot = self.capture_screen()
         loc = self.find_template(str(rope_path), screenshot)
+        if character_y is None:
+            return loc
         valid_ropes = [pt for pt in loc if abs(character_y - pt[1]) < 200]
         return valid_ropes
 
     def read_hp_mp(self):
+        # Regions are relative to the game's client area (see capture_screen)
         hp_region = (401, 978, 150, 21)
         mp_region = (611, 979, 150, 20)
+        # Convert to RGB for easyocr; each strip is converted before the next capture can reuse its buffer
         hp_img = self.capture_screen(hp_region)
+        hp_img_rgb = cv2.cvtColor(hp_img, cv2.COLOR_BGR2RGB, dst=self.buffers.get('ocr_hp', hp_img.shape))
         mp_img = self.capture_screen(mp_region)
+        mp_img_rgb = cv2.cvtColor(mp_img, cv2.COLOR_BGR2RGB, dst=self.buffers.get('ocr_mp', mp_img.shape))
         
-        # Convert to RGB for easyocr
-        hp_img_rgb = cv2.cvtColor(hp_img, cv2.COLOR_BGR2RGB)
-        mp_img_rgb = cv2.cvtColor(mp_img, cv2.COLOR_BGR2RGB)
-        
-        hp_results = self.reader.readtext(hp_img_rgb)
-        mp_results = self.reader.readtext(mp_img_rgb)
+        hp_results = self.ocr.readtext(hp_img_rgb)
+        mp_results = self.ocr.readtext(mp_img_rgb)
         
         hp_text = ' '.join([result[1] for result in hp_results])
         mp_text = ' '.join([result[1] for result in mp_results])
@@ -150,24 +602,13 @@ class Vision:
         Uses a template image path from settings: settings['vision'].get('lie_template').
         Returns True if detected.
         """
-        if not self.settings.get('misc', {}).get('lie_detector', False):
+        cfg = self.cfg
+        if not cfg.lie_detector:
             return False
 
-        lie_template_setting = self.settings.get('vision', {}).get('lie_template', '')
-        if not lie_template_setting:
-            # default fallback
-            lie_path = self.assets_path / 'ui_elements' / 'polygraph.png'
-        else:
-            lie_path = Path(lie_template_setting)
-
-        try:
-            # Search full screen for the polygraph overlay — threshold configurable
-            threshold = float(self.settings.get('vision', {}).get('lie_threshold', 0.7))
-        except Exception:
-            threshold = 0.7
-
+        # Search full screen for the polygraph overlay — threshold configurable
         screenshot = self.capture_screen()
-        locs = self.find_template(str(lie_path), screenshot, threshold)
+        locs = self.find_template(str(cfg.lie_template), screenshot, cfg.lie_threshold)
         found = len(locs) > 0
         if found:
             logging.warning(f"Lie detector overlay detected at {locs[:3]}")
@@ -178,22 +619,12 @@ class Vision:
         Uses a template image path from settings: settings['vision'].get('enemy_template').
         Returns True if detected.
         """
-        if not self.settings.get('misc', {}).get('enemy_detector', False):
+        cfg = self.cfg
+        if not cfg.enemy_detector:
             return False
 
-        enemy_template_setting = self.settings.get('vision', {}).get('enemy_template', '')
-        if not enemy_template_setting:
-            enemy_path = self.assets_path / 'ui_elements' / 'enemy_alert.png'
-        else:
-            enemy_path = Path(enemy_template_setting)
-
-        try:
-            threshold = float(self.settings.get('vision', {}).get('enemy_threshold', 0.7))
-        except Exception:
-            threshold = 0.7
-
         screenshot = self.capture_screen()
-        locs = self.find_template(str(enemy_path), screenshot, threshold)
+        locs = self.find_template(str(cfg.enemy_template), screenshot, cfg.enemy_threshold)
         found = len(locs) > 0
         if found:
             logging.error(f"Enemy anti-auto-play indicator detected at {locs[:3]}")
@@ -201,62 +632,32 @@ class Vision:
 
     def _parse_color(self, color_val):
         """Parse color from hex string like '#rrggbb' or 'r,g,b' into (B,G,R) tuple for OpenCV images."""
-        if isinstance(color_val, (list, tuple)) and len(color_val) == 3:
-            r, g, b = color_val
-            return (int(b), int(g), int(r))
-        if isinstance(color_val, str):
-            s = color_val.strip()
-            if s.startswith('#') and len(s) == 7:
-                r = int(s[1:3], 16)
-                g = int(s[3:5], 16)
-                b = int(s[5:7], 16)
-                return (b, g, r)
-            parts = [p.strip() for p in s.split(',')]
-            if len(parts) == 3:
-                r, g, b = map(int, parts)
-                return (b, g, r)
-        raise ValueError(f"Unsupported color format: {color_val}")
+        return parse_color(color_val)
 
     def detect_chat_event(self):
         """Detect chat messages in the chat area by color.
         Returns (found: bool, label: Optional[str]) where label is the matching chat type (e.g., 'whisper').
-        Uses settings:
+        Uses settings (pre-parsed in CompiledSettings):
           - vision.chat_region: [x,y,w,h]
           - vision.chat_colors: {label: color}
           - vision.chat_color_tolerance: int (per-channel tolerance)
           - vision.chat_pixel_ratio: float (fraction of pixels that must match)
         """
-        if not self.settings.get('misc', {}).get('chat_detector', False):
+        cfg = self.cfg
+        if not cfg.chat_detector:
             return False, None
 
-        cfg = self.settings.get('vision', {})
-        region = cfg.get('chat_region', [10, 800, 400, 200])
-        try:
-            x, y, w, h = map(int, region)
-        except Exception:
-            x, y, w, h = 10, 800, 400, 200
-
-        img = self.capture_screen((x, y, w, h))
-        # Convert to BGR (already BGR) and sample
-        chat_colors = cfg.get('chat_colors', {})
-        tolerance = int(cfg.get('chat_color_tolerance', 30))
-        pixel_ratio = float(cfg.get('chat_pixel_ratio', 0.002))
+        img = self.capture_screen(cfg.chat_region)
         h_img, w_img = img.shape[:2]
         total_pixels = h_img * w_img
+        min_matches = max(3, int(total_pixels * cfg.chat_pixel_ratio))
 
-        for label, color_val in chat_colors.items():
-            try:
-                target_bgr = self._parse_color(color_val)
-            except Exception:
-                logging.debug(f"Skipping invalid chat color for {label}: {color_val}")
-                continue
+        for label, lower, upper in cfg.chat_ranges:
             # Create mask where pixels are within tolerance
-            lower = np.array([max(0, c - tolerance) for c in target_bgr], dtype=np.uint8)
-            upper = np.array([min(255, c + tolerance) for c in target_bgr], dtype=np.uint8)
             mask = cv2.inRange(img, lower, upper)
             match_count = int(cv2.countNonZero(mask))
-            if match_count > max(3, int(total_pixels * pixel_ratio)):
-                logging.warning(f"Chat event detected: {label} (matches={match_count}) in region {region}")
+            if match_count > min_matches:
+                logging.warning(f"Chat event detected: {label} (matches={match_count}) in region {list(cfg.chat_region)}")
                 return True, label
 
         return False, None
@@ -265,22 +666,12 @@ class Vision:
         """Detect other players appearing on the screen using a template (e.g., nameplate/player sprite).
         Uses settings['vision']['other_user_template'] and 'other_user_threshold'. Returns True if found.
         """
-        if not self.settings.get('misc', {}).get('other_user_detector', False):
+        cfg = self.cfg
+        if not cfg.other_user_detector:
             return False
 
-        other_template_setting = self.settings.get('vision', {}).get('other_user_template', '')
-        if not other_template_setting:
-            other_path = self.assets_path / 'ui_elements' / 'other_user.png'
-        else:
-            other_path = Path(other_template_setting)
-
-        try:
-            threshold = float(self.settings.get('vision', {}).get('other_user_threshold', 0.75))
-        except Exception:
-            threshold = 0.75
-
         screenshot = self.capture_screen()
-        locs = self.find_template(str(other_path), screenshot, threshold)
+        locs = self.find_template(str(cfg.other_user_template), screenshot, cfg.other_user_threshold)
         found = len(locs) > 0
         if found:
             logging.error(f"Other user detected at {locs[:3]}")
@@ -291,41 +682,36 @@ class Vision:
         Uses optional settings['vision']['top_floor_template'] for template matching and
         returns True if matched.
         """
-        if not self.settings.get('misc', {}).get('top_floor_stoppage', False):
+        cfg = self.cfg
+        if not cfg.top_floor_stoppage:
             return False
 
-        tpl = self.settings.get('vision', {}).get('top_floor_template', '')
-        if not tpl:
-            tpl_path = self.assets_path / 'ui_elements' / 'top_floor.png'
-        else:
-            tpl_path = Path(tpl)
-
-        try:
-            threshold = float(self.settings.get('vision', {}).get('top_floor_threshold', 0.7))
-        except Exception:
-            threshold = 0.7
-
         screenshot = self.capture_screen()
-        locs = self.find_template(str(tpl_path), screenshot, threshold)
+        locs = self.find_template(str(cfg.top_floor_template), screenshot, cfg.top_floor_threshold)
         found = len(locs) > 0
         if found:
             logging.info(f"Top-floor template detected at {locs[:3]}")
         return found
 
+    def _gray(self, img, purpose='gray'):
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=self.buffers.get(purpose, img.shape[:2]))
+
+    def map_end_regions(self):
+        """Reference regions of the left and right edge strips sampled by detect_map_ends_blocked."""
+        w, h = self.frame_size()
+        edge_w = int(max(10, w * 0.03))
+        y0, y1 = int(h * 0.4), int(h * 0.8)
+        return (0, y0, edge_w, y1 - y0), (w - edge_w, y0, edge_w, y1 - y0)
+
     def detect_map_ends_blocked(self):
         """Heuristic to detect if both ends of the map show a dark 'blocked' area.
         Samples small strips at left and right edges and checks mean brightness.
         Returns True if both ends are sufficiently dark.
         """
         try:
-            screen = pyautogui.screenshot()
-            img = cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2GRAY)
-            h, w = img.shape
-            edge_w = int(max(10, w * 0.03))
-            left_strip = img[ int(h*0.4):int(h*0.8), 0:edge_w ]
-            right_strip = img[ int(h*0.4):int(h*0.8), w-edge_w:w ]
-            left_mean = np.mean(left_strip)
-            right_mean = np.mean(right_strip)
+            left_region, right_region = self.map_end_regions()
+            left_mean = np.mean(self._gray(self.capture_screen(left_region)))
+            right_mean = np.mean(self._gray(self.capture_screen(right_region)))
             # threshold for 'dark' area
             if left_mean < 40 and right_mean < 40:
                 logging.info(f"Map ends appear blocked/dark (left_mean={left_mean:.1f}, right_mean={right_mean:.1f})")
@@ -338,10 +724,9 @@ class Vision:
         # Assuming nickname is in a fixed region, e.g., above character
         nickname_region = (800, 800, 320, 50)  # Example region, adjust as needed
         img = self.capture_screen(nickname_region)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         # For easyocr, convert to RGB
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        results = self.reader.readtext(img_rgb)
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.buffers.get('ocr_nickname', img.shape))
+        results = self.ocr.readtext(img_rgb)
         text = ' '.join([result[1] for result in results])
         # Clean up text
         nickname = re.sub(r'[^\w\s]', '', text).strip()
@@ -0,0 +1,101 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, List, Tuple
+
+import pyautogui
+import window_utils
+
+
+class WindowCatalog:
+    """Enumerates top-level windows and captures their thumbnails on a background thread.
+
+    Results are delivered through poll() as (kind, payload) messages so the Tk dialog can add
+    them a few at a time from an after() timer:
+      ('windows', [(hwnd, title), ...])   one chunk of the window list
+      ('done', count)                     enumeration finished
+      ('thumbnail', (hwnd, image))        downscaled PIL image, or None if capture failed
+      ('error', exc)                      enumeration failed (e.g. unsupported platform)
+    Window lists and thumbnails are cached for `ttl` seconds, thumbnails keyed by hwnd.
+    """
+
+    def __init__(self, ttl: float = 5.0, thumb_size: Tuple[int, int] = (320, 200), chunk: int = 25):
+        self.ttl = ttl
+        self.thumb_size = thumb_size
+        self.chunk = chunk
+        self._windows = None
+        self._windows_at = 0.0
+        self._thumbs = {}
+        self._generation = 0
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='window-catalog', daemon=True)
+        self._thread.start()
+
+    def request_windows(self, force: bool = False):
+        """Start (re-)enumeration. Results of earlier requests still queued are discarded."""
+        self._generation += 1
+        self._jobs.put(('windows', self._generation, force))
+
+    def request_thumbnail(self, hwnd: int):
+        cached = self._thumbs.get(hwnd)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            self._results.put((self._generation, 'thumbnail', (hwnd, cached[1])))
+            return
+        self._jobs.put(('thumbnail', self._generation, hwnd))
+
+    def poll(self, max_messages: int = 20) -> List[Tuple[str, Any]]:
+        out = []
+        while len(out) < max_messages:
+            try:
+                generation, kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self._generation:
+                out.append((kind, payload))
+        return out
+
+    def _run(self):
+        while True:
+            kind, generation, arg = self._jobs.get()
+            if generation != self._generation:
+                continue
+            try:
+                if kind == 'windows':
+                    self._enumerate(generation, arg)
+                else:
+                    self._results.put((generation, 'thumbnail', (arg, self._thumbnail(arg))))
+            except Exception as e:
+                logging.debug(f"Window catalog job {kind} failed: {e}")
+                if kind == 'windows':
+                    self._results.put((generation, 'error', e))
+
+    def _enumerate(self, generation: int, force: bool):
+        if force or self._windows is None or time.monotonic() - self._windows_at >= self.ttl:
+            self._windows = window_utils.list_windows()
+            self._windows_at = time.monotonic()
+            alive = {hwnd for hwnd, _ in self._windows}
+            for hwnd in list(self._thumbs):
+                if hwnd not in alive:
+                    self._thumbs.pop(hwnd, None)
+        windows = self._windows
+        for i in range(0, len(windows), self.chunk):
+            if generation != self._generation:
+                return
+            self._results.put((generation, 'windows', windows[i:i + self.chunk]))
+        self._results.put((generation, 'done', len(windows)))
+
+    def _thumbnail(self, hwnd: int):
+        cached = self._thumbs.get(hwnd)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        from PIL import Image
+        rect = window_utils.get_client_rect(hwnd)
+        if not rect:
+            return None
+        img = pyautogui.screenshot(region=rect)
+        # reducing_gap lets Pillow shrink by an integer factor first, which is much cheaper
+        img.thumbnail(self.thumb_size, Image.BILINEAR, reducing_gap=2.0)
+        self._thumbs[hwnd] = (time.monotonic(), img)
+        return img
@@ -1,67 +1,471 @@
+import os
 import platform
 import ctypes
 from ctypes import wintypes
+import queue
+import threading
 import time
 
+# Set MAPLEBOT_WINDOW_BACKEND=fake to use the in-memory FakeBackend (e.g. on Linux)
+BACKEND_ENV = 'MAPLEBOT_WINDOW_BACKEND'
+
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+OBJID_WINDOW = 0
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+WM_QUIT = 0x0012
+WM_APP = 0x8000
+SW_RESTORE = 9
+VK_MENU = 0x12
+KEYEVENTF_KEYUP = 0x0002
+
 
 def _ensure_windows():
     if platform.system().lower() != 'windows':
         raise OSError('Window utilities currently only supported on Windows')
 
 
-def list_windows():
-    """Enumerate top-level visible windows and return list of (hwnd:int, title:str)."""
-    _ensure_windows()
-    user32 = ctypes.WinDLL('user32', use_last_error=True)
+class _Win32Api:
+    """user32/kernel32 entry points resolved once, with argtypes/restype declared."""
+
+    def __init__(self):
+        _ensure_windows()
+        user32 = ctypes.WinDLL('user32', use_last_error=True)
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        self.WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+        self.WINEVENTPROC = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                               wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+        def proto(dll, name, restype, *argtypes):
+            fn = getattr(dll, name)
+            fn.restype = restype
+            fn.argtypes = list(argtypes)
+            setattr(self, name, fn)
+
+        HWND, BOOL, DWORD, UINT = wintypes.HWND, wintypes.BOOL, wintypes.DWORD, wintypes.UINT
+        proto(user32, 'EnumWindows', BOOL, self.WNDENUMPROC, wintypes.LPARAM)
+        proto(user32, 'IsWindowVisible', BOOL, HWND)
+        proto(user32, 'IsIconic', BOOL, HWND)
+        proto(user32, 'GetWindowTextLengthW', ctypes.c_int, HWND)
+        proto(user32, 'GetWindowTextW', ctypes.c_int, HWND, wintypes.LPWSTR, ctypes.c_int)
+        proto(user32, 'GetClientRect', BOOL, HWND, ctypes.POINTER(wintypes.RECT))
+        proto(user32, 'ClientToScreen', BOOL, HWND, ctypes.POINTER(wintypes.POINT))
+        proto(user32, 'GetForegroundWindow', HWND)
+        proto(user32, 'ShowWindow', BOOL, HWND, ctypes.c_int)
+        proto(user32, 'GetWindowThreadProcessId', DWORD, HWND, ctypes.POINTER(DWORD))
+        proto(user32, 'AttachThreadInput', BOOL, DWORD, DWORD, BOOL)
+        proto(user32, 'BringWindowToTop', BOOL, HWND)
+        proto(user32, 'SetForegroundWindow', BOOL, HWND)
+        proto(user32, 'SetFocus', HWND, HWND)
+        proto(user32, 'keybd_event', None, wintypes.BYTE, wintypes.BYTE, DWORD, ctypes.c_size_t)
+        proto(user32, 'SetWinEventHook', wintypes.HANDLE, DWORD, DWORD, wintypes.HMODULE, self.WINEVENTPROC,
+              DWORD, DWORD, DWORD)
+        proto(user32, 'UnhookWinEvent', BOOL, wintypes.HANDLE)
+        proto(user32, 'GetMessageW', ctypes.c_int, ctypes.POINTER(wintypes.MSG), HWND, UINT, UINT)
+        proto(user32, 'TranslateMessage', BOOL, ctypes.POINTER(wintypes.MSG))
+        proto(user32, 'DispatchMessageW', wintypes.LPARAM, ctypes.POINTER(wintypes.MSG))
+        proto(user32, 'PostThreadMessageW', BOOL, DWORD, UINT, wintypes.WPARAM, wintypes.LPARAM)
+        proto(kernel32, 'GetCurrentThreadId', DWORD)
+
+
+class _WinEventPump:
+    """Single message-loop thread owning every WinEvent hook of the process.
+
+    Tracks the foreground window (EVENT_SYSTEM_FOREGROUND, global) and dispatches
+    EVENT_OBJECT_LOCATIONCHANGE for watched windows (hooked per owning process).
+    """
+
+    def __init__(self, api: _Win32Api):
+        self.api = api
+        self.foreground_changed = threading.Condition()
+        self._listeners = {}
+        self._hooked_pids = set()
+        self._hooks = []
+        self._jobs = queue.Queue()
+        self._tid = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='winevent-pump', daemon=True)
+        self._thread.start()
+        self._ready.wait(1.0)
+
+    @property
+    def alive(self) -> bool:
+        return self._tid is not None and self._thread.is_alive()
+
+    def watch_location(self, hwnd: int, callback):
+        self._listeners.setdefault(hwnd, []).append(callback)
+        pid = wintypes.DWORD()
+        self.api.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        if pid.value and pid.value not in self._hooked_pids:
+            self._hooked_pids.add(pid.value)
+            self._submit(('hook_location', pid.value))
+
+    def unwatch_location(self, hwnd: int, callback):
+        callbacks = self._listeners.get(hwnd, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._listeners.pop(hwnd, None)
 
-    EnumWindows = user32.EnumWindows
-    EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
-    IsWindowVisible = user32.IsWindowVisible
-    IsIconic = user32.IsIconic
-    GetWindowTextLengthW = user32.GetWindowTextLengthW
-    GetWindowTextW = user32.GetWindowTextW
+    def _submit(self, job):
+        self._jobs.put(job)
+        if self._tid:
+            self.api.PostThreadMessageW(self._tid, WM_APP, 0, 0)
 
-    windows = []
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread_id, event_time):
+        if event == EVENT_SYSTEM_FOREGROUND:
+            with self.foreground_changed:
+                self.foreground_changed.notify_all()
+        elif id_object == OBJID_WINDOW and hwnd:
+            for callback in list(self._listeners.get(int(hwnd), ())):
+                try:
+                    callback()
+                except Exception:
+                    pass
 
-    @EnumWindowsProc
-    def _enum_proc(hwnd, lParam):
+    def _run(self):
+        api = self.api
+        # Keep the ctypes callback alive for as long as the hooks exist
+        self._proc = api.WINEVENTPROC(self._on_event)
         try:
-            if not IsWindowVisible(hwnd):
-                return True
-            if IsIconic(hwnd):
-                return True
-            length = GetWindowTextLengthW(hwnd)
-            if length > 0:
-                buf = ctypes.create_unicode_buffer(length + 1)
-                GetWindowTextW(hwnd, buf, length + 1)
-                title = buf.value
-                if title and title.strip():
-                    windows.append((int(hwnd), title))
+            hook = api.SetWinEventHook(EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND, None, self._proc,
+                                       0, 0, WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS)
+            if hook:
+                self._hooks.append(hook)
+            self._tid = api.GetCurrentThreadId()
+        finally:
+            self._ready.set()
+        msg = wintypes.MSG()
+        while api.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            if msg.message == WM_APP:
+                self._drain_jobs()
+                continue
+            api.TranslateMessage(ctypes.byref(msg))
+            api.DispatchMessageW(ctypes.byref(msg))
+        for hook in self._hooks:
+            api.UnhookWinEvent(hook)
+
+    def _drain_jobs(self):
+        while True:
+            try:
+                kind, arg = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if kind == 'hook_location':
+                hook = self.api.SetWinEventHook(EVENT_OBJECT_LOCATIONCHANGE, EVENT_OBJECT_LOCATIONCHANGE, None,
+                                                self._proc, arg, 0, WINEVENT_OUTOFCONTEXT)
+                if hook:
+                    self._hooks.append(hook)
+
+
+class Win32Backend:
+    """Window operations on top of the prototyped user32 API; initialised on first use."""
+
+    def __init__(self):
+        _ensure_windows()
+        self._api = None
+        self._pump = None
+        self._lock = threading.Lock()
+
+    @property
+    def api(self) -> _Win32Api:
+        if self._api is None:
+            with self._lock:
+                if self._api is None:
+                    self._api = _Win32Api()
+        return self._api
+
+    @property
+    def pump(self) -> _WinEventPump:
+        if self._pump is None:
+            api = self.api
+            with self._lock:
+                if self._pump is None:
+                    self._pump = _WinEventPump(api)
+        return self._pump
+
+    def list_windows(self):
+        api = self.api
+        windows = []
+
+        def _enum_proc(hwnd, lParam):
+            try:
+                if not api.IsWindowVisible(hwnd) or api.IsIconic(hwnd):
+                    return True
+                length = api.GetWindowTextLengthW(hwnd)
+                if length > 0:
+                    buf = ctypes.create_unicode_buffer(length + 1)
+                    api.GetWindowTextW(hwnd, buf, length + 1)
+                    title = buf.value
+                    if title and title.strip():
+                        windows.append((int(hwnd), title))
+            except Exception:
+                pass
+            return True
+
+        api.EnumWindows(api.WNDENUMPROC(_enum_proc), 0)
+        return windows
+
+    def client_rect(self, hwnd: int):
+        api = self.api
+        rect = wintypes.RECT()
+        if not api.GetClientRect(hwnd, ctypes.byref(rect)):
+            return None
+        origin = wintypes.POINT(0, 0)
+        if not api.ClientToScreen(hwnd, ctypes.byref(origin)):
+            return None
+        width = rect.right - rect.left
+        height = rect.bottom - rect.top
+        if width <= 0 or height <= 0:
+            return None
+        return (int(origin.x), int(origin.y), int(width), int(height))
+
+    def get_foreground(self):
+        return int(self.api.GetForegroundWindow() or 0)
+
+    def is_minimized(self, hwnd: int) -> bool:
+        return bool(self.api.IsIconic(hwnd))
+
+    def restore(self, hwnd: int):
+        self.api.ShowWindow(hwnd, SW_RESTORE)
+
+    def request_focus(self, hwnd: int):
+        """Try every technique to make hwnd foreground; does not wait for the result."""
+        api = self.api
+        # Technique: AttachThreadInput between current thread and target window thread
+        try:
+            target_tid = api.GetWindowThreadProcessId(hwnd, None)
+            current_tid = api.GetCurrentThreadId()
+            attached = bool(api.AttachThreadInput(current_tid, target_tid, True))
+            api.BringWindowToTop(hwnd)
+            api.SetForegroundWindow(hwnd)
+            api.SetFocus(hwnd)
+            if attached:
+                api.AttachThreadInput(current_tid, target_tid, False)
+        except Exception:
+            pass
+        # Fallback: use Alt trick — send a harmless Alt press to allow SetForegroundWindow
+        try:
+            api.keybd_event(VK_MENU, 0, 0, 0)
+            time.sleep(0.02)
+            api.keybd_event(VK_MENU, 0, KEYEVENTF_KEYUP, 0)
         except Exception:
             pass
-        return True
+        # Final attempt to set foreground
+        try:
+            api.SetForegroundWindow(hwnd)
+        except Exception:
+            pass
+
+    def wait_foreground(self, hwnd: int, timeout: float) -> bool:
+        """Block until hwnd is foreground, woken by EVENT_SYSTEM_FOREGROUND instead of polling."""
+        deadline = time.monotonic() + timeout
+        try:
+            pump = self.pump
+        except Exception:
+            pump = None
+        # Without a running hook thread fall back to coarse polling
+        step = None if pump is not None and pump.alive else 0.05
+        cond = pump.foreground_changed if pump is not None else threading.Condition()
+        with cond:
+            while True:
+                if self.get_foreground() == hwnd:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                cond.wait(remaining if step is None else min(step, remaining))
+
+    def watch_location(self, hwnd: int, callback):
+        self.pump.watch_location(hwnd, callback)
+
+    def unwatch_location(self, hwnd: int, callback):
+        if self._pump is not None:
+            self._pump.unwatch_location(hwnd, callback)
+
+
+class FakeBackend:
+    """In-memory window system with the Win32Backend interface.
+
+    Lets the module (and everything built on it) run, be tested and be benchmarked on
+    machines without a Windows desktop. focus_delay simulates the OS taking time to switch.
+    """
+
+    def __init__(self, focus_delay: float = 0.0):
+        self.focus_delay = focus_delay
+        self.windows = {}
+        self.foreground = 0
+        self._next_hwnd = 0x10000
+        self._listeners = {}
+        self._cond = threading.Condition()
+
+    def add_window(self, title: str, rect=(0, 0, 1920, 1080), visible: bool = True, minimized: bool = False) -> int:
+        with self._cond:
+            self._next_hwnd += 4
+            hwnd = self._next_hwnd
+            self.windows[hwnd] = {'title': title, 'rect': tuple(rect), 'visible': visible, 'minimized': minimized}
+        return hwnd
+
+    def close_window(self, hwnd: int):
+        with self._cond:
+            self.windows.pop(hwnd, None)
+            if self.foreground == hwnd:
+                self.foreground = 0
+                self._cond.notify_all()
+
+    def move_window(self, hwnd: int, rect):
+        self.windows[hwnd]['rect'] = tuple(rect)
+        for callback in list(self._listeners.get(hwnd, ())):
+            callback()
+
+    def list_windows(self):
+        return [(hwnd, w['title']) for hwnd, w in list(self.windows.items())
+                if w['visible'] and not w['minimized'] and w['title'].strip()]
+
+    def client_rect(self, hwnd: int):
+        w = self.windows.get(hwnd)
+        return w['rect'] if w else None
+
+    def get_foreground(self):
+        return self.foreground
+
+    def set_foreground(self, hwnd: int):
+        with self._cond:
+            self.foreground = hwnd
+            self._cond.notify_all()
+
+    def is_minimized(self, hwnd: int) -> bool:
+        w = self.windows.get(hwnd)
+        return bool(w and w['minimized'])
 
-    EnumWindows(_enum_proc, 0)
-    return windows
+    def restore(self, hwnd: int):
+        if hwnd in self.windows:
+            self.windows[hwnd]['minimized'] = False
+
+    def request_focus(self, hwnd: int):
+        if hwnd not in self.windows:
+            return
+        if self.focus_delay > 0:
+            timer = threading.Timer(self.focus_delay, self.set_foreground, args=(hwnd,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.set_foreground(hwnd)
+
+    def wait_foreground(self, hwnd: int, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.foreground == hwnd, timeout)
+
+    def watch_location(self, hwnd: int, callback):
+        self._listeners.setdefault(hwnd, []).append(callback)
+
+    def unwatch_location(self, hwnd: int, callback):
+        callbacks = self._listeners.get(hwnd, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the process-wide backend, creating it on first use.
+
+    Raises OSError on non-Windows hosts unless MAPLEBOT_WINDOW_BACKEND=fake or set_backend() was used.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if os.environ.get(BACKEND_ENV, '').lower() == 'fake':
+                    _backend = FakeBackend()
+                else:
+                    _backend = Win32Backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Install a backend (e.g. a FakeBackend in tests); returns the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def list_windows():
+    """Enumerate top-level visible windows and return list of (hwnd:int, title:str)."""
+    return get_backend().list_windows()
 
 
 def find_window_by_title(substr: str):
     """Return hwnd of the first window whose title contains substr (case-insensitive), or None."""
-    _ensure_windows()
+    backend = get_backend()
     if not substr:
         return None
-    for hwnd, title in list_windows():
+    needle = substr.lower()
+    for hwnd, title in backend.list_windows():
+        if needle in title.lower():
+            return hwnd
+    return None
+
+
+def find_windows_by_title(substr: str):
+    """Return list of (hwnd, title) for every window whose title contains substr (case-insensitive)."""
+    backend = get_backend()
+    if not substr:
+        return []
+    needle = substr.lower()
+    return [(hwnd, title) for hwnd, title in backend.list_windows() if needle in title.lower()]
+
+
+def get_client_rect(hwnd: int):
+    """Return the client area of hwnd in screen coordinates as (left, top, width, height), or None."""
+    return get_backend().client_rect(hwnd)
+
+
+class WindowTracker:
+    """Caches the client rectangle of one window and refreshes it when the window moves or resizes.
+
+    The backend reports EVENT_OBJECT_LOCATIONCHANGE for the window, which marks the cached
+    rectangle stale. The rectangle is also re-read after max_age seconds in case an event is missed.
+    """
+
+    def __init__(self, hwnd: int, max_age: float = 5.0):
+        self._backend = get_backend()
+        self.hwnd = int(hwnd)
+        self.max_age = max_age
+        self._rect = None
+        self._stale = True
+        self._checked_at = 0.0
         try:
-            if substr.lower() in title.lower():
-                return hwnd
+            self._backend.watch_location(self.hwnd, self.invalidate)
+            self._watching = True
         except Exception:
-            continue
-    return None
+            # Without the hook the tracker still refreshes every max_age seconds
+            self._watching = False
+
+    def rect(self):
+        now = time.monotonic()
+        if self._stale or now - self._checked_at > self.max_age:
+            # Clear the flag before reading so an event arriving mid-read marks it stale again
+            self._stale = False
+            self._rect = self._backend.client_rect(self.hwnd)
+            self._checked_at = now
+        return self._rect
 
+    def invalidate(self):
+        self._stale = True
 
-def _get_foreground():
-    user32 = ctypes.WinDLL('user32', use_last_error=True)
-    return int(user32.GetForegroundWindow())
+    def close(self):
+        if self._watching:
+            self._backend.unwatch_location(self.hwnd, self.invalidate)
+            self._watching = False
+
+
+def is_foreground(hwnd: int) -> bool:
+    return get_backend().get_foreground() == hwnd
 
 
 def focus_window(hwnd: int, timeout: float = 1.0) -> bool:
@@ -69,89 +473,59 @@ def focus_window(hwnd: int, timeout: float = 1.0) -> bool:
 
     Returns True if the window became foreground within timeout, False otherwise.
     """
-    _ensure_windows()
-    user32 = ctypes.WinDLL('user32', use_last_error=True)
-    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-
-    SW_RESTORE = 9
-    # Try restore if minimized
+    backend = get_backend()
+    # Restore only a minimized window: SW_RESTORE would also un-maximize a maximized client
     try:
-        user32.ShowWindow(wintypes.HWND(hwnd), SW_RESTORE)
+        if backend.is_minimized(hwnd):
+            backend.restore(hwnd)
     except Exception:
         pass
 
     # If already foreground, done
     try:
-        if _get_foreground() == hwnd:
+        if backend.get_foreground() == hwnd:
             return True
     except Exception:
         pass
 
-    # Technique: AttachThreadInput between current thread and target window thread
+    backend.request_focus(hwnd)
+    # Wait until window is foreground or timeout
     try:
-        GetWindowThreadProcessId = user32.GetWindowThreadProcessId
-        AttachThreadInput = user32.AttachThreadInput
-        BringWindowToTop = user32.BringWindowToTop
-        SetForegroundWindow = user32.SetForegroundWindow
-        SetFocus = user32.SetFocus
-        GetCurrentThreadId = kernel32.GetCurrentThreadId
-
-        target_tid = GetWindowThreadProcessId(wintypes.HWND(hwnd), None)
-        if isinstance(target_tid, tuple):
-            target_tid = target_tid[0]
-        current_tid = GetCurrentThreadId()
-
-        # Attach input, bring to top, set foreground, detach
-        attached = False
-        try:
-            AttachThreadInput(wintypes.DWORD(current_tid), wintypes.DWORD(target_tid), True)
-            attached = True
-        except Exception:
-            attached = False
-        try:
-            BringWindowToTop(wintypes.HWND(hwnd))
-        except Exception:
-            pass
-        try:
-            SetForegroundWindow(wintypes.HWND(hwnd))
-        except Exception:
-            pass
-        try:
-            SetFocus(wintypes.HWND(hwnd))
-        except Exception:
-            pass
-        if attached:
-            try:
-                AttachThreadInput(wintypes.DWORD(current_tid), wintypes.DWORD(target_tid), False)
-            except Exception:
-                pass
+        return backend.wait_foreground(hwnd, timeout)
     except Exception:
-        pass
+        return False
 
-    # Fallback: use Alt trick — send a harmless Alt press to allow SetForegroundWindow
-    try:
-        # Virtual-Key codes
-        VK_MENU = 0x12
-        KEYEVENTF_KEYUP = 0x0002
-        user32.keybd_event(VK_MENU, 0, 0, 0)
-        time.sleep(0.02)
-        user32.keybd_event(VK_MENU, 0, KEYEVENTF_KEYUP, 0)
-    except Exception:
-        pass
 
-    # Final attempt to set foreground
+def benchmark(windows: int = 500, rounds: int = 200):
+    """Time the public helpers against a FakeBackend populated with `windows` windows."""
+    fake = FakeBackend()
+    previous = set_backend(fake)
     try:
-        user32.SetForegroundWindow(wintypes.HWND(hwnd))
-    except Exception:
-        pass
+        hwnds = [fake.add_window(f"Window {i}") for i in range(windows)]
+        game = fake.add_window("MapleStory Worlds-Mapleland")
+        results = {}
+        start = time.perf_counter()
+        for _ in range(rounds):
+            list_windows()
+        results['list_windows_us'] = (time.perf_counter() - start) / rounds * 1e6
+        start = time.perf_counter()
+        for _ in range(rounds):
+            find_window_by_title('mapleland')
+        results['find_window_by_title_us'] = (time.perf_counter() - start) / rounds * 1e6
+        start = time.perf_counter()
+        for i in range(rounds):
+            focus_window(hwnds[i % windows] if i % 2 else game)
+        results['focus_window_us'] = (time.perf_counter() - start) / rounds * 1e6
+        tracker = WindowTracker(game)
+        start = time.perf_counter()
+        for _ in range(rounds * 10):
+            tracker.rect()
+        results['tracked_rect_us'] = (time.perf_counter() - start) / (rounds * 10) * 1e6
+        return results
+    finally:
+        set_backend(previous)
 
-    # Wait until window is foreground or timeout
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        try:
-            if _get_foreground() == hwnd:
-                return True
-        except Exception:
-            pass
-        time.sleep(0.05)
-    return False
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print(f"{name}: {value:.1f}")
@@ -0,0 +1,282 @@
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+
+
+def suppress_duplicates(points, min_distance: float) -> List[tuple]:
+    """Greedy non-maximum suppression: keep the first point of every group closer than min_distance."""
+    kept = []
+    for pt in points:
+        if all(abs(pt[0] - k[0]) >= min_distance or abs(pt[1] - k[1]) >= min_distance for k in kept):
+            kept.append(pt)
+    return kept
+
+
+def minimap_signature(img) -> int:
+    """64-bit average hash of a minimap capture; nearby hashes mean the same map."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (8, 8), interpolation=cv2.INTER_AREA)
+    bits = (small > small.mean()).flatten()
+    return int(sum(1 << i for i, b in enumerate(bits) if b))
+
+
+class MonsterTrack:
+    __slots__ = ('id', 'x', 'y', 'template', 'first_seen', 'last_seen', 'hits', 'misses')
+
+    def __init__(self, track_id: int, x: int, y: int, template: int, now: float):
+        self.id = track_id
+        self.x = x
+        self.y = y
+        self.template = template
+        self.first_seen = now
+        self.last_seen = now
+        self.hits = 1
+        self.misses = 0
+
+    def __repr__(self):
+        return f"MonsterTrack(id={self.id}, x={self.x}, y={self.y}, hits={self.hits})"
+
+
+class MapMemory:
+    """Static geometry learned for one map: rope positions and platform heights."""
+
+    def __init__(self, key):
+        self.key = key
+        self.ropes: List[Tuple[int, int]] = []
+        self.ropes_scanned_at = 0.0
+        # platforms as [y, x_min, x_max], learned from where the character has stood; a span joins
+        # them (and the navigation graph) only once it is at least min_span wide
+        self.platforms: List[List[int]] = []
+        self._candidates: List[List[int]] = []
+        # bumped when a rope or platform is added or removed, so derived data (navigation graphs) can
+        # be rebuilt; a platform widening in place does not count, or the graph would rebuild every tick
+        self.version = 0
+        self._last_y: Optional[int] = None
+        self._steady = 0
+
+    def observe_character(self, x: int, y: int, tolerance: int = 8, settle: int = 3, min_span: int = 40):
+        """Learn the platform under the character once its y has held for `settle` observations.
+
+        Mid-jump, falling and climbing positions change y every tick and are skipped; standing on a
+        rope keeps y but not x, so such a span never grows to min_span.
+        """
+        if self._last_y is not None and abs(y - self._last_y) <= tolerance:
+            self._steady += 1
+        else:
+            self._steady = 1
+        self._last_y = y
+        if self._steady < settle:
+            return
+        for platform in self.platforms:
+            if abs(platform[0] - y) <= tolerance:
+                platform[1] = min(platform[1], x)
+                platform[2] = max(platform[2], x)
+                return
+        for platform in self._candidates:
+            if abs(platform[0] - y) <= tolerance:
+                platform[1] = min(platform[1], x)
+                platform[2] = max(platform[2], x)
+                if platform[2] - platform[1] >= min_span:
+                    self._candidates.remove(platform)
+                    self.platforms.append(platform)
+                    self.platforms.sort()
+                    self.version += 1
+                return
+        self._candidates.append([y, x, x])
+
+
+class WorldModel:
+    """Perception state that persists across ticks.
+
+    - Ropes are static: scanned once per map and re-scanned only every world.rope_rescan_seconds.
+      The camera can scroll, so a remembered rope is confirmed in a small ROI before it is used
+      and the map's rope memory is invalidated when it is not there.
+    - Platforms are learned from character positions.
+    - Monsters are tracked with stable IDs. Each tick existing tracks are re-checked in a small
+      ROI around their last position; the full-frame scan for new monsters runs only every
+      world.monster_full_scan_seconds (or when nothing is being tracked).
+    """
+
+    def __init__(self, vision, cfg, monster_paths=()):
+        self.vision = vision
+        self.cfg = cfg
+        self.monster_paths = list(monster_paths)
+        self.maps: Dict[Any, MapMemory] = {}
+        self.map: MapMemory = self._memory_for('default')
+        self.tracks: Dict[int, MonsterTrack] = {}
+        self._ids = itertools.count(1)
+        self._last_full_scan = 0.0
+        self._minimap_region = None
+        self._map_checked_at = 0.0
+        self._signatures: List[Tuple[int, Any]] = []
+        self.stats = {'full_scans': 0, 'roi_checks': 0, 'rope_scans': 0}
+        # Optional callback(track) when a track is dropped after too many misses
+        self.on_track_lost = None
+
+    # --- map identity -------------------------------------------------------------------------
+    def _memory_for(self, key) -> MapMemory:
+        memory = self.maps.get(key)
+        if memory is None:
+            memory = self.maps[key] = MapMemory(key)
+        return memory
+
+    def set_route(self, route: Optional[Dict[str, Any]]):
+        """Use the route's minimap_region to tell maps apart (falls back to the route name)."""
+        region = (route or {}).get('minimap_region')
+        self._minimap_region = tuple(int(v) for v in region) if region else None
+        self._map_checked_at = 0.0
+        if self._minimap_region is None:
+            self._switch_map((route or {}).get('name', 'default'))
+
+    def check_map(self, now: Optional[float] = None):
+        if self._minimap_region is None:
+            return
+        now = now or time.monotonic()
+        if now - self._map_checked_at < self.cfg.world_map_check_seconds:
+            return
+        self._map_checked_at = now
+        signature = minimap_signature(self.vision.capture_screen(self._minimap_region))
+        for known, key in self._signatures:
+            if bin(known ^ signature).count('1') <= 6:
+                self._switch_map(key)
+                return
+        key = f"map-{len(self._signatures) + 1}"
+        self._signatures.append((signature, key))
+        self._switch_map(key)
+
+    def _switch_map(self, key):
+        if self.map.key != key:
+            logging.info(f"World model: entered map {key}")
+            self.map = self._memory_for(key)
+            self.tracks.clear()
+            self._last_full_scan = 0.0
+
+    # --- static geometry ----------------------------------------------------------------------
+    def observe_character(self, x: int, y: int):
+        if x is not None and y is not None:
+            self.map.observe_character(int(x), int(y), settle=self.cfg.world_platform_settle_ticks,
+                                       min_span=self.cfg.world_platform_min_span)
+
+    def ropes(self, character_y: Optional[int] = None, now: Optional[float] = None):
+        now = now or time.monotonic()
+        memory = self.map
+        if not memory.ropes_scanned_at or now - memory.ropes_scanned_at >= self.cfg.world_rope_rescan_seconds:
+            ropes = suppress_duplicates(self.vision.find_ropes(None), 10)
+            if ropes != memory.ropes:
+                memory.ropes = ropes
+                memory.version += 1
+            memory.ropes_scanned_at = now
+            self.stats['rope_scans'] += 1
+            logging.debug(f"World model: {len(memory.ropes)} ropes on map {memory.key}")
+        if character_y is None:
+            return list(memory.ropes)
+        return [r for r in memory.ropes if abs(character_y - r[1]) < 200]
+
+    def confirm_rope(self, rope) -> bool:
+        """Re-check a remembered rope in an ROI; a miss forces a rescan on the next ropes() call."""
+        rope_path = str(self.vision.assets_path / 'ui_elements' / 'rope.png')
+        w, h = self.vision.template_size(rope_path)
+        roi = self._clip_roi(rope[0], rope[1], w, h)
+        if roi and self.vision.find_template(rope_path, self.vision.capture_screen(roi)):
+            return True
+        logging.debug(f"World model: rope at {rope} moved or vanished, rescanning")
+        self.map.ropes_scanned_at = 0.0
+        return False
+
+    def _clip_roi(self, x: int, y: int, w: int, h: int):
+        pad = self.cfg.world_roi_padding
+        fw, fh = self.vision.frame_size()
+        x0, y0 = max(0, x - pad), max(0, y - pad)
+        x1, y1 = min(fw, x + w + pad), min(fh, y + h + pad)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1 - x0, y1 - y0
+
+    # --- dynamic entities ---------------------------------------------------------------------
+    def update_monsters(self, now: Optional[float] = None) -> List[MonsterTrack]:
+        """Refresh monster tracks and return the live ones."""
+        now = now or time.monotonic()
+        cfg = self.cfg
+        full_scan = not self.tracks or now - self._last_full_scan >= cfg.world_monster_full_scan_seconds
+        if full_scan:
+            detections = self.vision.find_monsters(self.monster_paths)
+            self._last_full_scan = now
+            self.stats['full_scans'] += 1
+            self._associate(suppress_duplicates(detections, 20), now, drop_unmatched=True)
+        else:
+            self._recheck_tracks(now)
+        return list(self.tracks.values())
+
+    def monster_points(self, fresh_only: bool = True) -> List[Tuple[int, int]]:
+        """Tracked monster positions; by default only those confirmed by the latest update."""
+        return [(t.x, t.y) for t in self.tracks.values() if not fresh_only or t.misses == 0]
+
+    def planned_regions(self, now: Optional[float] = None) -> List[Optional[Tuple[int, int, int, int]]]:
+        """Regions the next check_map()/update_monsters() will read (None = full view)."""
+        now = now or time.monotonic()
+        if not self.tracks or now - self._last_full_scan >= self.cfg.world_monster_full_scan_seconds:
+            return [None]
+        regions = [roi for _, roi in map(self._track_roi, self.tracks.values()) if roi is not None]
+        if self._minimap_region is not None and now - self._map_checked_at >= self.cfg.world_map_check_seconds:
+            regions.append(self._minimap_region)
+        return regions
+
+    def _track_roi(self, track: MonsterTrack):
+        path = self.monster_paths[track.template] if track.template < len(self.monster_paths) else None
+        w, h = self.vision.template_size(path) if path else (0, 0)
+        return path, self._clip_roi(track.x, track.y, w, h)
+
+    def _recheck_tracks(self, now: float):
+        for track in list(self.tracks.values()):
+            path, roi = self._track_roi(track)
+            if roi is None:
+                self._miss(track)
+                continue
+            self.stats['roi_checks'] += 1
+            # Same template first (cheapest), then every template in case the monster turned around
+            found = self.vision.find_monsters([path], roi=roi) if path else []
+            if found:
+                found = [(x, y, track.template) for x, y, _ in found]
+            else:
+                found = self.vision.find_monsters(self.monster_paths, roi=roi)
+            if found:
+                x, y, template = min(found, key=lambda d: abs(d[0] - track.x) + abs(d[1] - track.y))
+                track.x, track.y, track.template = int(x), int(y), template
+                track.last_seen = now
+                track.hits += 1
+                track.misses = 0
+            else:
+                self._miss(track)
+
+    def _associate(self, detections, now: float, drop_unmatched: bool):
+        gate = self.cfg.world_track_gate
+        unmatched = dict(self.tracks)
+        for x, y, template in detections:
+            best = None
+            best_dist = gate
+            for track in unmatched.values():
+                dist = abs(track.x - x) + abs(track.y - y)
+                if dist < best_dist:
+                    best, best_dist = track, dist
+            if best is not None:
+                del unmatched[best.id]
+                best.x, best.y, best.template = int(x), int(y), template
+                best.last_seen = now
+                best.hits += 1
+                best.misses = 0
+            else:
+                track = MonsterTrack(next(self._ids), int(x), int(y), template, now)
+                self.tracks[track.id] = track
+        if drop_unmatched:
+            for track in unmatched.values():
+                self._miss(track)
+
+    def _miss(self, track: MonsterTrack):
+        track.misses += 1
+        if track.misses > self.cfg.world_track_max_misses:
+            self.tracks.pop(track.id, None)
+            if self.on_track_lost is not None:
+                self.on_track_lost(track)